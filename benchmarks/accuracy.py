@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+#
+# @project IndicTrans
+# @file benchmarks/accuracy.py
+# @author  Shreos Roychowdhury <shreos@tirja.com>
+# @version 1.0.0
+#
+# @section DESCRIPTION
+#
+#   accuracy.py : word accuracy and speed of each decoder on the test pairs
+#
+#   PYTHONPATH=./src python benchmarks/accuracy.py -d viterbi greedy
+#
+# Every tests/<src>_<trg>.testpairs file holds a word and its expected
+# transliteration per line; it is checked in both directions. The k-best
+# decoders are scored on their best candidate, and also on whether the
+# expected word is among the k candidates.
+#
+# @section LICENSE
+#
+# Copyright (c) 2025 Shreos Roychowdhury.
+# Copyright (c) 2025 Tirja Consulting LLP.
+#
+# This source code is released under GNU Affero General Public License.
+# Please refer https://www.gnu.org/licenses/agpl-3.0.en.html#license-text
+#
+# THE SOFTWARE IS PROVIDED , WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+import io
+import os
+import glob
+import time
+import argparse
+
+from indictrans.utils.Transliterator import Transliterator
+from indictrans.utils.HandleDecoders import DECODERS, ONE_BEST
+
+TEST_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'tests')
+
+def test_pairs(test_dir):
+	"""(source, target, [(word, expected)]) for both directions of every file."""
+	for path in sorted(glob.glob(os.path.join(test_dir, '*_*.testpairs'))):
+		source, target = os.path.basename(path)[:-len('.testpairs')].split('_')
+		with io.open(path, encoding='utf-8') as fp:
+			pairs = [tuple(line.split()) for line in fp if line.strip()]
+		yield source, target, pairs
+		yield target, source, [(expected, word) for word, expected in pairs]
+
+def main():
+	parser = argparse.ArgumentParser( prog="accuracy", description="Word accuracy of the decoders on the test pairs")
+	parser.add_argument( '-d', '--decode', nargs='*', default=['viterbi', 'greedy', 'beamsearch'],
+		choices=sorted(DECODERS), metavar='', help="decoders to compare")
+	parser.add_argument( '-k', '--k-best', type=int, default=5, help="candidates of the k-best decoders")
+	parser.add_argument( '-p', '--pairs', nargs='*', metavar='', help="only these pairs (e.g. hin-eng)")
+	parser.add_argument( '-t', '--test-dir', default=TEST_DIR, help="directory of the .testpairs files")
+	args = parser.parse_args()
+
+	print(f"{'pair':>8s} {'decoder':>13s} {'words':>6s} {'top-1':>7s} {'top-k':>7s} {'time':>10s}")
+	totals = dict((decode, [0, 0, 0, 0.]) for decode in args.decode)
+	for source, target, pairs in test_pairs(args.test_dir):
+		pair = f"{source}-{target}"
+		if args.pairs and pair not in args.pairs:
+			continue
+		for decode in args.decode:
+			trans = Transliterator(source=source, target=target, decode=decode, rb=False)
+			start = time.perf_counter()
+			if decode in ONE_BEST:
+				outputs = [[trans.transform(word)] for word, expected in pairs]
+			else:
+				outputs = [trans.transform(word, args.k_best) for word, expected in pairs]
+			secs = time.perf_counter() - start
+			top_1 = sum(out[0] == expected for out, (word, expected) in zip(outputs, pairs))
+			top_k = sum(expected in out for out, (word, expected) in zip(outputs, pairs))
+			total = totals[decode]
+			total[0] += len(pairs)
+			total[1] += top_1
+			total[2] += top_k
+			total[3] += secs
+			print(f"{pair:>8s} {decode:>13s} {len(pairs):>6d} {100. * top_1 / len(pairs):>6.1f}%"
+				f" {100. * top_k / len(pairs):>6.1f}% {1e6 * secs / len(pairs):>7.1f} us")
+	for decode, (n_words, top_1, top_k, secs) in totals.items():
+		if n_words:
+			print(f"{'all':>8s} {decode:>13s} {n_words:>6d} {100. * top_1 / n_words:>6.1f}%"
+				f" {100. * top_k / n_words:>6.1f}% {1e6 * secs / n_words:>7.1f} us")
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+#
+# @project IndicTrans
+# @file benchmarks/bench_decoders.py
+# @author  Shreos Roychowdhury <shreos@tirja.com>
+# @version 1.0.0
+#
+# @section DESCRIPTION
+#
+#   bench_decoders.py : times every decoder in DECODERS on random scores
+#
+#   PYTHONPATH=./src python benchmarks/bench_decoders.py -n 10 -s 80 -k 5
+#
+# @section LICENSE
+#
+# Copyright (c) 2025 Shreos Roychowdhury.
+# Copyright (c) 2025 Tirja Consulting LLP.
+#
+# This source code is released under GNU Affero General Public License.
+# Please refer https://www.gnu.org/licenses/agpl-3.0.en.html#license-text
+#
+# THE SOFTWARE IS PROVIDED , WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+import argparse
+import timeit
+
+import numpy as np
+
+from indictrans.putils import COMPILED
+from indictrans.utils.HandleDecoders import DECODERS, ONE_BEST, BATCH_DECODERS
+
+def main():
+	parser = argparse.ArgumentParser( prog="bench_decoders", description="Benchmark decoders on random scores")
+	parser.add_argument( '-n', '--length', type=int, default=10, help="characters per word")
+	parser.add_argument( '-s', '--states', type=int, default=80, help="number of classes")
+	parser.add_argument( '-k', '--k-best', dest="k_best", type=int, default=5, help="k for k-best decoders")
+	parser.add_argument( '-r', '--repeat', type=int, default=2000, help="calls per decoder")
+	parser.add_argument( '-w', '--words', type=int, default=20, help="words per batch for batch decoders")
+	args = parser.parse_args()
+
+	rnd = np.random.RandomState(0)
+	score = rnd.randn(args.length, args.states)
+	trans = rnd.randn(args.states, args.states)
+	init = rnd.randn(args.states)
+	final = rnd.randn(args.states)
+
+	print(f"compiled kernels: {COMPILED}, length={args.length} states={args.states} k={args.k_best}")
+	for name, decoder in sorted(DECODERS.items()):
+		if name in ONE_BEST:
+			call = lambda: decoder(score.copy(), trans, init, final)
+		else:
+			call = lambda: decoder(score.copy(), trans, init, final, args.k_best)
+		secs = min(timeit.repeat(call, number=args.repeat, repeat=3))
+		print(f"{name:>16s}: {1e6 * secs / args.repeat:10.1f} us/word")
+
+	# a sentence of words of mixed length, in ragged layout
+	lengths = rnd.randint(max(1, args.length // 2), args.length * 3 // 2 + 1, args.words)
+	offsets = np.cumsum(np.append(0, lengths)).astype(np.intp)
+	batch = rnd.randn(offsets[-1], args.states)
+	repeat = max(1, args.repeat // args.words)
+	for name, decoder in sorted(BATCH_DECODERS.items()):
+		single = DECODERS[name]
+		loop = lambda: [single(batch[a:b].copy(), trans, init, final) for a, b in zip(offsets[:-1], offsets[1:])]
+		call = lambda: decoder(batch.copy(), offsets, trans, init, final)
+		secs_loop = min(timeit.repeat(loop, number=repeat, repeat=3))
+		secs = min(timeit.repeat(call, number=repeat, repeat=3))
+		print(f"{name + ' batch':>16s}: {1e6 * secs / repeat / args.words:10.1f} us/word"
+			f" ({1e6 * secs_loop / repeat / args.words:.1f} us/word word by word)")
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+#
+# @project IndicTrans
+# @file benchmarks/bench_kbest.py
+# @author  Shreos Roychowdhury <shreos@tirja.com>
+# @version 1.0.0
+#
+# @section DESCRIPTION
+#
+#   bench_kbest.py : exact k-best Viterbi against beam search, k = 2..15
+#
+#   PYTHONPATH=./src python benchmarks/bench_kbest.py -n 10 -s 80
+#
+# Besides the time per word, reports how often the beam search k-best list
+# differs from the exact one.
+#
+# @section LICENSE
+#
+# Copyright (c) 2025 Shreos Roychowdhury.
+# Copyright (c) 2025 Tirja Consulting LLP.
+#
+# This source code is released under GNU Affero General Public License.
+# Please refer https://www.gnu.org/licenses/agpl-3.0.en.html#license-text
+#
+# THE SOFTWARE IS PROVIDED , WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+import argparse
+import timeit
+
+import numpy as np
+
+from indictrans.putils import COMPILED
+from indictrans.utils.HandleDecoders import DECODERS
+
+def main():
+	parser = argparse.ArgumentParser( prog="bench_kbest", description="Benchmark k-best Viterbi against beam search")
+	parser.add_argument( '-n', '--length', type=int, default=10, help="characters per word")
+	parser.add_argument( '-s', '--states', type=int, default=80, help="number of classes")
+	parser.add_argument( '-w', '--words', type=int, default=50, help="random words per k")
+	parser.add_argument( '-r', '--repeat', type=int, default=5, help="passes over the words")
+	args = parser.parse_args()
+
+	rnd = np.random.RandomState(0)
+	trans = rnd.randn(args.states, args.states)
+	init = rnd.randn(args.states)
+	final = rnd.randn(args.states)
+	words = [rnd.randn(args.length, args.states) for i in range(args.words)]
+	beamsearch, kbest = DECODERS['beamsearch'], DECODERS['kbest']
+
+	print(f"compiled kernels: {COMPILED}, length={args.length} states={args.states}")
+	print(f"{'k':>3s} {'beamsearch':>14s} {'kbest':>14s} {'beam inexact':>13s}")
+	for k in range(2, 16):
+		run = lambda decoder: [decoder(w.copy(), trans, init, final, k) for w in words]
+		inexact = sum(b != e for b, e in zip(run(beamsearch), run(kbest)))
+		times = [min(timeit.repeat(lambda: run(decoder), number=args.repeat, repeat=3))
+			for decoder in (beamsearch, kbest)]
+		beam_us, kbest_us = [1e6 * t / args.repeat / args.words for t in times]
+		print(f"{k:>3d} {beam_us:>11.1f} us {kbest_us:>11.1f} us {100. * inexact / args.words:>12.0f}%")
+
+if __name__ == '__main__':
+	main()
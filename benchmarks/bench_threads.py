@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+#
+# @project IndicTrans
+# @file benchmarks/bench_threads.py
+# @author  Shreos Roychowdhury <shreos@tirja.com>
+# @version 1.0.0
+#
+# @section DESCRIPTION
+#
+#   bench_threads.py : decoder throughput with 1..N threads on random scores
+#
+#   PYTHONPATH=./src python benchmarks/bench_threads.py -t 8 -s 80
+#
+# The compiled decoders release the GIL, so throughput should grow with the
+# thread count up to the number of cores; the numpy fallbacks mostly do not.
+#
+# @section LICENSE
+#
+# Copyright (c) 2025 Shreos Roychowdhury.
+# Copyright (c) 2025 Tirja Consulting LLP.
+#
+# This source code is released under GNU Affero General Public License.
+# Please refer https://www.gnu.org/licenses/agpl-3.0.en.html#license-text
+#
+# THE SOFTWARE IS PROVIDED , WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+import os
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from indictrans.putils import COMPILED
+from indictrans.utils.HandleDecoders import BATCH_DECODERS
+
+def main():
+	parser = argparse.ArgumentParser( prog="bench_threads", description="Benchmark decoder scaling over threads")
+	parser.add_argument( '-t', '--threads', type=int, default=os.cpu_count(), help="maximum number of threads")
+	parser.add_argument( '-n', '--length', type=int, default=10, help="characters per word")
+	parser.add_argument( '-s', '--states', type=int, default=80, help="number of classes")
+	parser.add_argument( '-w', '--words', type=int, default=20, help="words per decoder call")
+	parser.add_argument( '-c', '--calls', type=int, default=400, help="decoder calls per run")
+	parser.add_argument( '-d', '--decode', default='viterbi', choices=sorted(BATCH_DECODERS), help="batch decoder")
+	args = parser.parse_args()
+
+	rnd = np.random.RandomState(0)
+	trans = rnd.randn(args.states, args.states)
+	init = rnd.randn(args.states)
+	final = rnd.randn(args.states)
+	lengths = rnd.randint(max(1, args.length // 2), args.length * 3 // 2 + 1, args.words)
+	offsets = np.cumsum(np.append(0, lengths)).astype(np.intp)
+	batch = rnd.randn(offsets[-1], args.states)
+	decoder = BATCH_DECODERS[args.decode]
+	call = lambda _: decoder(batch.copy(), offsets, trans, init, final)
+
+	print(f"compiled kernels: {COMPILED}, decoder={args.decode} states={args.states} words/call={args.words}")
+	base = None
+	for n_threads in range(1, args.threads + 1):
+		with ThreadPoolExecutor(n_threads) as pool:
+			list(pool.map(call, range(n_threads)))  # warm up
+			start = time.perf_counter()
+			list(pool.map(call, range(args.calls)))
+			secs = time.perf_counter() - start
+		rate = args.calls * args.words / secs
+		base = base or rate
+		print(f"{n_threads:>3d} threads: {rate:12.0f} words/s  x{rate / base:.2f}")
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+#
+# @project IndicTrans
+# @file benchmarks/check_sparse_viterbi.py
+# @author  Shreos Roychowdhury <shreos@tirja.com>
+# @version 1.0.0
+#
+# @section DESCRIPTION
+#
+#   check_sparse_viterbi.py : pruned-transition Viterbi against the dense one, on every pair
+#
+#   PYTHONPATH=./src python benchmarks/check_sparse_viterbi.py -w 2000
+#
+# For every shipped language pair, decodes random words (random features at
+# each position, some unseen) with and without the predecessor lists of
+# SparseTransitions. Prints the kept fraction of transitions, any differing
+# paths, and the time per word of both. Exits with status 1 on a difference.
+#
+# @section LICENSE
+#
+# Copyright (c) 2025 Shreos Roychowdhury.
+# Copyright (c) 2025 Tirja Consulting LLP.
+#
+# This source code is released under GNU Affero General Public License.
+# Please refer https://www.gnu.org/licenses/agpl-3.0.en.html#license-text
+#
+# THE SOFTWARE IS PROVIDED , WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+from indictrans.utils.ModelStore import ModelStore, MODEL_DIR
+from indictrans.utils.Transliterator import Transliterator
+from indictrans.utils.HandleDecoders import DECODERS, BATCH_DECODERS
+
+def shipped_pairs():
+	pairs = set(ModelStore().pairs())
+	npzfile = os.path.join(MODEL_DIR, 'npzdata.npz')
+	if os.path.isfile(npzfile):
+		with np.load(npzfile, allow_pickle=True) as npz:
+			pairs.update(key[:-len('_coef')] for key in npz.files if key.endswith('_coef'))
+	return sorted(pairs)
+
+def random_ids(unique_feats, n_samples, rnd, unseen=0.2):
+	"""Feature ids of n_samples random letters."""
+	ids = np.empty((n_samples, len(unique_feats)), dtype=np.intp)
+	for p, feats in enumerate(unique_feats):
+		cols = np.fromiter(feats.values(), dtype=np.intp, count=len(feats))
+		ids[:, p] = cols[rnd.randint(0, len(cols), n_samples)] if len(cols) else -1
+	ids[rnd.rand(*ids.shape) < unseen] = -1
+	return ids
+
+def main():
+	parser = argparse.ArgumentParser( prog="check_sparse_viterbi", description="Check pruned-transition Viterbi on every pair")
+	parser.add_argument( '-w', '--words', type=int, default=1000, help="random words per pair")
+	parser.add_argument( '-n', '--length', type=int, default=12, help="maximum characters per word")
+	parser.add_argument( '-p', '--pairs', nargs='*', metavar='', help="check only these pairs (e.g. hin-eng)")
+	args = parser.parse_args()
+
+	rnd = np.random.RandomState(0)
+	decoder, batch_decoder = DECODERS['viterbi'], BATCH_DECODERS['viterbi']
+	failed = False
+	print(f"{'pair':>8s} {'states':>6s} {'kept':>6s} {'diffs':>6s} {'dense':>10s} {'sparse':>10s}")
+	for pair in args.pairs or shipped_pairs():
+		source, target = pair.split('-')
+		model = Transliterator(source=source, target=target, rb=False).transform.__self__
+		transitions = model.transitions_
+		lists = {'pred_indptr': transitions.indptr_, 'pred_indices': transitions.indices_}
+		params = (model.intercept_trans_, model.intercept_init_, model.intercept_final_)
+
+		offsets = np.cumsum(np.append(0, rnd.randint(1, args.length + 1, args.words))).astype(np.intp)
+		scores = model.scorer_.emissions(random_ids(model.vectorizer_.unique_feats, offsets[-1], rnd))
+		expected = batch_decoder(scores.copy(), offsets, *params)
+		diffs = int((batch_decoder(scores.copy(), offsets, *params, **lists) != expected).sum())
+
+		times = []
+		for kwargs in ({}, lists):
+			start = time.perf_counter()
+			for a, b in zip(offsets[:-1], offsets[1:]):
+				path = decoder(scores[a:b].copy(), *params, **kwargs)
+				diffs += int((path != expected[a:b]).sum())
+			times.append(1e6 * (time.perf_counter() - start) / args.words)
+		failed = failed or diffs > 0
+		print(f"{pair:>8s} {len(model.classes_):>6d} {transitions.density:>6.1%} {diffs:>6d}"
+			f" {times[0]:>7.1f} us {times[1]:>7.1f} us")
+	sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+	main()
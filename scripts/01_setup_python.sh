@@ -21,4 +21,5 @@ else
 fi
 
 python -m pip install ${EXTRA} -r ${REQFIL}
-# python setup.py install
+# build cython extensions in place for PYTHONPATH=./src
+python setup.py build_ext --inplace
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+#
+# @project IndicTrans
+# @file setup.py
+# @author  Shreos Roychowdhury <shreos@tirja.com>
+# @version 1.0.0
+#
+# @section DESCRIPTION
+#
+#   setup.py : ahead-of-time build of the cython extensions in indictrans.putils
+#              metadata is in pyproject.toml
+#
+# @section LICENSE
+#
+# Copyright (c) 2025 Shreos Roychowdhury.
+# Copyright (c) 2025 Tirja Consulting LLP.
+#
+# This source code is released under GNU Affero General Public License.
+# Please refer https://www.gnu.org/licenses/agpl-3.0.en.html#license-text
+#
+
+import numpy
+from setuptools import setup, Extension
+from Cython.Build import cythonize
+
+PUTILS = ['viterbi', 'beamsearch', 'ctranxn', 'sparseadd', 'wordkernel']
+
+extensions = [
+	Extension('indictrans.putils.%s' % (name), ['src/indictrans/putils/%s.pyx' % (name)], include_dirs=[numpy.get_include()])
+	for name in PUTILS
+]
+
+setup(ext_modules=cythonize(extensions, include_path=['src'], compiler_directives={'language_level': 3}))
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+#
+# @project IndicTrans
+# @file src/indictrans/apps/indictrans_cache.py
+# @author  Shreos Roychowdhury <shreos@tirja.com>
+# @version 1.0.0
+#
+# @section DESCRIPTION
+#
+#   indictrans_cache.py : inspects, compacts and pre-populates a persistent transliteration cache
+#
+#   indictrans-cache cache.db populate -s hin -t eng corpus.txt
+#   indictrans-cache cache.db stats
+#   indictrans-cache cache.db compact --stale
+#
+# @section LICENSE
+#
+# Copyright (c) 2025 Shreos Roychowdhury.
+# Copyright (c) 2025 Tirja Consulting LLP.
+#
+# This source code is released under GNU Affero General Public License.
+# Please refer https://www.gnu.org/licenses/agpl-3.0.en.html#license-text
+#
+# THE SOFTWARE IS PROVIDED , WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+import io
+import os
+import sys
+import argparse
+from datetime import datetime
+import traceback
+
+from indictrans.utils.PersistentCache import PersistentCache
+from indictrans.utils.Transliterator import Transliterator
+from indictrans.utils.HandleDecoders import DECODERS, ONE_BEST
+
+def show_stats(db):
+	rows = db.stats()
+	print(f"{'pair':>8s} {'decoder':>13s} {'k':>3s} {'checksum':>32s} {'words':>10s}")
+	for pair, decode, k, checksum, count in rows:
+		print(f"{pair:>8s} {decode:>13s} {k:>3d} {checksum:>32s} {count:>10d}")
+	print(f"{sum(row[-1] for row in rows)} words, {os.path.getsize(db.path)} bytes")
+
+def compact(db, stale):
+	if stale:
+		# rows of models that have been replaced are never read again
+		current = dict()
+		for pair, decode, k, checksum, count in db.stats():
+			if (pair, decode) not in current:
+				source, target = pair.split('-')
+				try:
+					trans = Transliterator(source, target, decode=decode, rb=False).transform.__self__
+					current[pair, decode] = trans.model_checksum()
+				except (ValueError, NotImplementedError, IOError):
+					current[pair, decode] = None
+			if checksum != current[pair, decode]:
+				print(f"Dropped {db.drop(pair, decode, checksum)} stale words of {pair} {decode}")
+	db.compact()
+	print(f"Compacted {db.path} to {os.path.getsize(db.path)} bytes")
+
+def populate(db, args):
+	trn = Transliterator(args.source, args.target, decode=args.decode, rb=False, cache=db)
+	if not trn.check():
+		raise ValueError(f"{args.source}-{args.target} is not transliterated by a model")
+	inputs = args.inputs or ['-']
+	n_lines = 0
+	for name in inputs:
+		fp = io.open(sys.stdin.fileno(), encoding='utf-8', closefd=False) if name == '-' else io.open(name, encoding='utf-8')
+		with fp:
+			while True:
+				lines = fp.readlines(1 << 20)
+				if not lines:
+					break
+				# one commit per chunk
+				with db.transaction():
+					for line in lines:
+						if args.decode in ONE_BEST:
+							trn.convert(line)
+						else:
+							trn.transform(line, args.k_best)
+				n_lines += len(lines)
+	print(f"Transliterated {n_lines} lines: {trn.cache_info()}")
+
+def create_app():
+
+	languages = '''eng hin guj pan ben mal kan tam tel ori mar nep bod kok asm urd'''.split()
+	lang_help = "select language (3 letter ISO-639 code) {%s}" % ( ', '.join(languages))
+
+	parser = argparse.ArgumentParser( prog="indictrans-cache", description="Inspect, compact and pre-populate a persistent transliteration cache")
+	parser.add_argument('-v', '--version', action="version", version="%(prog)s 1.0")
+	parser.add_argument( 'path', metavar='<cache.db>', help="SQLite cache file")
+	commands = parser.add_subparsers(dest='command', required=True)
+
+	commands.add_parser('stats', help="words per pair, decoder, k and model checksum")
+
+	cmd = commands.add_parser('compact', help="checkpoint the write-ahead log and vacuum")
+	cmd.add_argument( '--stale', action='store_true', help="first drop the words of models no longer installed")
+
+	cmd = commands.add_parser('populate', help="transliterate text files (or stdin) into the cache")
+	cmd.add_argument( '-s', '--source', dest="source", choices=languages, default="hin", metavar='', help="%s" % lang_help)
+	cmd.add_argument( '-t', '--target', dest="target", choices=languages, default="eng", metavar='', help="%s" % lang_help)
+	cmd.add_argument( '-d', '--decode', dest="decode", choices=sorted(DECODERS), default="viterbi", metavar='', help="decoder")
+	cmd.add_argument( '-k', '--k-best', dest="k_best", type=int, default=5, metavar='', help="candidates of k-best decoders")
+	cmd.add_argument( 'inputs', nargs='*', metavar='<file>', help="UTF-8 text, one or more words per line")
+
+	args = parser.parse_args()
+	start_dd = datetime.now()
+
+	try:
+		# only populate creates a cache
+		if args.command != 'populate' and not os.path.isfile(args.path):
+			raise FileNotFoundError(f"no cache at {args.path}")
+		db = PersistentCache(args.path, readonly=(args.command == 'stats'))
+		if args.command == 'stats':
+			show_stats(db)
+		elif args.command == 'compact':
+			compact(db, args.stale)
+		else:
+			populate(db, args)
+
+		# done
+		delta = datetime.now() - start_dd
+		print(f"Time difference is {delta.total_seconds()} seconds")
+
+	# errors never go into the output, which may be stdout
+	except OSError as err:
+		print("OS error: {0}".format(err), file=sys.stderr)
+		print(traceback.format_exc(), file=sys.stderr)
+		sys.exit(1)
+	except ValueError as ve:
+		print(ve, file=sys.stderr)
+		print(traceback.format_exc(), file=sys.stderr)
+		sys.exit(1)
+	except Exception:
+		print("Unexpected error:", sys.exc_info(), file=sys.stderr)
+		print(traceback.format_exc(), file=sys.stderr)
+		sys.exit(1)
+
+if __name__ == '__main__':
+	create_app()
@@ -8,6 +8,15 @@
 # @section DESCRIPTION
 # 
 #   indictrans_cli.py : test program for indictrans
+#
+#   indictrans-cli -s hin -t eng -q <query>
+#   indictrans-cli -s hin -t eng -i corpus.txt -o corpus.eng -j 8
+#   indictrans-cli -s hin -t eng -i corpus.txt -o corpus.eng -j 8 --corpus
+#   indictrans-cli -s hin -t eng --tsv --column 2 < records.tsv
+#   indictrans-cli -s hin -t eng --jsonl --column text < records.jsonl
+#
+# Files and stdin are streamed: lines are read, transliterated by `--jobs`
+# processes and written in order in blocks, in constant memory.
 # 
 # @section LICENSE
 # 
@@ -25,8 +34,10 @@
 # CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 # 
 
+import io
 import sys
 import argparse
+from collections import deque
 from pathlib import Path
 import json
 from datetime import datetime
@@ -34,6 +45,77 @@ import traceback
 
 from indictrans.utils.HandleCommonUtils import WXEncoder, UrduNormalizer
 from indictrans.utils.Transliterator import Transliterator
+from indictrans.utils.HandleDecoders import DECODERS, ONE_BEST
+
+# bytes of output written at once
+BLOCK_SIZE = 1 << 20
+
+def split_record(line, args):
+	"""(record, text to transliterate) of an input line."""
+	if args.tsv:
+		fields = line.rstrip('\n').split('\t')
+		return fields, fields[args.column] if args.column < len(fields) else ''
+	if args.jsonl:
+		obj = json.loads(line) if line.strip() else None
+		if not isinstance(obj, dict):
+			# blank lines and other JSON values pass through as they are
+			return line if line.endswith('\n') else line + '\n', ''
+		value = obj.get(args.column)
+		return obj, value if isinstance(value, str) else ''
+	return None, line
+
+def join_record(record, tline, args):
+	"""The output line of a record and its transliterated text."""
+	if args.tsv:
+		if args.column < len(record):
+			record[args.column] = tline
+		return '\t'.join(record) + '\n'
+	if args.jsonl:
+		if not isinstance(record, dict):
+			return record
+		if isinstance(record.get(args.column), str):
+			record[args.column] = tline
+		return json.dumps(record, ensure_ascii=False) + '\n'
+	return tline
+
+def stream(trn, ifp, args):
+	"""Output lines of the lines of ifp, in order."""
+	# records wait here while their text is with the workers
+	records = deque()
+	def texts():
+		for line in ifp:
+			record, text = split_record(line, args)
+			records.append(record)
+			yield text
+	for tline in trn.convert_many(texts(), workers=args.jobs, chunksize=args.chunksize):
+		yield join_record(records.popleft(), tline, args)
+
+def process_args(args):
+	"""Transliterates the input file (or stdin) into the output file (or stdout)."""
+	if not args.rb and args.decode not in ONE_BEST:
+		raise ValueError("streaming needs a one-best decoder")
+	if args.corpus and (not args.infile or args.tsv or args.jsonl):
+		raise ValueError("--corpus reads plain text from an --input file")
+	# initialize transliterator object
+	trn = Transliterator(args.source, args.target, decode=args.decode, rb=args.rb,
+		build_lookup=args.build_lookup, lexicon=args.lexicon)
+	if args.infile:
+		ifp = io.open(args.infile, encoding='utf-8')
+	else:
+		ifp = io.open(sys.stdin.fileno(), encoding='utf-8', closefd=False)
+	if args.outfile:
+		ofp = io.open(args.outfile, mode='w', encoding='utf-8', buffering=BLOCK_SIZE)
+	else:
+		ofp = io.open(sys.stdout.fileno(), mode='w', encoding='utf-8', buffering=BLOCK_SIZE, closefd=False)
+
+	# transliterate text
+	with ifp, ofp:
+		if args.corpus:
+			tlines = trn.convert_corpus(args.infile, workers=args.jobs, chunksize=args.chunksize)
+		else:
+			tlines = stream(trn, ifp, args)
+		for tline in tlines:
+			ofp.write(tline)
 
 def create_app():
 
@@ -50,8 +132,26 @@ def create_app():
 	parser.add_argument( '-b', '--build-lookup', dest="build_lookup", action='store_true', help='build lookup to fasten transliteration')
 	group.add_argument( '-r', '--rb', metavar='', help='use rule-based system for transliteration', action=argparse.BooleanOptionalAction)
 	parser.add_argument( '-x', '--xtest', metavar='', help="test all: " % languages, action=argparse.BooleanOptionalAction)
+	parser.add_argument( '-d', '--decode', dest="decode", choices=sorted(DECODERS), default="viterbi", metavar='', help="decoder")
+	parser.add_argument( '-l', '--lexicon', dest="lexicon", type=str, metavar='', help="<lexicon> of indictrans-lexicon")
+	parser.add_argument( '-i', '--input', dest="infile", type=str, metavar='', help="<input-file> (default: stdin)")
+	parser.add_argument( '-o', '--output', dest="outfile", type=str, metavar='', help="<output-file> (default: stdout)")
+	parser.add_argument( '-j', '--jobs', dest="jobs", type=int, default=1, metavar='', help="worker processes (0: one per CPU)")
+	parser.add_argument( '--corpus', action='store_true', help="two passes over --input: transliterate each distinct word once")
+	parser.add_argument( '--chunksize', dest="chunksize", type=int, default=1000, metavar='', help="lines per task of a worker")
+	records = parser.add_mutually_exclusive_group()
+	records.add_argument( '--tsv', action='store_true', help="transliterate field --column (0-based) of tab-separated lines")
+	records.add_argument( '--jsonl', action='store_true', help="transliterate key --column of JSON lines")
+	parser.add_argument( '-c', '--column', dest="column", metavar='', help="field index or JSON key")
 
 	args = parser.parse_args()
+	if args.tsv or args.jsonl:
+		if args.column is None:
+			parser.error("--tsv and --jsonl need --column")
+		if args.tsv:
+			args.column = int(args.column)
+	# timings do not go into streamed output
+	log = sys.stdout if args.xtest or args.query else sys.stderr
 	start_dd = datetime.now()
 
 	try:
@@ -78,30 +178,40 @@ def create_app():
 						else:
 							print (f"Test {yy} -> {xx} rb={rb}: NOT SUPPORTED")
 
-		else:
-			if (not args.source) or (not args.target) or (not args.query):
-				raise ValueError("query, source and target are needed")
+		elif args.query:
+			if (not args.source) or (not args.target):
+				raise ValueError("source and target are needed")
 			if args.source == args.target:
 				raise ValueError("source and target should be different")
 			# initialize transliterator object
-			trn = Transliterator(args.source, args.target, rb=args.rb, build_lookup=args.build_lookup)
+			trn = Transliterator(args.source, args.target, decode=args.decode, rb=args.rb,
+				build_lookup=args.build_lookup, lexicon=args.lexicon)
 			# transliterate text
 			tline = trn.convert(args.query)
 			print ( tline)
 
+		else:
+			if args.source == args.target:
+				raise ValueError("source and target should be different")
+			process_args(args)
+
 		# done
 		delta = datetime.now() - start_dd
-		print(f"Time difference is {delta.total_seconds()} seconds")
+		print(f"Time difference is {delta.total_seconds()} seconds", file=log)
 
+	# errors never go into the output, which may be stdout
 	except OSError as err:
-		print("OS error: {0}".format(err))
-		print(traceback.format_exc())
+		print("OS error: {0}".format(err), file=sys.stderr)
+		print(traceback.format_exc(), file=sys.stderr)
+		sys.exit(1)
 	except ValueError as ve:
-		print(ve)
-		print(traceback.format_exc())
-	except:
-		print("Unexpected error:", sys.exc_info())
-		print(traceback.format_exc())
+		print(ve, file=sys.stderr)
+		print(traceback.format_exc(), file=sys.stderr)
+		sys.exit(1)
+	except Exception:
+		print("Unexpected error:", sys.exc_info(), file=sys.stderr)
+		print(traceback.format_exc(), file=sys.stderr)
+		sys.exit(1)
 
 if __name__ == '__main__':
 	create_app()
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+#
+# @project IndicTrans
+# @file src/indictrans/apps/indictrans_lexicon.py
+# @author  Shreos Roychowdhury <shreos@tirja.com>
+# @version 1.0.0
+#
+# @section DESCRIPTION
+#
+#   indictrans_lexicon.py : compiles a corpus vocabulary into a read-only lexicon
+#
+#   indictrans-lexicon compile -s hin -t eng -n 200000 -o hin-eng.lex freq.tsv
+#   indictrans-lexicon info hin-eng.lex
+#
+# The input is a word-frequency list, one `word<TAB>count` (or just `word`) per
+# line. Words are normalized as the transliterator does, the most frequent
+# types are transliterated by worker processes, and the result is written
+# with Lexicon.save, to be passed as Transliterator(..., lexicon=path).
+#
+# @section LICENSE
+#
+# Copyright (c) 2025 Shreos Roychowdhury.
+# Copyright (c) 2025 Tirja Consulting LLP.
+#
+# This source code is released under GNU Affero General Public License.
+# Please refer https://www.gnu.org/licenses/agpl-3.0.en.html#license-text
+#
+# THE SOFTWARE IS PROVIDED , WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+import io
+import os
+import sys
+import argparse
+import multiprocessing
+from collections import Counter
+from datetime import datetime
+import traceback
+
+from indictrans.utils.Lexicon import Lexicon
+from indictrans.utils.Transliterator import Transliterator
+from indictrans.utils.HandleDecoders import DECODERS, ONE_BEST
+
+# transliterator of a worker process
+_trans = None
+
+def model_transliterator(source, target, decode):
+	trn = Transliterator(source, target, decode=decode, rb=False)
+	if not trn.check():
+		raise ValueError(f"{source}-{target} is not transliterated by a model")
+	return trn.transform.__self__
+
+def init_worker(source, target, decode):
+	global _trans
+	_trans = model_transliterator(source, target, decode)
+
+def trans_chunk(args):
+	words, k_best = args
+	return _trans.trans_words(words, k_best)
+
+def read_vocabulary(trans, inputs):
+	"""Counts of the normalized words of the frequency lists."""
+	counts = Counter()
+	for name in inputs:
+		fp = io.open(sys.stdin.fileno(), encoding='utf-8', closefd=False) if name == '-' else io.open(name, encoding='utf-8')
+		with fp:
+			for line in fp:
+				fields = line.split()
+				if not fields:
+					continue
+				count = int(fields[1]) if len(fields) > 1 and fields[1].isdigit() else 1
+				for word in trans.non_alpha.split(trans.convert_to_wx(fields[0])):
+					if word and word[0] in trans.letters:
+						counts[word] += count
+	return counts
+
+def compile_lexicon(args):
+	trans = model_transliterator(args.source, args.target, args.decode)
+	counts = read_vocabulary(trans, args.inputs or ['-'])
+	words = sorted(counts, key=lambda w: (-counts[w], w))
+	if args.top:
+		words = words[:args.top]
+	k_best = args.k_best
+	chunks = [(words[i:i + args.chunksize], k_best) for i in range(0, len(words), args.chunksize)]
+	outputs = []
+	if args.jobs > 1 and len(chunks) > 1:
+		with multiprocessing.Pool(args.jobs, init_worker, (args.source, args.target, args.decode)) as pool:
+			for t_words in pool.imap(trans_chunk, chunks):
+				outputs.extend(t_words)
+	else:
+		for chunk, k in chunks:
+			outputs.extend(trans.trans_words(chunk, k))
+	k = 0 if args.decode in ONE_BEST else k_best
+	Lexicon.save(args.output, dict(zip(words, outputs)), trans.pair, args.decode, k, trans.model_checksum())
+	print(f"Compiled {len(words)} of {len(counts)} words into {args.output}")
+
+def show_info(path):
+	lexicon = Lexicon(path)
+	for key, value in lexicon.meta.items():
+		print(f"{key:>9s} {value}")
+	size = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+	print(f"{size:>9d} bytes")
+
+def create_app():
+
+	languages = '''eng hin guj pan ben mal kan tam tel ori mar nep bod kok asm urd'''.split()
+	lang_help = "select language (3 letter ISO-639 code) {%s}" % ( ', '.join(languages))
+
+	parser = argparse.ArgumentParser( prog="indictrans-lexicon", description="Compile a corpus vocabulary into a read-only transliteration lexicon")
+	parser.add_argument('-v', '--version', action="version", version="%(prog)s 1.0")
+	commands = parser.add_subparsers(dest='command', required=True)
+
+	cmd = commands.add_parser('compile', help="transliterate the words of frequency lists (or stdin)")
+	cmd.add_argument( '-s', '--source', dest="source", choices=languages, default="hin", metavar='', help="%s" % lang_help)
+	cmd.add_argument( '-t', '--target', dest="target", choices=languages, default="eng", metavar='', help="%s" % lang_help)
+	cmd.add_argument( '-d', '--decode', dest="decode", choices=sorted(DECODERS), default="viterbi", metavar='', help="decoder")
+	cmd.add_argument( '-k', '--k-best', dest="k_best", type=int, default=5, metavar='', help="candidates of k-best decoders")
+	cmd.add_argument( '-n', '--top', dest="top", type=int, default=0, metavar='', help="keep the n most frequent words (default: all)")
+	cmd.add_argument( '-j', '--jobs', dest="jobs", type=int, default=os.cpu_count() or 1, metavar='', help="worker processes")
+	cmd.add_argument( '--chunksize', dest="chunksize", type=int, default=2000, metavar='', help="words per task of a worker")
+	cmd.add_argument( '-o', '--output', dest="output", required=True, metavar='<dir>', help="lexicon directory")
+	cmd.add_argument( 'inputs', nargs='*', metavar='<file>', help="UTF-8 lines of `word<TAB>count`")
+
+	cmd = commands.add_parser('info', help="pair, decoder, model checksum and size of a lexicon")
+	cmd.add_argument( 'path', metavar='<dir>', help="lexicon directory")
+
+	args = parser.parse_args()
+	start_dd = datetime.now()
+
+	try:
+		if args.command == 'info':
+			show_info(args.path)
+		else:
+			compile_lexicon(args)
+
+		# done
+		delta = datetime.now() - start_dd
+		print(f"Time difference is {delta.total_seconds()} seconds")
+
+	# errors never go into the output, which may be stdout
+	except OSError as err:
+		print("OS error: {0}".format(err), file=sys.stderr)
+		print(traceback.format_exc(), file=sys.stderr)
+		sys.exit(1)
+	except ValueError as ve:
+		print(ve, file=sys.stderr)
+		print(traceback.format_exc(), file=sys.stderr)
+		sys.exit(1)
+	except Exception:
+		print("Unexpected error:", sys.exc_info(), file=sys.stderr)
+		print(traceback.format_exc(), file=sys.stderr)
+		sys.exit(1)
+
+if __name__ == '__main__':
+	create_app()
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+#
+# @project IndicTrans
+# @file src/indictrans/apps/indictrans_models.py
+# @author  Shreos Roychowdhury <shreos@tirja.com>
+# @version 1.0.0
+#
+# @section DESCRIPTION
+#
+#   indictrans_models.py : converts npz model archives to the memory-mapped model store
+#
+# @section LICENSE
+#
+# Copyright (c) 2025 Shreos Roychowdhury.
+# Copyright (c) 2025 Tirja Consulting LLP.
+#
+# This source code is released under GNU Affero General Public License.
+# Please refer https://www.gnu.org/licenses/agpl-3.0.en.html#license-text
+#
+# THE SOFTWARE IS PROVIDED , WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+import os
+import sys
+import argparse
+from datetime import datetime
+import traceback
+
+from indictrans.utils.ModelStore import ModelStore, MODEL_DIR
+
+def create_app():
+
+	parser = argparse.ArgumentParser( prog="indictrans-models", description="Convert npz model archives to the memory-mapped model store")
+
+	parser.add_argument('-v', '--version', action="version", version="%(prog)s 1.0")
+	parser.add_argument( '-n', '--npz', dest="npzfile", type=str, default=os.path.join(MODEL_DIR, 'npzdata.npz'), metavar='', help="<npzdata.npz>")
+	parser.add_argument( '-e', '--vec', dest="vecfile", type=str, default=os.path.join(MODEL_DIR, 'vecdata.npz'), metavar='', help="<vecdata.npz>")
+	parser.add_argument( '-o', '--output', dest="outdir", type=str, default=MODEL_DIR, metavar='', help="<output-dir>")
+	parser.add_argument( '-p', '--pairs', dest="pairs", nargs='*', metavar='', help="convert only these pairs (e.g. hin-eng)")
+	parser.add_argument( '-l', '--list', dest="list", action='store_true', help="list pairs in the output store")
+
+	args = parser.parse_args()
+	start_dd = datetime.now()
+
+	try:
+		store = ModelStore(args.outdir)
+		if args.list:
+			for pair in store.pairs():
+				print (pair)
+		else:
+			for pair in store.convert_npz(args.npzfile, args.vecfile, args.pairs):
+				print (f"Converted {pair} -> {store.pair_dir(pair)}")
+
+		# done
+		delta = datetime.now() - start_dd
+		print(f"Time difference is {delta.total_seconds()} seconds")
+
+	except OSError as err:
+		print("OS error: {0}".format(err))
+		print(traceback.format_exc())
+	except:
+		print("Unexpected error:", sys.exc_info())
+		print(traceback.format_exc())
+
+if __name__ == '__main__':
+	create_app()
@@ -7,7 +7,13 @@
 # 
 # @section DESCRIPTION
 # 
-#   __init__.py : adapter using pyximport
+#   __init__.py : adapter for the compiled cython extensions
+#
+# The extensions are built ahead of time by setup.py (wheel / pip install /
+# `python setup.py build_ext --inplace`). Only a source checkout without a
+# build falls back to pyximport, and the import hook is removed right after.
+# Without cython or a compiler the pure numpy kernels in npdecode are used,
+# and there is no fused WordKernel.
 # 
 # @section LICENSE
 # 
@@ -25,10 +31,35 @@
 # CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 # 
 
-import numpy
-import pyximport
-pyximport.install( setup_args={ "include_dirs" : numpy.get_include() }, reload_support=True)
-from .sparseadd import sparse_add
-from .beamsearch import beamsearch_decode
-from .ctranxn import count_tranxn
-from .viterbi import viterbi_decode
+COMPILED = True
+
+try:
+	from .sparseadd import sparse_add
+	from .beamsearch import beamsearch_decode
+	from .ctranxn import count_tranxn
+	from .viterbi import (viterbi_decode, viterbi_decode_batch, kbest_viterbi_decode,
+		greedy_decode, greedy_decode_batch)
+	from .wordkernel import WordKernel
+except ImportError:
+	try:
+		import os
+		import numpy
+		import pyximport
+		# the source root too, for `cimport`s between the extensions
+		src_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+		importers = pyximport.install( setup_args={ "include_dirs" : [numpy.get_include(), src_dir] }, language_level=3)
+		try:
+			from .sparseadd import sparse_add
+			from .beamsearch import beamsearch_decode
+			from .ctranxn import count_tranxn
+			from .viterbi import (viterbi_decode, viterbi_decode_batch, kbest_viterbi_decode,
+				greedy_decode, greedy_decode_batch)
+			from .wordkernel import WordKernel
+		finally:
+			pyximport.uninstall(*importers)
+	except ImportError:
+		COMPILED = False
+		from .npdecode import (sparse_add, beamsearch_decode, count_tranxn, viterbi_decode,
+			viterbi_decode_batch, kbest_viterbi_decode, greedy_decode, greedy_decode_batch)
+		# the fused word kernel only exists compiled
+		WordKernel = None
@@ -1,60 +1,145 @@
 # Copyright Irshad Ahmad Bhat 2015.
+# Beam search decoding.
+#
+# The beam lives in preallocated C arrays and runs without the GIL. Each step
+# keeps the best `beamwidth` candidates in a small sorted array, so most
+# candidates are rejected with one comparison. Paths are kept as backpointers
+# and rebuilt only at the end. Ties are broken like the sort of
+# (score, state, path) tuples this decoder used before, so results are unchanged.
+
 cimport cython
 cimport numpy as np
 import numpy as np
+from libc.stdlib cimport malloc, free
 
 np.import_array()
 
-cdef np.float64_t NEGINF = -np.inf
+cdef struct Item:
+	np.float64_t score
+	np.npy_intp state
+	np.npy_intp rank    # lexicographic rank of the path (of the parent path for candidates)
+	np.npy_intp parent  # index of the parent in the previous beam
+
+cdef inline bint _better(Item *a, np.float64_t score, np.npy_intp state, np.npy_intp rank) noexcept nogil:
+	"""(score, state, rank) > (a.score, a.state, a.rank)"""
+	if score != a.score:
+		return score > a.score
+	if state != a.state:
+		return state > a.state
+	return rank > a.rank
+
+cdef np.npy_intp _push(Item *top, np.npy_intp size, np.npy_intp width,
+			np.float64_t score, np.npy_intp state, np.npy_intp rank,
+			np.npy_intp parent) noexcept nogil:
+	"""Inserts a candidate into top, kept sorted best first; returns its new size."""
+	cdef np.npy_intp pos
+	if size == width:
+		if not _better(&top[size - 1], score, state, rank):
+			return size
+		pos = size - 1
+	else:
+		pos = size
+		size += 1
+	while pos > 0 and _better(&top[pos - 1], score, state, rank):
+		top[pos] = top[pos - 1]
+		pos -= 1
+	top[pos].score = score
+	top[pos].state = state
+	top[pos].rank = rank
+	top[pos].parent = parent
+	return size
 
 @cython.boundscheck(False)
 @cython.wraparound(False)
-def beamsearch_decode(np.ndarray[ndim=2, dtype=np.float64_t] emissions,
-		   np.ndarray[ndim=2, dtype=np.float64_t] b_trans,
-		   np.ndarray[ndim=1, dtype=np.float64_t] init,
-		   np.ndarray[ndim=1, dtype=np.float64_t] final,
-		   np.uint8_t beamwidth):
+cdef np.npy_intp _search(np.float64_t[:, :] emissions,
+			const np.float64_t[:, :] b_trans,
+			const np.float64_t[:] init,
+			const np.float64_t[:] final,
+			np.npy_intp width, Item *beam, Item *top,
+			np.npy_intp[:, :] states, np.npy_intp[:, :] parents) noexcept nogil:
+	"""Runs the search, leaving the final beam in top; returns its size."""
+
+	cdef np.npy_intp i, j, k, b, u, size, n_top, rank
+	cdef np.npy_intp n_samples = emissions.shape[0]
+	cdef np.npy_intp n_states = emissions.shape[1]
+	cdef np.float64_t em_score
 
-	cdef tuple new_seq, beamItem
-	cdef np.npy_intp n_samples, n_states
-	cdef list sequences, newSequences, partial
-	cdef np.float64_t score, em_score, prevScore
-	cdef np.uint16_t i, j, k
-	
-	sequences = list() 
-	n_states = emissions.shape[1]
-	n_samples = emissions.shape[0]
+	size = 0
+	n_top = 0
 	for j in range(n_states):
-		score = emissions[0, j] + init[j]
-		sequences.append((score, j, [j]))
-
-	sequences = sorted(sequences, reverse=True)
-	sequences = sequences[:beamwidth]
-
-	for i in range(1, n_samples):
-		newSequences = list()
-		for k in range(n_states):
-			em_score = emissions[i][k]
-			for beamItem in sequences:
-				j = beamItem[1]
-				prevScore = beamItem[0]
-				partial = beamItem[2][:] # copy by value
-				score = prevScore + b_trans[j][k] + em_score
-				partial.append(k)
-				new_seq = (score, k, partial)
-				newSequences.append(new_seq)
-		sequences = sorted(newSequences, reverse=True)
-		sequences = sequences[:beamwidth]
-	
-	newSequences = list()
-	for beamItem in sequences:
-		j = beamItem[1]
-		prevScore = beamItem[0]
-		partial = beamItem[2][:]
-		score = prevScore + final[j]
-		new_seq = (score, j, partial)
-		newSequences.append(new_seq)
-	sequences = sorted(newSequences, reverse=True)
-	sequences = sequences[:beamwidth]
-
-	return [sequence[2] for sequence in sequences]
+		n_top = _push(top, n_top, width, emissions[0, j] + init[j], j, j, -1)
+
+	for i in range(n_samples):
+		if i > 0:
+			n_top = 0
+			for k in range(n_states):
+				em_score = emissions[i, k]
+				for b in range(size):
+					n_top = _push(top, n_top, width,
+						beam[b].score + b_trans[beam[b].state, k] + em_score,
+						k, beam[b].rank, b)
+
+		# new path ranks: by parent path first, then by the new state
+		for b in range(n_top):
+			rank = 0
+			for u in range(n_top):
+				if top[u].rank < top[b].rank or (top[u].rank == top[b].rank and top[u].state < top[b].state):
+					rank += 1
+			beam[b] = top[b]
+			beam[b].rank = rank
+			states[i, b] = top[b].state
+			parents[i, b] = top[b].parent
+		size = n_top
+
+	n_top = 0
+	for b in range(size):
+		n_top = _push(top, n_top, width, beam[b].score + final[beam[b].state],
+			beam[b].state, beam[b].rank, b)
+	return n_top
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def beamsearch_decode(np.float64_t[:, :] emissions,
+		   const np.float64_t[:, :] b_trans,
+		   const np.float64_t[:] init,
+		   const np.float64_t[:] final,
+		   np.uint8_t beamwidth):
+
+	cdef np.npy_intp i, b, t, size
+	cdef np.npy_intp n_samples = emissions.shape[0]
+	cdef np.npy_intp width = beamwidth
+	cdef np.npy_intp[:, :] states, parents
+	cdef Item *beam
+	cdef Item *top
+	cdef list paths, path
+
+	if n_samples == 0 or width == 0:
+		return []
+
+	states = np.empty((n_samples, width), dtype=np.intp)
+	parents = np.empty((n_samples, width), dtype=np.intp)
+	beam = <Item *> malloc(width * sizeof(Item))
+	top = <Item *> malloc(width * sizeof(Item))
+	if beam == NULL or top == NULL:
+		free(beam)
+		free(top)
+		raise MemoryError()
+
+	try:
+		with nogil:
+			size = _search(emissions, b_trans, init, final, width, beam, top, states, parents)
+
+		paths = list()
+		for t in range(size):
+			b = top[t].parent
+			path = [states[n_samples - 1, b]]
+			for i in range(n_samples - 1, 0, -1):
+				b = parents[i, b]
+				path.append(states[i - 1, b])
+			path.reverse()
+			paths.append(path)
+	finally:
+		free(beam)
+		free(top)
+
+	return paths
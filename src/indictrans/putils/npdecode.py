@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+#
+# @project IndicTrans
+# @file src/indictrans/putils/npdecode.py
+# @author  Shreos Roychowdhury <shreos@tirja.com>
+# @version 1.0.0
+#
+# @section DESCRIPTION
+#
+#   npdecode.py : pure numpy versions of the cython kernels
+#
+# Used when the compiled extensions are unavailable, and as a reference to
+# benchmark them against. Decoders are vectorized over states: one broadcasted
+# operation per time step, and give the same paths as the cython decoders.
+#
+# @section LICENSE
+#
+# Copyright (c) 2025 Shreos Roychowdhury.
+# Copyright (c) 2025 Tirja Consulting LLP.
+#
+# This source code is released under GNU Affero General Public License.
+# Please refer https://www.gnu.org/licenses/agpl-3.0.en.html#license-text
+#
+# THE SOFTWARE IS PROVIDED , WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+import numpy as np
+from scipy.sparse import isspmatrix_csc
+
+def _pred_step(prev, b_vals, emissions, pred_indptr, pred_indices, targets):
+	"""One step over predecessor lists, for prev of shape (n_words, n_states):
+	returns the best scores and their predecessors, the lowest on ties."""
+	cand = prev[:, pred_indices] + b_vals + emissions[:, targets]
+	best = np.maximum.reduceat(cand, pred_indptr[:-1], axis=1)
+	pos = np.where(cand == best[:, targets], np.arange(cand.shape[1]), cand.shape[1])
+	return best, pred_indices[np.minimum.reduceat(pos, pred_indptr[:-1], axis=1)]
+
+def _pred_lists(b_trans, pred_indptr, pred_indices):
+	"""Target state and transition weight of every predecessor list entry."""
+	targets = np.repeat(np.arange(pred_indptr.shape[0] - 1), np.diff(pred_indptr))
+	return targets, b_trans[pred_indices, targets]
+
+def viterbi_decode(score, b_trans, init, final, pred_indptr=None, pred_indices=None):
+	"""Viterbi decoding, one `score[:,None] + b_trans` max/argmax per time step, or
+	one step over the predecessor lists of SparseTransitions when given."""
+	n_samples, n_states = score.shape
+	if n_samples == 0:
+		return np.empty(0, dtype=np.intp)
+	backp = np.empty((n_samples, n_states), dtype=np.intp)
+	cols = np.arange(n_states)
+	if pred_indptr is not None:
+		targets, b_vals = _pred_lists(b_trans, pred_indptr, pred_indices)
+
+	prev = score[0] + init
+	for i in range(1, n_samples):
+		if pred_indptr is None:
+			cand = prev[:, None] + b_trans + score[i]
+			backp[i] = cand.argmax(axis=0)
+			prev = cand[backp[i], cols]
+		else:
+			best, preds = _pred_step(prev[None], b_vals, score[i, None], pred_indptr, pred_indices, targets)
+			prev, backp[i] = best[0], preds[0]
+	prev = prev + final
+
+	# Path backtracking
+	path = np.empty(n_samples, dtype=np.intp)
+	path[n_samples - 1] = prev.argmax()
+	for i in range(n_samples - 2, -1, -1):
+		path[i] = backp[i + 1, path[i + 1]]
+	return path
+
+def viterbi_decode_batch(score, offsets, b_trans, init, final, pred_indptr=None, pred_indices=None):
+	"""Viterbi decoding of many sequences in ragged (CSR) layout, see
+	viterbi.viterbi_decode_batch. Sequences are bucketed by length, so each
+	bucket is decoded as one (n_words, n_states, n_states) step without padding."""
+	n_states = score.shape[1]
+	lengths = np.diff(offsets)
+	path = np.empty(score.shape[0], dtype=np.intp)
+	cols = np.arange(n_states)
+	if pred_indptr is not None:
+		targets, b_vals = _pred_lists(b_trans, pred_indptr, pred_indices)
+
+	for n_samples in np.unique(lengths):
+		if n_samples == 0:
+			continue
+		words = np.flatnonzero(lengths == n_samples)
+		rows = offsets[words][:, None] + np.arange(n_samples)
+		emissions = score[rows]
+		backp = np.empty((words.shape[0], n_samples, n_states), dtype=np.intp)
+
+		prev = emissions[:, 0] + init
+		for i in range(1, n_samples):
+			if pred_indptr is None:
+				cand = prev[:, :, None] + b_trans + emissions[:, i, None, :]
+				backp[:, i] = cand.argmax(axis=1)
+				prev = cand[np.arange(words.shape[0])[:, None], backp[:, i], cols]
+			else:
+				prev, backp[:, i] = _pred_step(prev, b_vals, emissions[:, i], pred_indptr, pred_indices, targets)
+		prev = prev + final
+
+		# Path backtracking
+		best = np.empty((words.shape[0], n_samples), dtype=np.intp)
+		best[:, n_samples - 1] = prev.argmax(axis=1)
+		for i in range(n_samples - 2, -1, -1):
+			best[:, i] = backp[np.arange(words.shape[0]), i + 1, best[:, i + 1]]
+		path[rows] = best
+	return path
+
+def greedy_decode(score, b_trans, init, final):
+	"""Greedy decoding: the best state at each position given the previous one only."""
+	n_samples = score.shape[0]
+	path = np.empty(n_samples, dtype=np.intp)
+	for i in range(n_samples):
+		cand = score[0] + init if i == 0 else b_trans[path[i - 1]] + score[i]
+		if i == n_samples - 1:
+			cand = cand + final
+		path[i] = cand.argmax()
+	return path
+
+def greedy_decode_batch(score, offsets, b_trans, init, final):
+	"""Greedy decoding of many sequences in ragged (CSR) layout, one step of all
+	sequences at a time."""
+	lengths = np.diff(offsets)
+	path = np.empty(score.shape[0], dtype=np.intp)
+	for i in range(lengths.max() if lengths.shape[0] else 0):
+		words = np.flatnonzero(lengths > i)
+		rows = offsets[words] + i
+		cand = score[rows] + init if i == 0 else b_trans[path[rows - 1]] + score[rows]
+		last = lengths[words] == i + 1
+		cand[last] = cand[last] + final
+		path[rows] = cand.argmax(axis=1)
+	return path
+
+def _top_k(score, state, rank, beamwidth):
+	"""Indices of the `beamwidth` best candidates, best first.
+
+	Ties are broken like python's sort of (score, state, path) tuples in
+	reverse order, `rank` being the lexicographic rank of the path so far.
+	"""
+	if score.shape[0] > beamwidth:
+		kth = score.shape[0] - beamwidth
+		threshold = np.partition(score, kth)[kth]
+		keep = np.flatnonzero(score >= threshold)
+	else:
+		keep = np.arange(score.shape[0])
+	order = np.lexsort((rank[keep], state[keep], score[keep]))[::-1]
+	return keep[order[:beamwidth]]
+
+def beamsearch_decode(emissions, b_trans, init, final, beamwidth):
+	"""Beam search, top-k selection with argpartition; paths are kept as
+	backpointers and rebuilt at the end."""
+	n_samples, n_states = emissions.shape
+	if n_samples == 0:
+		return []
+	states = np.arange(n_states)
+
+	# beam: scores, states, lexicographic path rank, parent beam index
+	cand = emissions[0] + init
+	best = _top_k(cand, states, states, beamwidth)
+	scores, beam, rank = cand[best], states[best], states[best]
+	parents = []
+	history = [beam]
+
+	for i in range(1, n_samples):
+		width = beam.shape[0]
+		# candidates are laid out as (state, beam item)
+		cand = (scores[None, :] + b_trans[beam, :].T + emissions[i][:, None]).ravel()
+		cand_state = np.repeat(states, width)
+		cand_parent = np.tile(np.arange(width), n_states)
+		# path order: previous path first, then the new state
+		cand_rank = np.argsort(np.lexsort((cand_state, rank[cand_parent])))
+		best = _top_k(cand, cand_state, cand_rank, beamwidth)
+		scores, beam = cand[best], cand_state[best]
+		rank = np.argsort(np.argsort(cand_rank[best]))
+		parents.append(cand_parent[best])
+		history.append(beam)
+
+	scores = scores + final[beam]
+	best = _top_k(scores, beam, rank, beamwidth)
+
+	paths = []
+	for b in best:
+		path = [int(history[-1][b])]
+		for i in range(len(parents) - 1, -1, -1):
+			b = parents[i][b]
+			path.append(int(history[i][b]))
+		paths.append(path[::-1])
+	return paths
+
+def kbest_viterbi_decode(score, b_trans, init, final, k_best):
+	"""Exact k best paths, see viterbi.kbest_viterbi_decode. Candidates of a step are
+	ordered with one stable argsort, which breaks ties the same way as the heap merge."""
+	n_samples, n_states = score.shape
+	if n_samples == 0 or n_states == 0 or k_best < 1:
+		return []
+
+	# delta[j, r]: score of the r-th best path ending in state j
+	delta = (score[0] + init)[:, None]
+	back, counts = [], []
+	for i in range(1, n_samples):
+		count = delta.shape[1]
+		# rows are (predecessor state, rank) pairs, in that order
+		cand = (delta[:, :, None] + b_trans[:, None, :] + score[i]).reshape(n_states * count, n_states)
+		order = np.argsort(-cand, axis=0, kind='stable')[:k_best]
+		delta = np.take_along_axis(cand, order, axis=0).T
+		back.append(order.T)
+		counts.append(count)
+
+	count = delta.shape[1]
+	best = np.argsort(-(delta + final[:, None]).ravel(), kind='stable')[:k_best]
+
+	paths = []
+	for flat in best:
+		state, rank = divmod(int(flat), count)
+		path = [state]
+		for i in range(len(back) - 1, -1, -1):
+			state, rank = divmod(int(back[i][state, rank]), counts[i])
+			path.append(state)
+		paths.append(path[::-1])
+	return paths
+
+def count_tranxn(y, n_classes):
+	"""Count transitions in y."""
+	trans = np.zeros((n_classes, n_classes), dtype=np.intp)
+	np.add.at(trans, (y[:-1], y[1:]), 1)
+	return trans
+
+def sparse_add(A, B):
+	"""A += B where B is a sparse (CSR or CSC) matrix."""
+	if isspmatrix_csc(B):
+		A = A.T
+	rows = np.repeat(np.arange(B.indptr.shape[0] - 1), np.diff(B.indptr))
+	np.add.at(A, (rows, B.indices), B.data)
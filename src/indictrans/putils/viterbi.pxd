@@ -0,0 +1,29 @@
+# Copyright Irshad Ahmad Bhat 2015.
+# Decoding kernels shared with the other extensions (see wordkernel.pyx).
+
+cimport numpy as np
+
+cdef void _viterbi(np.float64_t[:, :] score,
+			const np.float64_t[:, :] b_trans,
+			const np.float64_t[:] init,
+			const np.float64_t[:] final,
+			np.npy_intp[:, :] backp,
+			np.npy_intp[:] path,
+			np.npy_intp start, np.npy_intp end) noexcept nogil
+
+cdef void _viterbi_sparse(np.float64_t[:, :] score,
+			const np.float64_t[:, :] b_trans,
+			const np.float64_t[:] init,
+			const np.float64_t[:] final,
+			const np.npy_intp[:] pred_indptr,
+			const np.npy_intp[:] pred_indices,
+			np.npy_intp[:, :] backp,
+			np.npy_intp[:] path,
+			np.npy_intp start, np.npy_intp end) noexcept nogil
+
+cdef void _greedy(const np.float64_t[:, :] score,
+			const np.float64_t[:, :] b_trans,
+			const np.float64_t[:] init,
+			const np.float64_t[:] final,
+			np.npy_intp[:] path,
+			np.npy_intp start, np.npy_intp end) noexcept nogil
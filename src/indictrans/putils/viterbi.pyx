@@ -1,9 +1,13 @@
 # Copyright Irshad Ahmad Bhat 2015.
 # Decoding (inference) algorithms.
+#
+# The recursion is written on typed memoryviews and runs without the GIL, so
+# threads calling the decoders decode on separate cores.
 
 cimport cython
 cimport numpy as np
 import numpy as np
+from libc.stdlib cimport malloc, calloc, free
 
 np.import_array()
 
@@ -11,25 +15,27 @@ cdef np.float64_t NEGINF = -np.inf
 
 @cython.boundscheck(False)
 @cython.wraparound(False)
-def viterbi_decode(np.ndarray[ndim=2, dtype=np.float64_t] score,
-			np.ndarray[ndim=2, dtype=np.float64_t] b_trans,
-			np.ndarray[ndim=1, dtype=np.float64_t] init,
-			np.ndarray[ndim=1, dtype=np.float64_t] final):
+cdef void _viterbi(np.float64_t[:, :] score,
+			const np.float64_t[:, :] b_trans,
+			const np.float64_t[:] init,
+			const np.float64_t[:] final,
+			np.npy_intp[:, :] backp,
+			np.npy_intp[:] path,
+			np.npy_intp start, np.npy_intp end) noexcept nogil:
+	"""Decodes rows start:end of score into path[start:end]."""
 
-	cdef np.ndarray[ndim=2, dtype=np.npy_intp, mode='c'] backp
-	cdef np.ndarray[ndim=1, dtype=np.npy_intp, mode='c'] path
 	cdef np.float64_t candidate, maxval
-	cdef np.npy_intp i, j, k, n_samples, n_states
+	cdef np.npy_intp i, j, k, maxind
+	cdef np.npy_intp n_states = score.shape[1]
 
-	n_samples, n_states = score.shape[0], score.shape[1]
-
-	backp = np.empty((n_samples, n_states), dtype=np.intp)
+	if end <= start:
+		return
 
 	for j in range(n_states):
-		score[0, j] += init[j]
+		score[start, j] += init[j]
 
 	# Forward recursion. score is reused as the DP table.
-	for i in range(1, n_samples):
+	for i in range(start + 1, end):
 		for k in range(n_states):
 			maxind = 0
 			maxval = NEGINF
@@ -43,13 +49,425 @@ def viterbi_decode(np.ndarray[ndim=2, dtype=np.float64_t] score,
 			backp[i, k] = maxind
 
 	for j in range(n_states):
-		score[n_samples - 1, j] += final[j]
+		score[end - 1, j] += final[j]
 
 	# Path backtracking
-	path = np.empty(n_samples, dtype=np.intp)
-	path[n_samples - 1] = score[n_samples - 1, :].argmax()
+	maxind = 0
+	for j in range(1, n_states):
+		if score[end - 1, j] > score[end - 1, maxind]:
+			maxind = j
+	path[end - 1] = maxind
+
+	for i in range(end - 2, start - 1, -1):
+		path[i] = backp[i + 1, path[i + 1]]
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef void _viterbi_sparse(np.float64_t[:, :] score,
+			const np.float64_t[:, :] b_trans,
+			const np.float64_t[:] init,
+			const np.float64_t[:] final,
+			const np.npy_intp[:] pred_indptr,
+			const np.npy_intp[:] pred_indices,
+			np.npy_intp[:, :] backp,
+			np.npy_intp[:] path,
+			np.npy_intp start, np.npy_intp end) noexcept nogil:
+	"""_viterbi visiting only the predecessors pred_indices[pred_indptr[k]:pred_indptr[k + 1]]
+	of each state k, see SparseTransitions."""
+
+	cdef np.float64_t candidate, maxval
+	cdef np.npy_intp i, j, k, p, maxind
+	cdef np.npy_intp n_states = score.shape[1]
+
+	if end <= start:
+		return
+
+	for j in range(n_states):
+		score[start, j] += init[j]
+
+	for i in range(start + 1, end):
+		for k in range(n_states):
+			maxind = 0
+			maxval = NEGINF
+			for p in range(pred_indptr[k], pred_indptr[k + 1]):
+				j = pred_indices[p]
+				candidate = score[i - 1, j] + b_trans[j, k] + score[i, k]
+				if candidate > maxval:
+					maxind = j
+					maxval = candidate
+
+			score[i, k] = maxval
+			backp[i, k] = maxind
+
+	for j in range(n_states):
+		score[end - 1, j] += final[j]
 
-	for i in range(n_samples - 2, -1, -1):
+	maxind = 0
+	for j in range(1, n_states):
+		if score[end - 1, j] > score[end - 1, maxind]:
+			maxind = j
+	path[end - 1] = maxind
+
+	for i in range(end - 2, start - 1, -1):
 		path[i] = backp[i + 1, path[i + 1]]
 
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def viterbi_decode(np.float64_t[:, :] score,
+			const np.float64_t[:, :] b_trans,
+			const np.float64_t[:] init,
+			const np.float64_t[:] final,
+			const np.npy_intp[:] pred_indptr=None,
+			const np.npy_intp[:] pred_indices=None):
+	"""Viterbi decoding, over the predecessor lists pred_indptr/pred_indices of
+	SparseTransitions when given."""
+
+	cdef np.npy_intp n_samples = score.shape[0]
+	cdef np.npy_intp[:, :] backp = np.empty((n_samples, score.shape[1]), dtype=np.intp)
+	path = np.empty(n_samples, dtype=np.intp)
+	cdef np.npy_intp[:] path_v = path
+	cdef bint sparse = pred_indptr is not None
+
+	with nogil:
+		if sparse:
+			_viterbi_sparse(score, b_trans, init, final, pred_indptr, pred_indices, backp, path_v, 0, n_samples)
+		else:
+			_viterbi(score, b_trans, init, final, backp, path_v, 0, n_samples)
+
+	return path
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def viterbi_decode_batch(np.float64_t[:, :] score,
+			const np.npy_intp[:] offsets,
+			const np.float64_t[:, :] b_trans,
+			const np.float64_t[:] init,
+			const np.float64_t[:] final,
+			const np.npy_intp[:] pred_indptr=None,
+			const np.npy_intp[:] pred_indices=None):
+	"""Viterbi decoding of many sequences in one call.
+
+	score holds the sequences in ragged (CSR) layout: rows offsets[w]:offsets[w + 1]
+	are the emissions of sequence w. Returns the paths in the same layout.
+	"""
+
+	cdef np.npy_intp w
+	cdef np.npy_intp[:, :] backp = np.empty((score.shape[0], score.shape[1]), dtype=np.intp)
+	path = np.empty(score.shape[0], dtype=np.intp)
+	cdef np.npy_intp[:] path_v = path
+	cdef bint sparse = pred_indptr is not None
+
+	with nogil:
+		for w in range(offsets.shape[0] - 1):
+			if sparse:
+				_viterbi_sparse(score, b_trans, init, final, pred_indptr, pred_indices,
+					backp, path_v, offsets[w], offsets[w + 1])
+			else:
+				_viterbi(score, b_trans, init, final, backp, path_v, offsets[w], offsets[w + 1])
+
 	return path
+
+# Greedy decoding: the best state at each position given the previous state
+# only, i.e. a per-position argmax corrected by a single transition. It costs
+# O(n_states) per character against O(n_states ** 2) for Viterbi.
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef void _greedy(const np.float64_t[:, :] score,
+			const np.float64_t[:, :] b_trans,
+			const np.float64_t[:] init,
+			const np.float64_t[:] final,
+			np.npy_intp[:] path,
+			np.npy_intp start, np.npy_intp end) noexcept nogil:
+	"""Decodes rows start:end of score into path[start:end]."""
+
+	cdef np.float64_t candidate, maxval
+	cdef np.npy_intp i, k, maxind
+	cdef np.npy_intp n_states = score.shape[1]
+
+	for i in range(start, end):
+		maxind = 0
+		maxval = NEGINF
+		for k in range(n_states):
+			if i == start:
+				candidate = score[i, k] + init[k]
+			else:
+				candidate = b_trans[path[i - 1], k] + score[i, k]
+			if i == end - 1:
+				candidate += final[k]
+			if candidate > maxval:
+				maxind = k
+				maxval = candidate
+		path[i] = maxind
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def greedy_decode(const np.float64_t[:, :] score,
+			const np.float64_t[:, :] b_trans,
+			const np.float64_t[:] init,
+			const np.float64_t[:] final):
+
+	path = np.empty(score.shape[0], dtype=np.intp)
+	cdef np.npy_intp[:] path_v = path
+
+	with nogil:
+		_greedy(score, b_trans, init, final, path_v, 0, score.shape[0])
+
+	return path
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def greedy_decode_batch(const np.float64_t[:, :] score,
+			const np.npy_intp[:] offsets,
+			const np.float64_t[:, :] b_trans,
+			const np.float64_t[:] init,
+			const np.float64_t[:] final):
+	"""Greedy decoding of many sequences in ragged (CSR) layout, see viterbi_decode_batch."""
+
+	cdef np.npy_intp w
+	path = np.empty(score.shape[0], dtype=np.intp)
+	cdef np.npy_intp[:] path_v = path
+
+	with nogil:
+		for w in range(offsets.shape[0] - 1):
+			_greedy(score, b_trans, init, final, path_v, offsets[w], offsets[w + 1])
+
+	return path
+
+# k-best (list) Viterbi. The k best paths ending in a state at some time are a
+# merge of the sorted lists of its predecessors. The lists are built lazily:
+# a forward pass gives the best path of every state, as in viterbi_decode. A
+# state's next best path is computed only when a path through it is needed.
+# It is taken from a heap over its predecessors' lists, built on first use.
+# Ties go to the lower predecessor state, then to its better path, so the best
+# path is always the one viterbi_decode returns.
+
+cdef struct Entry:
+	np.float64_t score
+	np.npy_intp state
+	np.npy_intp rank
+
+cdef inline bint _before(Entry *a, Entry *b) noexcept nogil:
+	"""a is ranked before b"""
+	if a.score != b.score:
+		return a.score > b.score
+	if a.state != b.state:
+		return a.state < b.state
+	return a.rank < b.rank
+
+cdef void _sift_down(Entry *heap, np.npy_intp size, np.npy_intp pos) noexcept nogil:
+	"""Restores the heap order below pos, best entry on top."""
+	cdef np.npy_intp child
+	cdef Entry item = heap[pos]
+	while True:
+		child = 2 * pos + 1
+		if child >= size:
+			break
+		if child + 1 < size and _before(&heap[child + 1], &heap[child]):
+			child += 1
+		if not _before(&heap[child], &item):
+			break
+		heap[pos] = heap[child]
+		pos = child
+	heap[pos] = item
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef int _kth_best(np.float64_t[:, :] score,
+			const np.float64_t[:, :] b_trans,
+			np.float64_t[:, :, ::1] delta,
+			np.npy_intp[:, :, ::1] back_state,
+			np.npy_intp[:, :, ::1] back_rank,
+			np.npy_intp[:, ::1] n_found,
+			Entry **heaps, np.npy_intp *sizes,
+			np.npy_intp i, np.npy_intp s, np.npy_intp r) noexcept nogil:
+	"""Makes sure delta[i, s, r] holds the r-th best path ending in state s at
+	time i. Returns 1 if it exists, 0 if there are fewer paths, -1 when out of memory."""
+
+	cdef np.npy_intp j, rank, n_states = score.shape[1]
+	cdef np.npy_intp node = i * n_states + s
+	cdef Entry *heap
+	cdef int found
+
+	while n_found[i, s] <= r:
+		if i == 0:
+			return 0
+		heap = heaps[node]
+		if heap == NULL:
+			# on top is the best path, already found by the forward pass
+			heap = <Entry *> malloc(n_states * sizeof(Entry))
+			if heap == NULL:
+				return -1
+			for j in range(n_states):
+				heap[j].score = delta[i - 1, j, 0] + b_trans[j, s] + score[i, s]
+				heap[j].state = j
+				heap[j].rank = 0
+			for j in range(n_states // 2 - 1, -1, -1):
+				_sift_down(heap, n_states, j)
+			heaps[node] = heap
+			sizes[node] = n_states
+		if sizes[node] == 0:
+			return 0
+
+		# move the top, the last path found, on to the next path of its predecessor
+		j = heap[0].state
+		rank = heap[0].rank + 1
+		found = _kth_best(score, b_trans, delta, back_state, back_rank, n_found,
+			heaps, sizes, i - 1, j, rank)
+		if found < 0:
+			return found
+		if found:
+			heap[0].score = delta[i - 1, j, rank] + b_trans[j, s] + score[i, s]
+			heap[0].rank = rank
+		else:
+			sizes[node] -= 1
+			heap[0] = heap[sizes[node]]
+		_sift_down(heap, sizes[node], 0)
+		if sizes[node] == 0:
+			return 0
+
+		rank = n_found[i, s]
+		delta[i, s, rank] = heap[0].score
+		back_state[i, s, rank] = heap[0].state
+		back_rank[i, s, rank] = heap[0].rank
+		n_found[i, s] = rank + 1
+	return 1
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef np.npy_intp _kbest_viterbi(np.float64_t[:, :] score,
+			const np.float64_t[:, :] b_trans,
+			const np.float64_t[:] init,
+			const np.float64_t[:] final,
+			np.npy_intp k_best,
+			np.float64_t[:, :, ::1] delta,
+			np.npy_intp[:, :, ::1] back_state,
+			np.npy_intp[:, :, ::1] back_rank,
+			np.npy_intp[:, ::1] n_found,
+			Entry **heaps, np.npy_intp *sizes, Entry *heap, Entry *top) noexcept nogil:
+	"""Leaves the k best complete paths in top; returns their number, or -1
+	when out of memory."""
+
+	cdef np.npy_intp i, j, k, r, rank, maxind
+	cdef np.float64_t candidate, maxval
+	cdef np.npy_intp n_samples = score.shape[0]
+	cdef np.npy_intp n_states = score.shape[1]
+	cdef np.npy_intp size = n_states
+	cdef int found
+
+	# forward pass for the best paths
+	for j in range(n_states):
+		delta[0, j, 0] = score[0, j] + init[j]
+		n_found[0, j] = 1
+	for i in range(1, n_samples):
+		for k in range(n_states):
+			maxind = 0
+			maxval = NEGINF
+			for j in range(n_states):
+				candidate = delta[i - 1, j, 0] + b_trans[j, k] + score[i, k]
+				if candidate > maxval:
+					maxind = j
+					maxval = candidate
+			delta[i, k, 0] = maxval
+			back_state[i, k, 0] = maxind
+			back_rank[i, k, 0] = 0
+			n_found[i, k] = 1
+
+	# merge over the final states
+	for j in range(n_states):
+		heap[j].score = delta[n_samples - 1, j, 0] + final[j]
+		heap[j].state = j
+		heap[j].rank = 0
+	for j in range(n_states // 2 - 1, -1, -1):
+		_sift_down(heap, n_states, j)
+
+	for r in range(k_best):
+		top[r] = heap[0]
+		if r + 1 == k_best:
+			return k_best
+		j = heap[0].state
+		rank = heap[0].rank + 1
+		found = _kth_best(score, b_trans, delta, back_state, back_rank, n_found,
+			heaps, sizes, n_samples - 1, j, rank)
+		if found < 0:
+			return found
+		if found:
+			heap[0].score = delta[n_samples - 1, j, rank] + final[j]
+			heap[0].rank = rank
+		else:
+			size -= 1
+			heap[0] = heap[size]
+		_sift_down(heap, size, 0)
+		if size == 0:
+			return r + 1
+	return 0
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def kbest_viterbi_decode(np.float64_t[:, :] score,
+			const np.float64_t[:, :] b_trans,
+			const np.float64_t[:] init,
+			const np.float64_t[:] final,
+			np.npy_intp k_best):
+	"""Exact k best paths, best first, as lists of states."""
+
+	cdef np.npy_intp i, t, s, r, size, width
+	cdef np.npy_intp n_samples = score.shape[0]
+	cdef np.npy_intp n_states = score.shape[1]
+	cdef np.float64_t[:, :, ::1] delta
+	cdef np.npy_intp[:, :, ::1] back_state, back_rank
+	cdef np.npy_intp[:, ::1] n_found
+	cdef Entry **heaps
+	cdef np.npy_intp *sizes
+	cdef Entry *heap
+	cdef Entry *top
+	cdef list paths, path
+
+	if n_samples == 0 or n_states == 0 or k_best < 1:
+		return []
+
+	# no state has more than n_states ** i paths at time i
+	width = 1
+	for i in range(n_samples):
+		if width >= k_best:
+			break
+		width *= n_states
+	width = min(width, k_best)
+
+	delta = np.empty((n_samples, n_states, width), dtype=np.float64)
+	back_state = np.empty((n_samples, n_states, width), dtype=np.intp)
+	back_rank = np.empty((n_samples, n_states, width), dtype=np.intp)
+	n_found = np.empty((n_samples, n_states), dtype=np.intp)
+	heaps = <Entry **> calloc(n_samples * n_states, sizeof(Entry *))
+	sizes = <np.npy_intp *> malloc(n_samples * n_states * sizeof(np.npy_intp))
+	heap = <Entry *> malloc(n_states * sizeof(Entry))
+	top = <Entry *> malloc(width * sizeof(Entry))
+	try:
+		if heaps == NULL or sizes == NULL or heap == NULL or top == NULL:
+			raise MemoryError()
+
+		with nogil:
+			size = _kbest_viterbi(score, b_trans, init, final, width, delta, back_state,
+				back_rank, n_found, heaps, sizes, heap, top)
+		if size < 0:
+			raise MemoryError()
+
+		paths = list()
+		for t in range(size):
+			s, r = top[t].state, top[t].rank
+			path = [s]
+			for i in range(n_samples - 1, 0, -1):
+				s, r = back_state[i, s, r], back_rank[i, s, r]
+				path.append(s)
+			path.reverse()
+			paths.append(path)
+	finally:
+		if heaps != NULL:
+			for i in range(n_samples * n_states):
+				free(heaps[i])
+		free(heaps)
+		free(sizes)
+		free(heap)
+		free(top)
+
+	return paths
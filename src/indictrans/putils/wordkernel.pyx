@@ -0,0 +1,210 @@
+# Copyright Irshad Ahmad Bhat 2015.
+# Fused word -> target string kernel.
+#
+# Runs the whole model path of a word in one call: letter codes, n-gram keys
+# and their column ids (NgramFeaturizer), emission scores (EmissionScorer),
+# decoding, and the labels of the path. All but the first and last step run
+# without the GIL on scratch buffers kept per thread, and the results are the
+# same as those of the separate steps.
+
+cimport cython
+cimport numpy as np
+import numpy as np
+import threading
+
+from .viterbi cimport _viterbi, _viterbi_sparse, _greedy
+
+np.import_array()
+
+cdef class _Scratch:
+	"""Buffers of one thread, grown to the longest word seen."""
+
+	cdef np.npy_intp capacity
+	cdef np.int64_t[:] codes
+	cdef np.npy_intp[:] ids
+	cdef np.float64_t[:, :] score
+	cdef np.npy_intp[:, :] backp
+	cdef np.npy_intp[:] path
+
+	def __init__(self, np.npy_intp n_positions):
+		self.capacity = 0
+		self.ids = np.empty(n_positions, dtype=np.intp)
+
+	cdef void reserve(self, np.npy_intp n_samples, np.npy_intp n_pad, np.npy_intp n_states):
+		if n_samples <= self.capacity:
+			return
+		self.capacity = max(n_samples, 2 * self.capacity, 16)
+		self.codes = np.empty(self.capacity + 2 * n_pad, dtype=np.int64)
+		self.score = np.empty((self.capacity, n_states), dtype=np.float64)
+		self.backp = np.empty((self.capacity, n_states), dtype=np.intp)
+		self.path = np.empty(self.capacity, dtype=np.intp)
+
+cdef class WordKernel:
+	"""Transliterates letter sequences of one language pair.
+
+	Parameters
+	----------
+	featurizer : NgramFeaturizer of the pair
+	coef_t : dense transposed coef of EmissionScorer, with its trailing zero row
+	b_trans, init, final : transition weights
+	labels : output string of every class
+	greedy : greedy decoding instead of Viterbi
+	pred_indptr, pred_indices : predecessor lists of SparseTransitions, for Viterbi
+	"""
+
+	cdef dict codes
+	cdef np.int64_t unknown, base
+	cdef np.npy_intp n_pad, n_positions, n_features, n_states
+	cdef np.npy_intp[:] order
+	cdef np.npy_intp[:] first
+	cdef const np.int64_t[:] offsets
+	# open-addressing hash table of the n-gram keys
+	cdef np.uint64_t mask
+	cdef np.int64_t[:] slot_keys
+	cdef np.npy_intp[:] slot_cols
+	cdef const np.float64_t[:, :] coef_t
+	cdef const np.float64_t[:, :] b_trans
+	cdef const np.float64_t[:] init
+	cdef const np.float64_t[:] final
+	cdef const np.npy_intp[:] pred_indptr
+	cdef const np.npy_intp[:] pred_indices
+	cdef bint greedy, sparse
+	cdef tuple labels
+	cdef object local
+
+	def __init__(self, featurizer, coef_t, b_trans, init, final, labels, greedy=False,
+			pred_indptr=None, pred_indices=None):
+		self.codes = dict(featurizer.codes)
+		self.unknown = featurizer.unknown
+		self.base = featurizer.base
+		self.n_pad = featurizer.n
+		self.n_positions = len(featurizer.layout)
+		self.order = np.array([k for k, s in featurizer.layout], dtype=np.intp)
+		self.first = np.array([s for k, s in featurizer.layout], dtype=np.intp)
+		self.offsets = featurizer.offsets_
+		self.build_table(featurizer.keys_[:-1], featurizer.ids_[:-1])
+		self.coef_t = coef_t
+		self.n_features = self.coef_t.shape[0] - 1
+		self.n_states = self.coef_t.shape[1]
+		self.b_trans = b_trans
+		self.init = init
+		self.final = final
+		self.greedy = greedy
+		self.sparse = pred_indptr is not None and not greedy
+		if self.sparse:
+			self.pred_indptr = pred_indptr
+			self.pred_indices = pred_indices
+		# '_' marks labels without output
+		self.labels = tuple(label.replace('_', '') for label in labels)
+		if len(self.labels) != self.n_states:
+			raise ValueError('%d labels for %d classes' % (len(self.labels), self.n_states))
+		self.local = threading.local()
+
+	@cython.boundscheck(False)
+	@cython.wraparound(False)
+	cdef void build_table(self, const np.int64_t[:] keys, const np.int32_t[:] cols):
+		cdef np.npy_intp i
+		cdef np.uint64_t h
+		cdef np.npy_intp size = 16
+		while size < 2 * keys.shape[0]:
+			size *= 2
+		self.mask = size - 1
+		self.slot_keys = np.full(size, -1, dtype=np.int64)
+		self.slot_cols = np.empty(size, dtype=np.intp)
+		for i in range(keys.shape[0]):
+			h = self.slot(keys[i])
+			while self.slot_keys[h] != -1 and self.slot_keys[h] != keys[i]:
+				h = (h + 1) & self.mask
+			# of equal keys, the first in sorted order wins, as in NgramFeaturizer.lookup
+			if self.slot_keys[h] == -1:
+				self.slot_keys[h] = keys[i]
+				self.slot_cols[h] = cols[i]
+
+	cdef inline np.uint64_t slot(self, np.int64_t key) noexcept nogil:
+		return ((<np.uint64_t> key * 0x9E3779B97F4A7C15ULL) >> 32) & self.mask
+
+	cdef _Scratch scratch(self):
+		try:
+			return self.local.scratch
+		except AttributeError:
+			self.local.scratch = _Scratch(self.n_positions)
+			return self.local.scratch
+
+	@cython.boundscheck(False)
+	@cython.wraparound(False)
+	@cython.initializedcheck(False)
+	cdef void _emissions(self, _Scratch s, np.npy_intp n_samples) noexcept nogil:
+		"""Emission scores of the letter codes in s.codes, as EmissionScorer.emissions."""
+
+		cdef np.npy_intp i, p, w, c, col
+		cdef np.int64_t key
+		cdef np.uint64_t h
+		cdef np.npy_intp[:] ids = s.ids
+		cdef np.float64_t[:, :] score = s.score
+
+		for i in range(n_samples):
+			for p in range(self.n_positions):
+				# the key of NgramFeaturizer.keys
+				key = 0
+				for w in range(i + self.first[p], i + self.first[p] + self.order[p]):
+					key = key * self.base + s.codes[w]
+				key += self.offsets[p]
+				# unseen features add the zero row
+				col = self.n_features
+				h = self.slot(key)
+				while self.slot_keys[h] != -1:
+					if self.slot_keys[h] == key:
+						col = self.slot_cols[h]
+						break
+					h = (h + 1) & self.mask
+				# insertion sort: summing in ascending column order
+				w = p
+				while w > 0 and ids[w - 1] > col:
+					ids[w] = ids[w - 1]
+					w -= 1
+				ids[w] = col
+
+			for c in range(self.n_states):
+				score[i, c] = self.coef_t[ids[0], c]
+			for p in range(1, self.n_positions):
+				for c in range(self.n_states):
+					score[i, c] += self.coef_t[ids[p], c]
+
+	cdef void _decode(self, _Scratch s, np.npy_intp n_samples) noexcept nogil:
+		self._emissions(s, n_samples)
+		if self.greedy:
+			_greedy(s.score, self.b_trans, self.init, self.final, s.path, 0, n_samples)
+		elif self.sparse:
+			_viterbi_sparse(s.score, self.b_trans, self.init, self.final, self.pred_indptr,
+				self.pred_indices, s.backp, s.path, 0, n_samples)
+		else:
+			_viterbi(s.score, self.b_trans, self.init, self.final, s.backp, s.path, 0, n_samples)
+
+	@cython.boundscheck(False)
+	@cython.wraparound(False)
+	def transform(self, letters):
+		"""Target string of a sequence of letters."""
+
+		cdef np.npy_intp i
+		cdef np.npy_intp n_samples = len(letters)
+		cdef _Scratch s = self.scratch()
+
+		if n_samples == 0:
+			return ''
+		s.reserve(n_samples, self.n_pad, self.n_states)
+		for i in range(self.n_pad):
+			s.codes[i] = 0
+			s.codes[self.n_pad + n_samples + i] = 0
+		i = self.n_pad
+		for letter in letters:
+			s.codes[i] = self.codes.get(letter, self.unknown)
+			i += 1
+
+		with nogil:
+			self._decode(s, n_samples)
+
+		return ''.join([self.labels[s.path[i]] for i in range(n_samples)])
+
+	def transform_batch(self, words):
+		"""Target strings of many letter sequences."""
+		return [self.transform(letters) for letters in words]
@@ -35,18 +35,37 @@ import io
 import re
 import json
 import os
+import hashlib
+import threading
+from collections import Counter
 
 import numpy as np
-from scipy.sparse import issparse
 
-from indictrans.utils.HandleCommonUtils import WXEncoder, OneHotEncoder, UrduNormalizer, ngram_context
+from indictrans.utils.HandleCommonUtils import (WXEncoder, OneHotEncoder, EmissionScorer, NgramFeaturizer,
+	SparseTransitions, UrduNormalizer, ngram_context)
+from indictrans.utils.ModelStore import ModelStore
+from indictrans.utils.TransliterationCache import CACHES
+from indictrans.utils.PersistentCache import PersistentCache
+from indictrans.utils.Lexicon import Lexicon
+from indictrans.utils.HandleDecoders import ONE_BEST, PRUNED, FUSED, BATCH_DECODERS
+from indictrans.putils import WordKernel
 from indictrans.base.HandleConstants import INDICTRANS_PUNKT_URDU_MAP, INDICTRANS_PUNKT_MAP
 
+# kinds of the spans of BaseTransliterator.spans
+WORD, ROMAN, NEWLINE, SEPARATOR = range(4)
+
 class BaseTransliterator(object):
 	"""Base class for transliterator."""
 
 	npzdata = None
 	vecdata = None
+	store = ModelStore()
+	models = dict()
+	models_lock = threading.Lock()
+	# build_lookup caches, see TransliterationCache
+	caches = dict()
+	cache_policy = 'lru'
+	cache_size = 100000
 
 	def get_npz_data(self, item, key):
 		return BaseTransliterator.npzdata[f"{item}_{key}"]
@@ -65,12 +84,88 @@ class BaseTransliterator(object):
 	def load_mappings(self):
 		self.punkt_tbl = INDICTRANS_PUNKT_URDU_MAP if self.target == 'urd' else INDICTRANS_PUNKT_MAP
 
-	def case_trans(self, word, k_best=5):
+	def prepare_word(self, word):
+		"""Returns (t_word, None) if word is handled without the model,
+		else (None, letters) with the letters to predict."""
 		raise NotImplementedError( 'Not implemented in base class')
 
-	def __init__(self, source, target, decoder, build_lookup=False):
-		self._init_npz_data()
+	def finish_word(self, oword, t_word):
+		"""Post-processes the model output of word `oword`."""
+		raise NotImplementedError( 'Not implemented in base class')
+
+	def cache_key(self, word, k_best):
+		"""Key of word in the lexicon and cache, or None if there are none or the
+		model does not transliterate word."""
+		if (self.cache is None and self.lexicon is None) or not word or word[0] not in self.letters:
+			return None
+		return word if self.one_best else (word, k_best)
+
+	def cache_get(self, key):
+		if self.lexicon is not None:
+			t_word = self.lexicon.get(key)
+			if t_word is not None:
+				return t_word
+		if self.cache is None:
+			return None
+		t_word = self.cache.get(key)
+		# k-best lists are cached as tuples, so callers cannot change them
+		return list(t_word) if isinstance(t_word, tuple) else t_word
+
+	def cache_put(self, key, t_word):
+		if self.cache is None:
+			return
+		self.cache.put(key, tuple(t_word) if isinstance(t_word, list) else t_word)
+
+	def case_trans(self, word, k_best=5):
+		key = self.cache_key(word, k_best)
+		if key is not None:
+			t_word = self.cache_get(key)
+			if t_word is not None:
+				return t_word
+		t_word, letters = self.prepare_word(word)
+		if letters is None:
+			return t_word
+		if self.kernel_ is not None:
+			t_word = self.finish_word(word, self.kernel_.transform(letters))
+		else:
+			t_word = self.finish_word(word, self.predict(self.featurizer_.transform(letters), k_best))
+		if key is not None:
+			self.cache_put(key, t_word)
+		return t_word
+
+	def trans_words(self, words, k_best=5):
+		"""case_trans of many words, with one predict_batch for all words that need the model."""
+		t_words = [None] * len(words)
+		batch, letters, repeats = dict(), [], []
+		for i, word in enumerate(words):
+			if word in batch:
+				repeats.append(i)
+				continue
+			key = self.cache_key(word, k_best)
+			if key is not None:
+				t_word = self.cache_get(key)
+				if t_word is not None:
+					t_words[i] = t_word
+					continue
+			t_word, word_letters = self.prepare_word(word)
+			if word_letters is None:
+				t_words[i] = t_word
+			else:
+				batch[word] = (i, key)
+				letters.append(word_letters)
+		if letters:
+			for (word, (i, key)), t_word in zip(batch.items(), self.predict_batch(letters, k_best)):
+				t_words[i] = self.finish_word(word, t_word)
+				if key is not None:
+					self.cache_put(key, t_words[i])
+		for i in repeats:
+			t_words[i] = t_words[batch[words[i]][0]]
+		return t_words
+
+	def __init__(self, source, target, decoder, build_lookup=False, cache=None, lexicon=None):
 		self._to_indic = False
+		# outputs differ between aliases of a pair, so caches are per named pair
+		self.pair = '%s-%s' % (source, target)
 		if source in ('mar', 'nep', 'kok', 'bod'):
 			source = 'hin'
 		elif source == 'asm':
@@ -81,29 +176,161 @@ class BaseTransliterator(object):
 			target = 'ben'
 		self.source = source
 		self.target = target
-		self.lookup = dict()
 		self.build_lookup = build_lookup
 		self.decode, self.decoder = decoder
-		self.tab = '\x01\x03'  # mask tabs
-		self.space = '\x02\x04'  # mask spaces
+		self.one_best = self.decode in ONE_BEST
+		self.batch_decoder = BATCH_DECODERS.get(self.decode)
 		self.esc_ch = '\x00'  # escape-sequence for Roman in WX
 		self.dist_dir = os.path.dirname(os.path.abspath(__file__))
 		self.base_fit()
+		# word cache: explicit, in memory for build_lookup, or on disk in front of that
+		memory = self.shared_cache() if build_lookup else None
+		if isinstance(cache, PersistentCache):
+			self.cache = cache.bind(self.pair, self.decode, self.model_checksum(), memory)
+		else:
+			self.cache = cache if cache is not None else memory
+		# precomputed words of the pair, decoder and model, read before the cache
+		if isinstance(lexicon, str):
+			lexicon = Lexicon(lexicon)
+		if lexicon is not None and not lexicon.matches(self.pair, self.decode, self.model_checksum()):
+			raise ValueError('Lexicon %s was not compiled for %s %s with this model' % (lexicon.path, self.pair, self.decode))
+		self.lexicon = lexicon
+
+	def shared_cache(self):
+		"""The cache shared by all instances of the pair and decoder."""
+		key = (self.pair, self.decode)
+		with BaseTransliterator.models_lock:
+			cache = BaseTransliterator.caches.get(key)
+			if cache is None:
+				cache = CACHES[BaseTransliterator.cache_policy](BaseTransliterator.cache_size)
+				BaseTransliterator.caches[key] = cache
+		return cache
+
+	def read_model(self, model):
+		"""Reads and decodes the tensors of a language pair."""
+		if BaseTransliterator.store.has_pair(model):
+			# memory-mapped model, float64 on disk so nothing is copied; the
+			# feature dicts of the vectorizer are only rebuilt on demand
+			tensors = BaseTransliterator.store.load(model)
+			tensors['featurizer'] = ModelStore.featurizer(tensors)
+			tensors['scorer'] = EmissionScorer(tensors['coef'], tensors.get('coef_t'))
+			return tensors
+		self._init_npz_data()
+		vectorizer = OneHotEncoder()
+		vectorizer.unique_feats = self.get_vec_data( model, 'sparse')
+		classes = self.get_npz_data(model,'classes')[0]
+		# convert numpy.bytes_/numpy.string_ to numpy.unicode_
+		if not isinstance(classes[0], np.str_):
+			classes = {k: v.decode('utf-8') for k, v in classes.items()}
+		coef = self.get_npz_data(model,'coef')[0].astype(np.float64)
+		scorer = EmissionScorer(coef)
+		intercept_init = self.get_npz_data(model,'intercept_init').astype(np.float64)
+		intercept_trans = self.get_npz_data(model,'intercept_trans').astype(np.float64)
+		return {
+			'vectorizer' : vectorizer,
+			'featurizer' : NgramFeaturizer(vectorizer.unique_feats),
+			'scorer' : scorer,
+			'classes' : classes,
+			'coef' : coef,
+			'intercept_init' : intercept_init,
+			'intercept_trans' : intercept_trans,
+			'intercept_final' : self.get_npz_data(model,'intercept_final').astype(np.float64),
+		}
 
 	def load_models(self):
-		"""Loads transliteration models."""
-		self.vectorizer_ = OneHotEncoder()
+		"""Loads transliteration models. Decoded tensors are cached per language
+		pair and shared by all instances (and aliases) of that pair."""
 		model = '%s-%s' % (self.source, self.target)
-		self.vectorizer_.unique_feats = self.get_vec_data( model, 'sparse')
-		self.classes_ = self.get_npz_data(model,'classes')[0]
-		self.coef_ = self.get_npz_data(model,'coef')[0].astype(np.float64)
-		self.intercept_init_ = self.get_npz_data(model,'intercept_init').astype(np.float64)
-		self.intercept_trans_ = self.get_npz_data(model,'intercept_trans').astype(np.float64)
-		self.intercept_final_ = self.get_npz_data(model,'intercept_final').astype(np.float64)
+		tensors = BaseTransliterator.models.get(model)
+		if tensors is None:
+			with BaseTransliterator.models_lock:
+				tensors = BaseTransliterator.models.get(model)
+				if tensors is None:
+					tensors = self.read_model(model)
+					BaseTransliterator.models[model] = tensors
+		self.tensors_ = tensors
+		self.featurizer_ = tensors['featurizer']
+		self.scorer_ = tensors['scorer']
+		self.classes_ = tensors['classes']
+		self.coef_ = tensors['coef']
+		self.intercept_init_ = tensors['intercept_init']
+		self.intercept_trans_ = tensors['intercept_trans']
+		self.intercept_final_ = tensors['intercept_final']
+		# viterbi decoders skip the transitions that can never win
+		self.transitions_ = self.sparse_transitions(tensors)
+		self.decode_args_ = self.transitions_.decode_args() if self.transitions_ is not None else {}
+		self.kernel_ = self.word_kernel(tensors)
 
-		# convert numpy.bytes_/numpy.string_ to numpy.unicode_
-		if not isinstance(self.classes_[0], np.str_):
-			self.classes_ = {k: v.decode('utf-8') for k, v in self.classes_.items()}
+	def model_checksum(self):
+		"""Digest of the model of the pair, keying persistent caches."""
+		checksum = self.tensors_.get('checksum')
+		if checksum is None:
+			digest = hashlib.blake2b(digest_size=16)
+			# hash the scorer weights, so stores and npz archives of a model agree
+			scorer = self.scorer_
+			if scorer.coef_t_ is not None:
+				arrays = [scorer.coef_t_]
+			else:
+				arrays = [scorer.data_, scorer.indices_, scorer.indptr_]
+			arrays += [self.intercept_init_, self.intercept_trans_, self.intercept_final_,
+				self.featurizer_.keys_, self.featurizer_.ids_]
+			for arr in arrays:
+				digest.update(np.ascontiguousarray(arr).tobytes())
+			labels = [self.classes_[i] for i in range(self.intercept_init_.shape[0])]
+			digest.update('\x00'.join(sorted(self.featurizer_.codes) + labels).encode('utf-8'))
+			checksum = self.tensors_['checksum'] = digest.hexdigest()
+		return checksum
+
+	def sparse_transitions(self, tensors):
+		"""The SparseTransitions of the pair, shared like the tensors, or None if
+		the decoder does not prune. Only built once a pruning decoder needs it."""
+		if self.decode not in PRUNED:
+			return None
+		transitions = tensors.get('transitions')
+		if transitions is None:
+			with BaseTransliterator.models_lock:
+				transitions = tensors.get('transitions')
+				if transitions is None:
+					if 'vectorizer' in tensors:
+						columns = tensors['vectorizer'].unique_feats
+					else:
+						columns = ModelStore.feature_columns(tensors)
+					transitions = SparseTransitions(self.intercept_trans_, self.intercept_init_,
+						*self.scorer_.bounds(columns))
+					tensors['transitions'] = transitions
+		return transitions
+
+	def word_kernel(self, tensors):
+		"""The WordKernel of the pair and decoder, shared like the tensors, or
+		None if the decoder or the (sparse) coef cannot be run by it."""
+		if WordKernel is None or self.decode not in FUSED or self.scorer_.coef_t_ is None:
+			return None
+		key = 'kernel_%s' % (self.decode)
+		kernel = tensors.get(key)
+		if kernel is None:
+			with BaseTransliterator.models_lock:
+				kernel = tensors.get(key)
+				if kernel is None:
+					labels = [self.classes_[i] for i in range(self.intercept_init_.shape[0])]
+					kernel = WordKernel(self.featurizer_, self.scorer_.coef_t_, self.intercept_trans_,
+						self.intercept_init_, self.intercept_final_, labels, **FUSED[self.decode], **self.decode_args_)
+					tensors[key] = kernel
+		return kernel
+
+	@property
+	def vectorizer_(self):
+		"""OneHotEncoder of the pair, for ngram_context features given to
+		`predict`. Built from the store on first use and shared like the tensors."""
+		tensors = self.tensors_
+		vectorizer = tensors.get('vectorizer')
+		if vectorizer is None:
+			with BaseTransliterator.models_lock:
+				vectorizer = tensors.get('vectorizer')
+				if vectorizer is None:
+					vectorizer = OneHotEncoder()
+					vectorizer.unique_feats = ModelStore.unique_feats(tensors)
+					tensors['vectorizer'] = vectorizer
+		return vectorizer
 
 	def base_fit(self):
 		# load models
@@ -116,33 +343,47 @@ class BaseTransliterator(object):
 			self.nu = UrduNormalizer()
 		# initialize wx-converter and character-maps
 		if self.source in ['eng', 'urd']:
-			wxp = WXEncoder(order='wx2utf', lang=self.target)
+			wxp = WXEncoder.shared(order='wx2utf', lang=self.target)
 			self.wx_process = wxp.wx2utf
 		else:
-			wxp = WXEncoder(order='utf2wx', lang=self.source)
+			wxp = WXEncoder.shared(order='utf2wx', lang=self.source)
 			self.wx_process = wxp.utf2wx
 			self.mask_roman = re.compile(r'([a-zA-Z]+)')
 
 	def predict(self, word, k_best=5):
-		"""Given encoded word matrix and HMM parameters, predicts output sequence (target word)"""
-		X = self.vectorizer_.transform(word)
-		if issparse(X):
-			scores = X.dot(self.coef_.T).toarray()
-		else:
-			scores = self.coef_.dot(X.T).T
-		if self.decode == 'viterbi':
-			y = self.decoder(scores, self.intercept_trans_, self.intercept_init_, self.intercept_final_)
-			y = [self.classes_[pid] for pid in y]
-			y = ''.join(y).replace('_', '')
-			return y
+		"""Given encoded word matrix and HMM parameters, predicts output sequence (target word).
+		`word` is the feature id matrix of NgramFeaturizer, or ngram_context features."""
+		if not isinstance(word, np.ndarray):
+			word = self.vectorizer_.transform_ids(word)
+		return self.decode_scores(self.scorer_.emissions(word), k_best)
+
+	def predict_batch(self, words, k_best=5):
+		"""Predicts the target words of many letter sequences. All words are
+		featurized into one stacked id matrix and scored at once, then each
+		word's slice of the scores is decoded."""
+		if self.kernel_ is not None:
+			return self.kernel_.transform_batch(words)
+		ids, offsets = self.featurizer_.transform_batch(words)
+		scores = self.scorer_.emissions(ids)
+		if self.batch_decoder is not None:
+			y = self.batch_decoder(scores, offsets, self.intercept_trans_, self.intercept_init_, self.intercept_final_,
+				**self.decode_args_)
+			return [self.path_to_word(y[a:b]) for a, b in zip(offsets[:-1], offsets[1:])]
+		return [self.decode_scores(scores[a:b], k_best) for a, b in zip(offsets[:-1], offsets[1:])]
+
+	def path_to_word(self, path):
+		"""Joins the labels of a decoded path."""
+		return ''.join([self.classes_[pid] for pid in path]).replace('_', '')
+
+	def decode_scores(self, scores, k_best=5):
+		"""Decodes the emission scores of a word into its target word(s)."""
+		if self.one_best:
+			y = self.decoder(scores, self.intercept_trans_, self.intercept_init_, self.intercept_final_,
+				**self.decode_args_)
+			return self.path_to_word(y)
 		else:
-			top_seq = list()
 			y = self.decoder(scores, self.intercept_trans_, self.intercept_init_, self.intercept_final_, k_best)
-			for path in y:
-				w = [self.classes_[pid] for pid in path]
-				w = ''.join(w).replace('_', '')
-				top_seq.append(w)
-			return top_seq
+			return [self.path_to_word(path) for path in y]
 
 	def convert_to_wx(self, text):
 		"""Converts Indic scripts to WX."""
@@ -159,36 +400,64 @@ class BaseTransliterator(object):
 		text = self.wx_process(text)
 		return text
 
+	def set_alphabet(self, alpha):
+		"""Compiles the word splitter and tokenizer of the characters of
+		`alpha`, the body of a regex character class."""
+		self.non_alpha = re.compile(r"([^%s]+)" % (alpha))
+		# words, newlines, and runs of anything else
+		self.tokenizer = re.compile(r"([%s]+)|(\n)|[^%s\n]+" % (alpha, alpha))
+
+	def spans(self, text):
+		"""(start, end, kind) of the WORD, ROMAN (escaped Roman word), NEWLINE
+		and SEPARATOR tokens of WX text, in one pass. The words are those of
+		non_alpha.split."""
+		esc_ch = self.esc_ch
+		for match in self.tokenizer.finditer(text):
+			start, end = match.span()
+			if match.lastindex == 1:
+				yield start, end, ROMAN if text[start] == esc_ch else WORD
+			elif match.lastindex == 2:
+				yield start, end, NEWLINE
+			else:
+				yield start, end, SEPARATOR
+
+	def tokens(self, text):
+		"""The tokens of the spans of WX text."""
+		return [match[0] for match in self.tokenizer.finditer(text)]
+
 	def transliterate(self, text, k_best=None):
 		"""Single best transliteration using viterbi decoding."""
-		trans_list = []
-		text = self.convert_to_wx(text)
-		text = text.replace('\t', self.tab)
-		text = text.replace(' ', self.space)
-		lines = text.split("\n")
-		for line in lines:
-			if not line.strip():
-				trans_list.append(line)
-				continue
-			trans_line = str()
-			line = self.non_alpha.split(line)
-			for word in line:
-				trans_line += self.case_trans(word)
-			trans_list.append(trans_line)
-		trans_line = '\n'.join(trans_list)
-		trans_line = trans_line.replace(self.space, ' ')
-		trans_line = trans_line.replace(self.tab, '\t')
-		return trans_line
+		return ''.join(self.trans_words(self.tokens(self.convert_to_wx(text))))
+
+	def count_types(self, texts):
+		"""Counts of the words of texts, as transliterate splits them."""
+		counts = Counter()
+		for text in texts:
+			text = self.convert_to_wx(text)
+			counts.update([text[start:end] for start, end, kind in self.spans(text) if kind == WORD])
+		return counts
+
+	def rewrite(self, text, types):
+		"""transliterate of WX text, given the outputs of all its words in `types`."""
+		tokens = []
+		for start, end, kind in self.spans(text):
+			token = text[start:end]
+			if kind == WORD:
+				tokens.append(types[token])
+			elif kind == NEWLINE:
+				tokens.append(token)
+			else:
+				tokens.append(self.prepare_word(token)[0])
+		return ''.join(tokens)
 
 	def top_n_trans(self, text, k_best=5):
 		"""Returns k-best transliterations using beamsearch decoding.  """
 		if k_best < 2:
 			raise ValueError('`k_best` value should be >= 2')
 		trans_word = []
-		text = self.convert_to_wx(text)
-		words = self.non_alpha.split(text)
-		for word in words:
-			op_word = self.case_trans(word, k_best)
+		# empty text has k empty transliterations
+		words = self.tokens(self.convert_to_wx(text)) or ['']
+		for word, op_word in zip(words, self.trans_words(words, k_best)):
 			if isinstance(op_word, list):
 				trans_word.append(op_word)
 			else:
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+#
+# @project IndicTrans
+# @file src/indictrans/utils/EmissionScorer.py
+# @author  Shreos Roychowdhury <shreos@tirja.com>
+# @version 1.0.0
+#
+# @section DESCRIPTION
+#
+#   EmissionScorer.py : emission scores straight from feature column ids
+#
+# A row of the one-hot matrix has only one active column per feature position.
+# So X.dot(coef.T) is just a sum of coef columns. This module computes that sum
+# on a pre-transposed coef, in the same order as the sparse product, so the
+# scores are bit-identical.
+#
+# @section LICENSE
+#
+# Copyright (c) 2025 Shreos Roychowdhury.
+# Copyright (c) 2025 Tirja Consulting LLP.
+#
+# This source code is released under GNU Affero General Public License.
+# Please refer https://www.gnu.org/licenses/agpl-3.0.en.html#license-text
+#
+# THE SOFTWARE IS PROVIDED , WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+import numpy as np
+from scipy.sparse import issparse, csc_matrix
+
+class EmissionScorer():
+	"""Computes emission scores from feature column ids.
+
+	Weights are kept transposed, one contiguous run of class weights per feature:
+	a dense ``(n_features + 1, n_classes)`` array whose last row is zero, or the
+	CSC arrays of a sparse coef too large to densify. `coef_t` passes the dense
+	array ready-made, e.g. memory-mapped from ModelStore, and is used as is.
+	"""
+
+	# densify sparse coefs up to this many weights (16MB of float64)
+	dense_limit = 1 << 21
+
+	def __init__(self, coef, coef_t=None):
+		self.n_classes, self.n_features = coef.shape
+		if coef_t is not None:
+			if coef_t.shape != (self.n_features + 1, self.n_classes):
+				raise ValueError('coef_t of shape %s for coef of shape %s' % (coef_t.shape, coef.shape))
+			self.coef_t_ = coef_t
+		elif issparse(coef) and self.n_classes * self.n_features > self.dense_limit:
+			coef = csc_matrix(coef)
+			coef.sort_indices()
+			self.coef_t_ = None
+			self.indptr_ = coef.indptr.astype(np.intp)
+			self.indices_ = coef.indices.astype(np.intp)
+			self.data_ = coef.data
+		else:
+			if issparse(coef):
+				coef = coef.toarray()
+			self.coef_t_ = np.zeros((self.n_features + 1, self.n_classes), dtype=np.float64)
+			self.coef_t_[:-1] = coef.T
+
+	def emissions(self, ids):
+		"""Emission scores, shape (n_samples, n_classes), for the column ids from
+		`OneHotEncoder.transform_ids` (-1 marks unseen features)."""
+		if self.coef_t_ is not None:
+			# unseen features pick the zero row; ascending ids keep the summation order
+			ids = np.sort(np.where(ids < 0, self.n_features, ids), axis=1)
+			return self.coef_t_.take(ids, axis=0).sum(axis=1)
+		n_samples = ids.shape[0]
+		ids = np.sort(ids, axis=1)
+		valid = ids >= 0
+		rows = np.repeat(np.arange(n_samples), valid.sum(axis=1))
+		ids = ids[valid]
+		# gather the class weights of every active feature
+		start = self.indptr_[ids]
+		length = self.indptr_[ids + 1] - start
+		pos = np.arange(length.sum()) + np.repeat(start - np.cumsum(length) + length, length)
+		bins = np.repeat(rows * self.n_classes, length) + self.indices_[pos]
+		scores = np.bincount(bins, weights=self.data_[pos], minlength=n_samples * self.n_classes)
+		return scores.reshape(n_samples, self.n_classes)
+
+	def weights(self, cols):
+		"""Class weights of feature columns, shape (len(cols), n_classes)."""
+		if self.coef_t_ is not None:
+			return self.coef_t_[cols]
+		coef = csc_matrix((self.data_, self.indices_, self.indptr_), shape=(self.n_classes, self.n_features))
+		return coef[:, cols].toarray().T
+
+	def bounds(self, columns):
+		"""Lower and upper bounds of the emission score of every class, when at
+		most one feature of each position is active. `columns` holds the column
+		ids of the features of each position, or the per-position feature dicts
+		of OneHotEncoder."""
+		low = np.zeros(self.n_classes)
+		high = np.zeros(self.n_classes)
+		for cols in columns:
+			if isinstance(cols, dict):
+				cols = list(cols.values())
+			if not len(cols):
+				continue
+			w = self.weights(np.asarray(cols, dtype=np.intp))
+			# an unseen feature adds nothing
+			low += np.minimum(w.min(axis=0), 0)
+			high += np.maximum(w.max(axis=0), 0)
+		return low, high
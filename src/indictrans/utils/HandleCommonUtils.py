@@ -27,10 +27,16 @@
 
 from indictrans.utils.WXEncoder import WXEncoder
 from indictrans.utils.OneHotEncoder import OneHotEncoder
+from indictrans.utils.EmissionScorer import EmissionScorer
+from indictrans.utils.NgramFeaturizer import NgramFeaturizer
+from indictrans.utils.SparseTransitions import SparseTransitions
 from indictrans.putils import count_tranxn, sparse_add
 from indictrans.utils.UrduNormalizer import UrduNormalizer
+from indictrans.utils.TransliterationCache import LRUCache, TinyLFUCache
+from indictrans.utils.PersistentCache import PersistentCache
+from indictrans.utils.Lexicon import Lexicon
 
-__all__ = ["WXEncoder", "count_tranxn", "sparse_add", "OneHotEncoder", "UrduNormalizer", "ngram_context"]
+__all__ = ["WXEncoder", "count_tranxn", "sparse_add", "OneHotEncoder", "EmissionScorer", "NgramFeaturizer", "SparseTransitions", "UrduNormalizer", "LRUCache", "TinyLFUCache", "PersistentCache", "Lexicon", "ngram_context"]
 
 def ngram_context(letters, n=4):
 	feats = []
@@ -30,8 +30,49 @@
 
 from indictrans.putils import viterbi_decode as viterbi
 from indictrans.putils import beamsearch_decode as beamsearch
+from indictrans.putils.npdecode import viterbi_decode as viterbi_np
+from indictrans.putils.npdecode import beamsearch_decode as beamsearch_np
+from indictrans.putils import viterbi_decode_batch as viterbi_batch
+from indictrans.putils.npdecode import viterbi_decode_batch as viterbi_np_batch
+from indictrans.putils import kbest_viterbi_decode as kbest_viterbi
+from indictrans.putils.npdecode import kbest_viterbi_decode as kbest_viterbi_np
+from indictrans.putils import greedy_decode as greedy
+from indictrans.putils.npdecode import greedy_decode as greedy_np
+from indictrans.putils import greedy_decode_batch as greedy_batch
+from indictrans.putils.npdecode import greedy_decode_batch as greedy_np_batch
 
+# `viterbi`, `beamsearch` and `kbest` are the compiled kernels when available,
+# else the numpy ones; the `_np` entries always select the numpy kernels.
+# `kbest` is exact k-best Viterbi, `beamsearch` an approximation of it.
+# `greedy` picks the best state given the previous one only: fastest, least accurate.
 DECODERS = {
 	"viterbi": viterbi,
-	"beamsearch": beamsearch
+	"beamsearch": beamsearch,
+	"viterbi_np": viterbi_np,
+	"beamsearch_np": beamsearch_np,
+	"kbest": kbest_viterbi,
+	"kbest_np": kbest_viterbi_np,
+	"greedy": greedy,
+	"greedy_np": greedy_np
+}
+
+# decoders returning a single best path, all others return k-best paths
+ONE_BEST = set(["viterbi", "viterbi_np", "greedy", "greedy_np"])
+
+# decoders accepting the predecessor lists of SparseTransitions
+PRUNED = set(["viterbi", "viterbi_np"])
+
+# decoders the compiled WordKernel runs along with featurizing and scoring,
+# with its keyword arguments
+FUSED = {
+	"viterbi": {},
+	"greedy": {"greedy": True}
+}
+
+# batch versions, decoding many sequences stacked in ragged (CSR) layout
+BATCH_DECODERS = {
+	"viterbi": viterbi_batch,
+	"viterbi_np": viterbi_np_batch,
+	"greedy": greedy_batch,
+	"greedy_np": greedy_np_batch
 }
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+#
+# @project IndicTrans
+# @file src/indictrans/utils/Lexicon.py
+# @author  Shreos Roychowdhury <shreos@tirja.com>
+# @version 1.0.0
+#
+# @section DESCRIPTION
+#
+#   Lexicon.py : read-only, memory-mapped table of precomputed transliterations
+#
+# Built offline from a corpus vocabulary (see indictrans-lexicon), for one pair,
+# decoder and model. Layout of a lexicon directory:
+#
+# - ``keys.npy``, ``key_offsets.npy`` : UTF-8 arena of the normalized input words
+# - ``values.npy``, ``value_offsets.npy`` : UTF-8 arena of their outputs, the
+#   candidates of k-best decoders separated by newlines
+# - ``slots.npy`` : open-addressing hash table of entry ids + 1 (0 is empty),
+#   probed linearly from crc32(key)
+# - ``meta.json`` : pair, decoder, k (0 for one-best), model checksum, size
+#
+# A lookup is a hash, one or two probes and a comparison on the mapped pages.
+#
+# @section LICENSE
+#
+# Copyright (c) 2025 Shreos Roychowdhury.
+# Copyright (c) 2025 Tirja Consulting LLP.
+#
+# This source code is released under GNU Affero General Public License.
+# Please refer https://www.gnu.org/licenses/agpl-3.0.en.html#license-text
+#
+# THE SOFTWARE IS PROVIDED , WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+import os
+import json
+import zlib
+
+import numpy as np
+
+class Lexicon():
+	"""Memory-mapped lexicon of one language pair, decoder and model.
+
+	Examples
+	--------
+	>>> Lexicon.save('hin-eng.lex', {'kamala': 'kamal'}, pair='hin-eng', decode='viterbi', k=0, checksum='...')
+	>>> Lexicon('hin-eng.lex').get('kamala')
+	'kamal'
+	"""
+
+	def __init__(self, path):
+		self.path = path
+		with open(os.path.join(path, 'meta.json')) as fp:
+			self.meta = json.load(fp)
+		arrays = [np.load(os.path.join(path, '%s.npy' % (name)), mmap_mode='r', allow_pickle=False)
+			for name in ('keys', 'key_offsets', 'values', 'value_offsets', 'slots')]
+		# memoryviews index to plain ints and slice without copies
+		self.keys, self.key_offsets, self.values, self.value_offsets, self.slots = [
+			memoryview(arr) if arr.size else memoryview(b'') for arr in arrays]
+		self.mask = len(self.slots) - 1
+		self.k = self.meta['k']
+
+	def __len__(self):
+		return self.meta['size']
+
+	def find(self, word):
+		"""The output of word as stored, or None."""
+		key = word.encode('utf-8')
+		i = zlib.crc32(key) & self.mask
+		slots, offsets = self.slots, self.key_offsets
+		while True:
+			entry = slots[i]
+			if entry == 0:
+				return None
+			entry -= 1
+			if self.keys[offsets[entry]:offsets[entry + 1]] == key:
+				value = self.values[self.value_offsets[entry]:self.value_offsets[entry + 1]]
+				return str(value, 'utf-8')
+			i = (i + 1) & self.mask
+
+	def get(self, key):
+		"""Cache-style lookup: key is a word for one-best decoders, (word, k) else."""
+		if isinstance(key, tuple):
+			word, k = key
+			if k != self.k:
+				return None
+			value = self.find(word)
+			return None if value is None else value.split('\n')
+		return self.find(key) if self.k == 0 else None
+
+	def matches(self, pair, decode, checksum):
+		return (self.meta['pair'], self.meta['decode'], self.meta['checksum']) == (pair, decode, checksum)
+
+	@staticmethod
+	def save(path, entries, pair, decode, k, checksum):
+		"""Writes the lexicon of `entries`, a dict of normalized word to output
+		(a list of candidates for k-best decoders)."""
+		os.makedirs(path, exist_ok=True)
+		words = sorted(entries)
+		keys = [w.encode('utf-8') for w in words]
+		values = [(v if isinstance(v, str) else '\n'.join(v)).encode('utf-8') for v in (entries[w] for w in words)]
+		size = 16
+		while size < 2 * len(keys):
+			size *= 2
+		slots = np.zeros(size, dtype=np.uint32)
+		mask = size - 1
+		for entry, key in enumerate(keys):
+			i = zlib.crc32(key) & mask
+			while slots[i]:
+				i = (i + 1) & mask
+			slots[i] = entry + 1
+		arrays = {
+			'keys': np.frombuffer(b''.join(keys), dtype=np.uint8),
+			'key_offsets': np.cumsum([0] + [len(key) for key in keys], dtype=np.uint64),
+			'values': np.frombuffer(b''.join(values), dtype=np.uint8),
+			'value_offsets': np.cumsum([0] + [len(value) for value in values], dtype=np.uint64),
+			'slots': slots,
+		}
+		for name, arr in arrays.items():
+			np.save(os.path.join(path, '%s.npy' % (name)), arr, allow_pickle=False)
+		meta = {'pair': pair, 'decode': decode, 'k': k, 'checksum': checksum, 'size': len(keys)}
+		with open(os.path.join(path, 'meta.json'), 'w') as fp:
+			json.dump(meta, fp, indent=1)
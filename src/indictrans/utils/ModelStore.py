@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+#
+# @project IndicTrans
+# @file src/indictrans/utils/ModelStore.py
+# @author  Shreos Roychowdhury <shreos@tirja.com>
+# @version 1.0.0
+#
+# @section DESCRIPTION
+#
+#   ModelStore.py : Memory-mapped, pickle-free model store.
+#
+# Every language pair is kept in its own directory with one uncompressed .npy
+# file per tensor. Files are opened with np.memmap, so processes share a single
+# page-cache copy and opening a pair does not decompress anything.
+#
+# @section LICENSE
+#
+# Copyright (c) 2025 Shreos Roychowdhury.
+# Copyright (c) 2025 Tirja Consulting LLP.
+#
+# This source code is released under GNU Affero General Public License.
+# Please refer https://www.gnu.org/licenses/agpl-3.0.en.html#license-text
+#
+# THE SOFTWARE IS PROVIDED , WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+import os
+
+import numpy as np
+from scipy import sparse as sp
+
+from indictrans.utils.EmissionScorer import EmissionScorer
+from indictrans.utils.NgramFeaturizer import NgramFeaturizer
+
+MODEL_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'models'))
+
+class ModelStore():
+	"""Memory-mapped store of transliteration models.
+
+	Layout of a pair directory ``<model_dir>/<src>-<trg>/``:
+
+	- ``classes.npy`` : unicode labels indexed by class id
+	- ``coef_t.npy`` : weights transposed for EmissionScorer, ``(n_features + 1, n_classes)``
+	  with a zero last row; ``coef_{data,indices,indptr,shape}.npy`` : CSC weights
+	  of a coef too large to densify
+	- ``intercept_{init,trans,final}.npy`` : float64 transition weights
+	- ``feats_{keys,ids,offsets}.npy`` : feature index, keys sorted per position
+	- ``ngram_{letters,keys,ids}.npy`` : NgramFeaturizer tables, when the index
+	  is one of ngram_context features
+
+	Examples
+	--------
+	>>> store = ModelStore()
+	>>> if store.has_pair('hin-eng'):
+	...     tensors = store.load('hin-eng')
+	"""
+
+	def __init__(self, model_dir=None):
+		self.model_dir = model_dir if model_dir else MODEL_DIR
+
+	def pair_dir(self, pair):
+		return os.path.join(self.model_dir, pair)
+
+	def has_pair(self, pair):
+		return os.path.isfile(os.path.join(self.pair_dir(pair), 'classes.npy'))
+
+	def pairs(self):
+		if not os.path.isdir(self.model_dir):
+			return []
+		return sorted(p for p in os.listdir(self.model_dir) if self.has_pair(p))
+
+	def _open(self, pair, name):
+		path = os.path.join(self.pair_dir(pair), '%s.npy' % (name))
+		return np.load(path, mmap_mode='r', allow_pickle=False)
+
+	def _save(self, pair, name, arr):
+		np.save(os.path.join(self.pair_dir(pair), '%s.npy' % (name)), np.ascontiguousarray(arr), allow_pickle=False)
+
+	def load(self, pair):
+		"""Opens all tensors of a language pair as read-only memory maps."""
+		if not self.has_pair(pair):
+			raise IOError('Model `%s` not found in %s' % (pair, self.model_dir))
+		tensors = dict()
+		tensors['classes'] = self._open(pair, 'classes')
+		if os.path.isfile(os.path.join(self.pair_dir(pair), 'coef_t.npy')):
+			# the scorer runs on the mapped file; coef is a view of it
+			tensors['coef_t'] = self._open(pair, 'coef_t')
+			tensors['coef'] = tensors['coef_t'][:-1].T
+		elif os.path.isfile(os.path.join(self.pair_dir(pair), 'coef.npy')):
+			tensors['coef'] = self._open(pair, 'coef')
+		else:
+			shape = tuple(int(i) for i in self._open(pair, 'coef_shape'))
+			tensors['coef'] = sp.csc_matrix((
+				self._open(pair, 'coef_data'),
+				self._open(pair, 'coef_indices'),
+				self._open(pair, 'coef_indptr')), shape=shape, copy=False)
+		for key in ('intercept_init', 'intercept_trans', 'intercept_final'):
+			tensors[key] = self._open(pair, key)
+		for key in ('feats_keys', 'feats_ids', 'feats_offsets'):
+			tensors[key] = self._open(pair, key)
+		if os.path.isfile(os.path.join(self.pair_dir(pair), 'ngram_keys.npy')):
+			for key in ('ngram_letters', 'ngram_keys', 'ngram_ids'):
+				tensors[key] = self._open(pair, key)
+		return tensors
+
+	@staticmethod
+	def unique_feats(tensors):
+		"""Rebuilds the per-position feature dicts used by OneHotEncoder."""
+		keys = tensors['feats_keys'].tolist()
+		ids = tensors['feats_ids'].tolist()
+		offsets = tensors['feats_offsets'].tolist()
+		return [dict(zip(keys[a:b], ids[a:b])) for a, b in zip(offsets[:-1], offsets[1:])]
+
+	@staticmethod
+	def feature_columns(tensors):
+		"""Column ids of the features of every position, as views of the index."""
+		ids = tensors['feats_ids']
+		offsets = tensors['feats_offsets'].tolist()
+		return [ids[a:b] for a, b in zip(offsets[:-1], offsets[1:])]
+
+	@staticmethod
+	def featurizer(tensors):
+		"""NgramFeaturizer on the stored tables, or built from the feature
+		index for pairs saved without them."""
+		if 'ngram_keys' not in tensors:
+			return NgramFeaturizer(ModelStore.unique_feats(tensors))
+		return NgramFeaturizer.from_tables(tensors['ngram_letters'].tolist(),
+			tensors['ngram_keys'], tensors['ngram_ids'])
+
+	def save(self, pair, classes, coef, intercept_init, intercept_trans, intercept_final, unique_feats):
+		"""Writes a language pair. `classes` maps class id to label, `unique_feats`
+		is the list of per-position feature dicts of OneHotEncoder."""
+		os.makedirs(self.pair_dir(pair), exist_ok=True)
+		labels = [classes[i] for i in range(len(classes))]
+		labels = [v.decode('utf-8') if isinstance(v, bytes) else str(v) for v in labels]
+		self._save(pair, 'classes', np.array(labels, dtype=str))
+		# drop weights of an earlier save, which load would prefer
+		for name in ('coef', 'coef_t', 'coef_data', 'coef_indices', 'coef_indptr', 'coef_shape',
+				'ngram_letters', 'ngram_keys', 'ngram_ids'):
+			path = os.path.join(self.pair_dir(pair), '%s.npy' % (name))
+			if os.path.isfile(path):
+				os.remove(path)
+		if sp.issparse(coef) and coef.shape[0] * coef.shape[1] > EmissionScorer.dense_limit:
+			coef = sp.csc_matrix(coef, dtype=np.float64)
+			coef.sort_indices()
+			self._save(pair, 'coef_data', coef.data)
+			self._save(pair, 'coef_indices', coef.indices)
+			self._save(pair, 'coef_indptr', coef.indptr)
+			self._save(pair, 'coef_shape', np.array(coef.shape, dtype=np.int64))
+		else:
+			coef = coef.toarray() if sp.issparse(coef) else np.asarray(coef)
+			coef_t = np.zeros((coef.shape[1] + 1, coef.shape[0]), dtype=np.float64)
+			coef_t[:-1] = coef.T
+			self._save(pair, 'coef_t', coef_t)
+		self._save(pair, 'intercept_init', np.asarray(intercept_init, dtype=np.float64))
+		self._save(pair, 'intercept_trans', np.asarray(intercept_trans, dtype=np.float64))
+		self._save(pair, 'intercept_final', np.asarray(intercept_final, dtype=np.float64))
+		keys, ids, offsets = [], [], [0]
+		for feats in unique_feats:
+			for k in sorted(feats):
+				keys.append(k)
+				ids.append(feats[k])
+			offsets.append(len(keys))
+		self._save(pair, 'feats_keys', np.array(keys, dtype=str))
+		self._save(pair, 'feats_ids', np.array(ids, dtype=np.int64))
+		self._save(pair, 'feats_offsets', np.array(offsets, dtype=np.int64))
+		try:
+			featurizer = NgramFeaturizer(unique_feats)
+		except ValueError:
+			# not an index of ngram_context features
+			return
+		codes = featurizer.codes
+		self._save(pair, 'ngram_letters', np.array(sorted(codes, key=codes.get)[1:], dtype=str))
+		self._save(pair, 'ngram_keys', featurizer.keys_)
+		self._save(pair, 'ngram_ids', featurizer.ids_)
+
+	def convert_npz(self, npzfile, vecfile, pairs=None):
+		"""Converts the legacy npzdata.npz / vecdata.npz archives, returns the converted pairs."""
+		npzdata = np.load(npzfile, allow_pickle=True)
+		vecdata = np.load(vecfile, allow_pickle=True)
+		found = sorted(set(key.split('_', 1)[0] for key in npzdata.files))
+		done = []
+		for pair in found:
+			if pairs and pair not in pairs:
+				continue
+			self.save(pair,
+				npzdata['%s_classes' % pair][0],
+				npzdata['%s_coef' % pair][0],
+				npzdata['%s_intercept_init' % pair],
+				npzdata['%s_intercept_trans' % pair],
+				npzdata['%s_intercept_final' % pair],
+				vecdata['%s_sparse' % pair])
+			done.append(pair)
+		return done
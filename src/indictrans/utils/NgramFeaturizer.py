@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+#
+# @project IndicTrans
+# @file src/indictrans/utils/NgramFeaturizer.py
+# @author  Shreos Roychowdhury <shreos@tirja.com>
+# @version 1.0.0
+#
+# @section DESCRIPTION
+#
+#   NgramFeaturizer.py : integer-coded ngram_context features
+#
+# Gives the same column ids as OneHotEncoder.transform_ids(ngram_context(letters)),
+# without building any n-gram strings. Letters are coded as small integers. The
+# n-gram keys are base-`base` numbers of those codes, computed for all positions
+# with one small integer matmul. They are looked up with a single searchsorted
+# in a sorted (position, key) table.
+#
+# @section LICENSE
+#
+# Copyright (c) 2025 Shreos Roychowdhury.
+# Copyright (c) 2025 Tirja Consulting LLP.
+#
+# This source code is released under GNU Affero General Public License.
+# Please refer https://www.gnu.org/licenses/agpl-3.0.en.html#license-text
+#
+# THE SOFTWARE IS PROVIDED , WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+import numpy as np
+
+class NgramFeaturizer():
+	"""Integer-coded equivalent of ngram_context + OneHotEncoder.transform_ids.
+
+	Parameters
+	----------
+	unique_feats : list of per-position feature dicts of a fitted OneHotEncoder
+	n : context size used by ngram_context
+
+	`from_tables` rebuilds a featurizer from `letters` and the `keys_` / `ids_`
+	tables, as kept by ModelStore, without the feature dicts.
+	"""
+
+	def __init__(self, unique_feats, n=4):
+		self.set_layout(n)
+		if len(unique_feats) != len(self.layout):
+			raise ValueError('feature index has %d positions, ngram_context(n=%d) gives %d' % (
+				len(unique_feats), n, len(self.layout)))
+
+		letters = set()
+		for (k, s), feats in zip(self.layout, unique_feats):
+			for feat in feats:
+				letters.update(feat.split('|') if k > 1 else [feat])
+		letters.discard('_')
+		self.set_codes(sorted(letters))
+
+		keys, ids = [], []
+		for p, ((k, s), feats) in enumerate(zip(self.layout, unique_feats)):
+			for feat, col in feats.items():
+				grams = feat.split('|') if k > 1 else [feat]
+				if len(grams) != k:
+					continue
+				key = 0
+				for g in grams:
+					key = key * self.base + self.codes[g]
+				keys.append(p * self.span + key)
+				ids.append(col)
+		# sorted table, closed by a sentinel so every searchsorted index is valid
+		keys = np.array(keys, dtype=np.int64)
+		order = np.argsort(keys)
+		self.keys_ = np.append(keys[order], np.iinfo(np.int64).max)
+		self.ids_ = np.append(np.array(ids, dtype=np.int32)[order], np.int32(-1))
+
+	@classmethod
+	def from_tables(cls, letters, keys, ids, n=4):
+		"""Featurizer of the sorted `letters` (without `_`) and the sentinel-closed
+		keys_ / ids_ tables of another featurizer. The tables are used as is."""
+		featurizer = cls.__new__(cls)
+		featurizer.set_layout(n)
+		featurizer.set_codes(letters)
+		if keys.dtype != np.int64 or ids.dtype != np.int32 or keys.shape != ids.shape:
+			raise ValueError('keys and ids must be int64 and int32 tables of one length')
+		featurizer.keys_ = keys
+		featurizer.ids_ = ids
+		return featurizer
+
+	def set_layout(self, n):
+		self.n = n
+		width = 2 * n + 1
+		# position -> (n-gram order, first unigram of the window)
+		self.layout = [(1, s) for s in range(width)] + \
+			[(k, s) for k in range(2, n + 1) for s in range(width - k + 1)]
+
+	def set_codes(self, letters):
+		n, width = self.n, 2 * self.n + 1
+		# code 0 is the `_` padding, the last code is for letters never seen in training
+		self.codes = {'_': 0}
+		self.codes.update((l, i + 1) for i, l in enumerate(letters))
+		self.unknown = len(self.codes)
+		self.base = self.unknown + 1
+		self.span = self.base ** n
+		if self.span * len(self.layout) >= 2 ** 62:
+			raise ValueError('alphabet of %d letters is too large' % (self.base))
+		# keys = window @ powers_ + offsets_, window being the 2n+1 letter codes around a letter
+		self.window_ = np.arange(width)
+		self.powers_ = np.zeros((width, len(self.layout)), dtype=np.int64)
+		for p, (k, s) in enumerate(self.layout):
+			for t in range(k):
+				self.powers_[s + t, p] = self.base ** (k - 1 - t)
+		self.offsets_ = np.arange(len(self.layout), dtype=np.int64) * self.span
+
+	def encode(self, words):
+		"""Letter codes of words, each padded with n `_` on both sides, and
+		the index of each letter's window in the codes."""
+		get = self.codes.get
+		unknown = self.unknown
+		pad = [0] * self.n
+		codes, starts = [], []
+		for letters in words:
+			starts.extend(range(len(codes), len(codes) + len(letters)))
+			codes.extend(pad)
+			codes.extend([get(l, unknown) for l in letters])
+			codes.extend(pad)
+		return np.array(codes, dtype=np.int64), np.array(starts, dtype=np.intp)
+
+	def keys(self, codes, starts):
+		"""(position, n-gram) keys of every letter, shape (n_letters, n_positions)."""
+		window = codes[starts[:, None] + self.window_]
+		return window.dot(self.powers_) + self.offsets_
+
+	def lookup(self, keys):
+		"""Column ids of keys, -1 for unseen features."""
+		idx = np.searchsorted(self.keys_, keys)
+		ids = self.ids_[idx]
+		ids[self.keys_[idx] != keys] = -1
+		return ids
+
+	def transform(self, letters):
+		"""Column ids of the ngram_context features of letters, shape (len(letters), n_positions)."""
+		return self.lookup(self.keys(*self.encode([letters])))
+
+	def transform_batch(self, words):
+		"""Stacked column ids of many words, and row offsets: rows
+		offsets[i]:offsets[i + 1] belong to words[i]."""
+		offsets = np.zeros(len(words) + 1, dtype=np.intp)
+		np.cumsum([len(letters) for letters in words], out=offsets[1:])
+		return self.lookup(self.keys(*self.encode(words))), offsets
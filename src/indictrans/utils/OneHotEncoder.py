@@ -61,3 +61,12 @@ class OneHotEncoder():
 					one_hot_matrix[i, self.unique_feats[j][val]] = 1.0
 
 		return sp.csr_matrix(one_hot_matrix) if sparse else one_hot_matrix
+
+	def transform_ids(self, X):
+		"""Column ids of the active one-hot features of X, shape (n_samples, n_positions).
+		Unseen features are -1."""
+		ids = np.empty((len(X), len(self.unique_feats)), dtype=np.intp)
+		for j, feats in enumerate(self.unique_feats):
+			get = feats.get
+			ids[:, j] = [get(vec[j], -1) for vec in X]
+		return ids
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+#
+# @project IndicTrans
+# @file src/indictrans/utils/PersistentCache.py
+# @author  Shreos Roychowdhury <shreos@tirja.com>
+# @version 1.0.0
+#
+# @section DESCRIPTION
+#
+#   PersistentCache.py : transliterated words in a SQLite file shared by processes
+#
+# The database is in WAL mode, so any number of processes read it while one
+# writes, and it survives restarts. Rows are keyed by (pair, decoder, k, model
+# checksum, word): k is 0 for one-best decoders, the word is the normalized
+# (WX or lower-cased) input, and a retrained model gets a new checksum so
+# stale rows are never read.
+#
+#   trans = Transliterator('hin', 'eng', cache=PersistentCache('/var/cache/indictrans.db'))
+#
+# @section LICENSE
+#
+# Copyright (c) 2025 Shreos Roychowdhury.
+# Copyright (c) 2025 Tirja Consulting LLP.
+#
+# This source code is released under GNU Affero General Public License.
+# Please refer https://www.gnu.org/licenses/agpl-3.0.en.html#license-text
+#
+# THE SOFTWARE IS PROVIDED , WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+import os
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from indictrans.utils.TransliterationCache import CacheInfo
+
+SCHEMA = '''CREATE TABLE IF NOT EXISTS trans (
+	pair TEXT NOT NULL,
+	decode TEXT NOT NULL,
+	k INTEGER NOT NULL,
+	checksum TEXT NOT NULL,
+	word TEXT NOT NULL,
+	output TEXT NOT NULL,
+	PRIMARY KEY (pair, decode, k, checksum, word)
+) WITHOUT ROWID'''
+
+class PersistentCache():
+	"""SQLite database of transliterated words, for all pairs and decoders.
+
+	Transliterators bind it to their pair (see `bind`); each thread uses its
+	own connection. With `readonly`, nothing is written.
+	"""
+
+	# seconds a transaction (populate, drop, compact) waits for a writer of another process
+	timeout = 30.0
+	# seconds a single write of a transliteration waits: the cache is best effort
+	write_timeout = 0.005
+
+	def __init__(self, path, readonly=False):
+		self.path = path
+		self.readonly = readonly
+		self.local = threading.local()
+		if not readonly:
+			conn = self.connection()
+			if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'trans'").fetchone() is None:
+				with self.transaction() as conn:
+					conn.execute(SCHEMA)
+
+	def connection(self):
+		conn = getattr(self.local, 'conn', None)
+		# connections must not cross a fork, e.g. to the workers of convert_many
+		if conn is None or self.local.pid != os.getpid():
+			if self.readonly:
+				conn = sqlite3.connect('file:%s?mode=ro' % (self.path), uri=True,
+					timeout=self.timeout, isolation_level=None)
+			else:
+				conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+				conn.execute('PRAGMA journal_mode=WAL')
+				# in WAL mode, commits are durable across crashes of the process
+				conn.execute('PRAGMA synchronous=NORMAL')
+			# writes of transliterations do not wait, see `waiting`
+			conn.execute('PRAGMA busy_timeout = %d' % (self.write_timeout * 1000))
+			self.local.conn = conn
+			self.local.pid = os.getpid()
+		return conn
+
+	@contextmanager
+	def waiting(self):
+		"""The connection of this thread, waiting up to `timeout` for other
+		writers instead of `write_timeout`."""
+		conn = self.connection()
+		conn.execute('PRAGMA busy_timeout = %d' % (self.timeout * 1000))
+		try:
+			yield conn
+		finally:
+			conn.execute('PRAGMA busy_timeout = %d' % (self.write_timeout * 1000))
+
+	@contextmanager
+	def transaction(self):
+		"""Groups the writes of this thread into one commit, e.g. to pre-populate."""
+		conn = self.connection()
+		if conn.in_transaction:
+			yield conn
+			return
+		with self.waiting():
+			conn.execute('BEGIN IMMEDIATE')
+		try:
+			yield conn
+		except BaseException:
+			conn.execute('ROLLBACK')
+			raise
+		with self.waiting():
+			conn.execute('COMMIT')
+
+	def bind(self, pair, decode, checksum, front=None):
+		"""The cache of one pair and decoder, with an in-memory `front` cache."""
+		return PairCache(self, pair, decode, checksum, front)
+
+	def stats(self):
+		"""(pair, decode, k, checksum, rows) of every key group."""
+		return self.connection().execute('SELECT pair, decode, k, checksum, COUNT(*) FROM trans '
+			'GROUP BY pair, decode, k, checksum ORDER BY pair, decode, k').fetchall()
+
+	def drop(self, pair, decode=None, checksum=None):
+		"""Deletes the rows of a pair (and decoder, and checksum), returns their count."""
+		query, args = 'DELETE FROM trans WHERE pair = ?', [pair]
+		if decode is not None:
+			query, args = query + ' AND decode = ?', args + [decode]
+		if checksum is not None:
+			query, args = query + ' AND checksum = ?', args + [checksum]
+		with self.transaction() as conn:
+			return conn.execute(query, args).rowcount
+
+	def compact(self):
+		"""Folds the write-ahead log into the database and reclaims free pages."""
+		with self.waiting() as conn:
+			conn.execute('VACUUM')
+			conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+
+	def close(self):
+		conn = getattr(self.local, 'conn', None)
+		if conn is not None:
+			conn.close()
+			self.local.conn = None
+
+
+class PairCache():
+	"""PersistentCache rows of one pair, decoder and model, with the get/put
+	interface of LRUCache. Hits of the database are copied to `front`."""
+
+	def __init__(self, db, pair, decode, checksum, front=None):
+		self.db = db
+		self.prefix = (pair, decode)
+		self.checksum = checksum
+		self.front = front
+		self.hits = 0
+		self.misses = 0
+		self.write_errors = 0
+		self.lock = threading.Lock()
+
+	def get(self, key):
+		if self.front is not None:
+			value = self.front.get(key)
+			if value is not None:
+				with self.lock:
+					self.hits += 1
+				return value
+		word, k = (key, 0) if isinstance(key, str) else key
+		row = self.db.connection().execute('SELECT output FROM trans WHERE pair = ? AND decode = ? '
+			'AND k = ? AND checksum = ? AND word = ?', self.prefix + (k, self.checksum, word)).fetchone()
+		with self.lock:
+			if row is None:
+				self.misses += 1
+				return None
+			self.hits += 1
+		value = row[0] if k == 0 else tuple(json.loads(row[0]))
+		if self.front is not None:
+			self.front.put(key, value)
+		return value
+
+	def put(self, key, value):
+		if self.front is not None:
+			self.front.put(key, value)
+		if self.db.readonly:
+			return
+		word, k = (key, 0) if isinstance(key, str) else key
+		output = value if k == 0 else json.dumps(list(value), ensure_ascii=False)
+		try:
+			self.db.connection().execute('INSERT OR REPLACE INTO trans VALUES (?, ?, ?, ?, ?, ?)',
+				self.prefix + (k, self.checksum, word, output))
+		except sqlite3.OperationalError:
+			# the cache is best effort: a locked or read-only file only costs a recomputation
+			with self.lock:
+				self.write_errors += 1
+
+	def cache_info(self):
+		"""Hits of the front cache or the database, and rows of this pair and model."""
+		currsize = self.db.connection().execute('SELECT COUNT(*) FROM trans WHERE pair = ? AND decode = ? '
+			'AND checksum = ?', self.prefix + (self.checksum,)).fetchone()[0]
+		with self.lock:
+			return CacheInfo(self.hits, self.misses, None, currsize)
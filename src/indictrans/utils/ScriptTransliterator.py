@@ -42,47 +42,43 @@ from indictrans.utils.BaseTransliterator import BaseTransliterator
 
 class Ind2Target(BaseTransliterator):
 	"""Transliterates text from Indic to Roman/Urdu script"""
-	def __init__(self, source, target, decoder, build_lookup=False):
-		super(Ind2Target, self).__init__(source, target, decoder, build_lookup)
+	def __init__(self, source, target, decoder, build_lookup=False, cache=None, lexicon=None):
+		super(Ind2Target, self).__init__(source, target, decoder, build_lookup, cache, lexicon)
 		self.letters = set(string.ascii_letters)
-		self.non_alpha = re.compile(r"([^a-zA-Z%s]+)" % (self.esc_ch))
+		self.set_alphabet(r"a-zA-Z%s" % (self.esc_ch))
 		# initialize WX back-convertor for Indic to Indic transliteration
 		self._to_indic = False
 		if target not in ['eng', 'urd']:
-			wxp = WXEncoder(order='wx2utf', lang=target)
+			wxp = WXEncoder.shared(order='wx2utf', lang=target)
 			self._to_utf = wxp.wx2utf
 			self._to_indic = True
 
-	def case_trans(self, word, k_best=5):
-		oword = word
+	def prepare_word(self, word):
 		if not word:
-			return ''
+			return '', None
 		if word[0] == self.esc_ch:
-			return word[1:]
+			return word[1:], None
 		if word[0] not in self.letters:
 			if self.target == 'urd':
-				return word.translate(self.punkt_tbl)
-			return word
-		if oword in self.lookup:
-			return self.lookup[oword]
+				return word.translate(self.punkt_tbl), None
+			return word, None
 		word = ' '.join(word)
 		word = re.sub(r' ([VYZ])', r'\1', word)
 		if not self._to_indic:
 			word = word.replace(' a', 'a')
-		word_feats = ngram_context(word.split())
-		t_word = self.predict(word_feats, k_best)
+		return None, word.split()
+
+	def finish_word(self, oword, t_word):
 		if self._to_indic:
 			t_word = self._to_utf(t_word)
-		if self.build_lookup:
-			self.lookup[oword] = t_word
 		return t_word
 
 
 class Rom2Target(BaseTransliterator):
 	"""Transliterates text from Roman to Indic script"""
-	def __init__(self, source, target, decoder, build_lookup=False):
-		super(Rom2Target, self).__init__(source, target, decoder, build_lookup)
-		self.non_alpha = re.compile(r"([^a-z]+)")
+	def __init__(self, source, target, decoder, build_lookup=False, cache=None, lexicon=None):
+		super(Rom2Target, self).__init__(source, target, decoder, build_lookup, cache, lexicon)
+		self.set_alphabet(r"a-z")
 		self.letters = set(string.ascii_letters[:26])
 
 	def handle_matra(self, text):
@@ -100,71 +96,52 @@ class Rom2Target(BaseTransliterator):
 		text = re.sub(r'([bcdhjklpstvy])M', r'\1aM', text)
 		return text
 
-	def case_trans(self, word, k_best=5):
-		oword = word
+	def prepare_word(self, word):
 		if not word:
-			return ''
+			return '', None
 		elif word[0] not in self.letters:
-			return word
-		if oword in self.lookup:
-			if self.target == 'urd':
-				return self.lookup[oword]
-			if self.decode == 'viterbi':
-				return self.wx_process(self.lookup[oword])
-			else:
-				return [self.wx_process(w) for w in self.lookup[oword]]
+			return word, None
 		word = re.sub(r'([a-z])\1\1+', r'\1\1', word)
 		word = ' '.join(word)
 		word = re.sub(r'([bcdgjptsk]) h', r'\1h', word)
-		word_feats = ngram_context(word.split(), n=4)
-		t_word = self.predict(word_feats, k_best)
+		return None, word.split()
+
+	def finish_word(self, oword, t_word):
 		if self.target != 'urd':
-			if self.decode == 'viterbi':
+			if self.one_best:
 				t_word = self.handle_matra(t_word)
 				t_word = self.wx_process(t_word)
 			else:
 				t_word = [self.handle_matra(w) for w in t_word]
 				t_word = [self.wx_process(w) for w in t_word]
-		if self.build_lookup:
-			self.lookup[oword] = t_word
 		return t_word
 
 
 class Urd2Target(BaseTransliterator):
 	"""Transliterate text from Persio-Arabic to Indic script"""
-	def __init__(self, source, target, decoder, build_lookup=False):
-		super(Urd2Target, self).__init__(source, target, decoder, build_lookup)
-		self.non_alpha = re.compile(
-			'([^\u0621-\u063a\u0641-\u064a\u0674-\u06d3\u064b\u0651\u0670]+)')
+	def __init__(self, source, target, decoder, build_lookup=False, cache=None, lexicon=None):
+		super(Urd2Target, self).__init__(source, target, decoder, build_lookup, cache, lexicon)
+		self.set_alphabet('\u0621-\u063a\u0641-\u064a\u0674-\u06d3\u064b\u0651\u0670')
 		self.letters = set(map(unichr,
 			list(range(ord("\u0621"), ord("\u063b"))) +
 			list(range(ord("\u0641"), ord("\u064b"))) +
 			list(range(ord("\u0674"), ord("\u06d4")))))
 
-	def case_trans(self, word, k_best=5):
-		oword = word
+	def prepare_word(self, word):
 		if not word:
-			return ''
+			return '', None
 		elif word[0] not in self.letters:
-			return word.translate(self.punkt_tbl)
-		if oword in self.lookup:
-			if self.target == 'eng':
-				return self.lookup[oword]
-			if self.decode == 'viterbi':
-				return self.wx_process(self.lookup[oword])
-			else:
-				return [self.wx_process(w) for w in self.lookup[oword]]
+			return word.translate(self.punkt_tbl), None
 		word = ' '.join(word)
 		word = word.replace(' \u06be', '\u06be')
-		word_feats = ngram_context(word.split(), n=4)
-		t_word = self.predict(word_feats, k_best)
+		return None, word.split()
+
+	def finish_word(self, oword, t_word):
 		if self.target != 'eng':
-			if self.decode == 'viterbi':
+			if self.one_best:
 				t_word = self.wx_process(t_word)
 			else:
 				t_word = [self.wx_process(w) for w in t_word]
-		if self.build_lookup:
-			self.lookup[oword] = t_word
 		return t_word
 
 class Ind2IndRB():
@@ -172,8 +149,8 @@ class Ind2IndRB():
 	def __init__(self, source, target):
 		self.source = source
 		self.target = target
-		self.get_wx = WXEncoder(order='utf2wx', lang=self.source).utf2wx
-		self.get_utf = WXEncoder(order='wx2utf', lang=self.target).wx2utf
+		self.get_wx = WXEncoder.shared(order='utf2wx', lang=self.source).utf2wx
+		self.get_utf = WXEncoder.shared(order='wx2utf', lang=self.target).wx2utf
 		self.esc_ch = '\x00'  # escape-sequence for Roman in WX
 		self.mask_roman = re.compile(r'([a-zA-Z]+)')
 		self.non_alpha = re.compile(r"([^a-zA-Z%s]+)" % (self.esc_ch))
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+#
+# @project IndicTrans
+# @file src/indictrans/utils/SparseTransitions.py
+# @author  Shreos Roychowdhury <shreos@tirja.com>
+# @version 1.0.0
+#
+# @section DESCRIPTION
+#
+#   SparseTransitions.py : predecessor lists of the transitions that can win
+#
+# At each step, Viterbi picks for state k the predecessor j maximizing
+# delta[j] + b_trans[j, k]. Emission scores are bounded, and so is the gap
+# delta[a] - delta[b] between two states at any step. If that bound alone makes
+# a beat b into k, b -> k can never win and is dropped. What is left is kept as
+# CSR predecessor lists (ascending, so ties still go to the lowest state), and
+# decoding over them gives exactly the paths of the dense decoder.
+#
+# @section LICENSE
+#
+# Copyright (c) 2025 Shreos Roychowdhury.
+# Copyright (c) 2025 Tirja Consulting LLP.
+#
+# This source code is released under GNU Affero General Public License.
+# Please refer https://www.gnu.org/licenses/agpl-3.0.en.html#license-text
+#
+# THE SOFTWARE IS PROVIDED , WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+import numpy as np
+
+class SparseTransitions():
+	"""Transitions that can be taken by Viterbi decoding, as predecessor lists.
+
+	Parameters
+	----------
+	b_trans : transition weights, shape (n_states, n_states)
+	init : initial weights
+	em_low, em_high : lower and upper bounds of the emission score of each state,
+		see EmissionScorer.bounds
+	"""
+
+	# pruning is worth the indirection below this fraction of kept transitions
+	max_density = 0.5
+	# safety margin against rounding, relative to the magnitude of the scores
+	rtol = 1e-6
+	# rounds of tightening the bound on score gaps
+	n_rounds = 3
+
+	def __init__(self, b_trans, init, em_low, em_high):
+		n_states = b_trans.shape[0]
+		em_gap = em_low[:, None] - em_high[None, :]
+		init_gap = init[:, None] - init[None, :]
+		# gap[a, b] <= delta[a] - delta[b] at every step. It starts from knowing
+		# nothing but gap[a, a] = 0; each round bounds the next step from the last.
+		gap = np.full((n_states, n_states), -np.inf)
+		for i in range(self.n_rounds):
+			np.fill_diagonal(gap, 0)
+			gap = em_gap + np.minimum(init_gap, self.trans_gap(b_trans, gap))
+		np.fill_diagonal(gap, 0)
+		margin = self.rtol * (1 + np.abs(em_low).max() + np.abs(em_high).max() +
+			np.abs(b_trans).max() + np.abs(init).max())
+
+		# keep[k, b]: no a always beats b into k
+		keep = np.empty((n_states, n_states), dtype=bool)
+		for k in range(n_states):
+			wins = gap + b_trans[:, k][:, None] - b_trans[:, k][None, :]
+			keep[k] = ~(wins > margin).any(axis=0)
+
+		targets, preds = np.nonzero(keep)
+		self.indptr_ = np.zeros(n_states + 1, dtype=np.intp)
+		np.cumsum(keep.sum(axis=1), out=self.indptr_[1:])
+		self.indices_ = preds.astype(np.intp)
+		self.density = self.indices_.shape[0] / float(n_states * n_states)
+
+	@staticmethod
+	def trans_gap(b_trans, gap):
+		"""Lower bound of max_l(d[l] + b_trans[l, a]) - max_l(d[l] + b_trans[l, b]),
+		for all scores d with d[l'] - d[l] >= gap[l', l]."""
+		n_states = b_trans.shape[0]
+		# reach[l, a] <= max_l'(d[l'] + b_trans[l', a]) - d[l]
+		reach = np.empty((n_states, n_states))
+		for l in range(n_states):
+			reach[l] = (gap[:, l][:, None] + b_trans).max(axis=0)
+		# l being the best predecessor of b
+		bound = np.empty((n_states, n_states))
+		for a in range(n_states):
+			bound[a] = (reach[:, a][:, None] - b_trans).min(axis=0)
+		return bound
+
+	def decode_args(self):
+		"""Keyword arguments restricting viterbi decoders to the kept
+		transitions, or none if pruning is not worth it."""
+		if self.density > self.max_density:
+			return {}
+		return {'pred_indptr': self.indptr_, 'pred_indices': self.indices_}
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+#
+# @project IndicTrans
+# @file src/indictrans/utils/TransliterationCache.py
+# @author  Shreos Roychowdhury <shreos@tirja.com>
+# @version 1.0.0
+#
+# @section DESCRIPTION
+#
+#   TransliterationCache.py : bounded, thread-safe caches of transliterated words
+#
+# A transliterator with a cache looks a word up before running the model on it,
+# and stores the final output after. LRUCache evicts the least recently used
+# word. TinyLFUCache also keeps a compact estimate of how often words were
+# asked for, and only lets a new word displace a cached one that was asked for
+# less often, so a burst of rare words does not flush the frequent ones.
+#
+# @section LICENSE
+#
+# Copyright (c) 2025 Shreos Roychowdhury.
+# Copyright (c) 2025 Tirja Consulting LLP.
+#
+# This source code is released under GNU Affero General Public License.
+# Please refer https://www.gnu.org/licenses/agpl-3.0.en.html#license-text
+#
+# THE SOFTWARE IS PROVIDED , WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+import threading
+from collections import OrderedDict, namedtuple
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+class LRUCache():
+	"""Least recently used cache of at most `maxsize` words.
+
+	One cache holds the outputs of one language pair and decoder; it may be
+	shared by any number of transliterators of that pair, and threads.
+	"""
+
+	def __init__(self, maxsize=100000):
+		if maxsize < 1:
+			raise ValueError('`maxsize` should be >= 1')
+		self.maxsize = maxsize
+		self.hits = 0
+		self.misses = 0
+		self.lock = threading.Lock()
+		self.data = OrderedDict()
+
+	def get(self, key):
+		"""The cached value of key, or None."""
+		with self.lock:
+			value = self.data.get(key)
+			if value is None:
+				self.misses += 1
+			else:
+				self.hits += 1
+				self.data.move_to_end(key)
+			return value
+
+	def put(self, key, value):
+		with self.lock:
+			self.data[key] = value
+			self.data.move_to_end(key)
+			if len(self.data) > self.maxsize:
+				self.data.popitem(last=False)
+
+	def clear(self):
+		with self.lock:
+			self.data.clear()
+			self.hits = self.misses = 0
+
+	def cache_info(self):
+		"""Hit and miss counters and size, like functools.lru_cache."""
+		with self.lock:
+			return CacheInfo(self.hits, self.misses, self.maxsize, len(self))
+
+	def __len__(self):
+		return len(self.data)
+
+	def __contains__(self, key):
+		return key in self.data
+
+
+class FrequencySketch():
+	"""Count-min sketch of recent key frequencies. Counters saturate at 15 and
+	are halved every `sample_size` additions, so that old popularity fades."""
+
+	depth = 4
+	seeds = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93)
+	halve = bytes(c >> 1 for c in range(256))
+
+	def __init__(self, width, sample_size):
+		self.width = 1
+		while self.width < width:
+			self.width *= 2
+		self.sample_size = sample_size
+		self.additions = 0
+		self.counts = bytearray(self.depth * self.width)
+
+	def indexes(self, key):
+		h = hash(key) & 0xFFFFFFFFFFFFFFFF
+		mask = self.width - 1
+		return [row * self.width + ((((h * seed) & 0xFFFFFFFFFFFFFFFF) >> 32) & mask)
+			for row, seed in enumerate(self.seeds)]
+
+	def add(self, key):
+		counts = self.counts
+		for i in self.indexes(key):
+			if counts[i] < 15:
+				counts[i] += 1
+		self.additions += 1
+		if self.additions >= self.sample_size:
+			self.counts = bytearray(counts.translate(self.halve))
+			self.additions //= 2
+
+	def estimate(self, key):
+		counts = self.counts
+		return min(counts[i] for i in self.indexes(key))
+
+
+class TinyLFUCache(LRUCache):
+	"""Cache of at most `maxsize` words with TinyLFU admission.
+
+	New words enter a small LRU window (`window` of the size). A word pushed
+	out of the window replaces the least recently used word of the main part
+	only if its estimated frequency is higher; otherwise it is dropped.
+	"""
+
+	def __init__(self, maxsize=100000, window=0.01):
+		super(TinyLFUCache, self).__init__(maxsize)
+		self.window_size = max(1, int(maxsize * window))
+		self.main_size = maxsize - self.window_size
+		self.window = OrderedDict()
+		# four counters per cached word and row keep collisions rare
+		self.sketch = FrequencySketch(4 * maxsize, 10 * maxsize)
+
+	def get(self, key):
+		with self.lock:
+			self.sketch.add(key)
+			value = self.window.get(key)
+			if value is not None:
+				self.hits += 1
+				self.window.move_to_end(key)
+				return value
+			value = self.data.get(key)
+			if value is None:
+				self.misses += 1
+			else:
+				self.hits += 1
+				self.data.move_to_end(key)
+			return value
+
+	def put(self, key, value):
+		with self.lock:
+			if key in self.data:
+				self.data[key] = value
+				self.data.move_to_end(key)
+				return
+			self.window[key] = value
+			self.window.move_to_end(key)
+			if len(self.window) <= self.window_size:
+				return
+			key, value = self.window.popitem(last=False)
+			if len(self.data) >= self.main_size:
+				if self.main_size == 0:
+					return
+				victim = next(iter(self.data))
+				if self.sketch.estimate(key) <= self.sketch.estimate(victim):
+					return
+				del self.data[victim]
+			self.data[key] = value
+
+	def clear(self):
+		with self.lock:
+			self.window.clear()
+		super(TinyLFUCache, self).clear()
+
+	def __len__(self):
+		return len(self.data) + len(self.window)
+
+	def __contains__(self, key):
+		return key in self.window or key in self.data
+
+
+CACHES = {
+	"lru": LRUCache,
+	"tinylfu": TinyLFUCache
+}
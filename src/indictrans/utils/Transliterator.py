@@ -28,8 +28,17 @@
 # CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 # 
 
-from indictrans.utils.HandleDecoders import DECODERS
+import io
+import os
+import multiprocessing
+from collections import deque
+from itertools import islice
+
+import numpy as np
+
+from indictrans.utils.HandleDecoders import DECODERS, ONE_BEST
 from indictrans.utils.ScriptTransliterator import (Ind2Target, Rom2Target, Urd2Target, Ind2IndRB)
+from indictrans.utils.BaseTransliterator import BaseTransliterator, WORD
 
 NORB_NOT_FOUND = [
 	('hin' , 'mar'), ('mar' , 'hin'),
@@ -52,17 +61,42 @@ def _get_decoder(decode):
 		raise ValueError('Unknown decoder {0!r}'.format(decode))
 
 def _get_trans(trans, decode):
-	if decode == 'viterbi':
+	if decode in ONE_BEST:
 		return trans.transliterate
 	else:
 		return trans.top_n_trans
 
+# transliterator inherited by forked workers of convert_many, and the one of a worker
+_preloaded = None
+_worker = None
+
+def _init_worker(params):
+	global _worker
+	_worker = _preloaded if _preloaded is not None else Transliterator(**params)
+
+def _convert_chunk(lines):
+	return [_worker.convert(line) for line in lines]
+
+def _trans_chunk(words):
+	return _worker.transform.__self__.trans_words(words)
+
 class Transliterator():
-	"""Transliterator for Indic scripts including English and Urdu."""
+	"""Transliterator for Indic scripts including English and Urdu.
+
+	With `build_lookup`, words are cached in a bounded cache shared by all
+	transliterators of the pair and decoder; `cache` is an explicit one instead
+	(an LRUCache or TinyLFUCache, used for this one pair and decoder only), or a
+	PersistentCache database, read when the build_lookup cache (if any) misses.
+	A `lexicon` (a Lexicon, or the path of one compiled by indictrans-lexicon
+	for the pair, decoder and model) is read before any cache.
+	"""
 
-	def __init__(self, source='hin', target='eng', decode='viterbi', build_lookup=False, rb=True):
+	def __init__(self, source='hin', target='eng', decode='viterbi', build_lookup=False, rb=True, cache=None, lexicon=None):
 		source = source.lower()
 		target = target.lower()
+		# to build the transliterator again in workers that are not forked
+		self.params = dict(source=source, target=target, decode=decode, build_lookup=build_lookup, rb=rb,
+			lexicon=lexicon if isinstance(lexicon, str) else None)
 		if source == target or (source,target) in NORB_NOT_FOUND:
 			self.donthandle = True
 			return None
@@ -73,14 +107,14 @@ class Transliterator():
 			if target not in impl or source == target:
 				raise NotImplementedError( 'Language pair `%s-%s` is not implemented.' % (source, target))
 			if source == 'eng':
-				ru2i = Rom2Target(source, target, decoder, build_lookup)
+				ru2i = Rom2Target(source, target, decoder, build_lookup, cache, lexicon)
 			else:
-				ru2i = Urd2Target(source, target, decoder, build_lookup)
+				ru2i = Urd2Target(source, target, decoder, build_lookup, cache, lexicon)
 			self.transform = _get_trans(ru2i, decode)
 		elif target in ['eng', 'urd']:
 			if source not in impl or source == target:
 				raise NotImplementedError( 'Language pair `%s-%s` is not implemented.' % (source, target))
-			i2o = Ind2Target(source, target, decoder, build_lookup)
+			i2o = Ind2Target(source, target, decoder, build_lookup, cache, lexicon)
 			self.transform = _get_trans(i2o, decode)
 		else:
 			if source not in impl or target not in impl or source == target:
@@ -88,11 +122,129 @@ class Transliterator():
 			if rb:
 				self.transform = Ind2IndRB(source, target).rtrans
 			else:
-				i2i = Ind2Target(source, target, decoder, build_lookup)
+				i2i = Ind2Target(source, target, decoder, build_lookup, cache, lexicon)
 				self.transform = _get_trans(i2i, decode)
 
+	def cache_info(self):
+		"""Hit and miss counters of the word cache (build_lookup or `cache`), or None."""
+		cache = getattr(getattr(getattr(self, 'transform', None), '__self__', None), 'cache', None)
+		return cache.cache_info() if cache is not None else None
+
 	def check(self):
 		return False if self.donthandle else True
 
 	def convert(self, line):
 		return self.transform(line) if (not self.donthandle) else ''
+
+	def convert_many(self, lines, workers=None, chunksize=1000):
+		"""Converts an iterable of lines with `workers` processes (default: one
+		per CPU), yielding the outputs in input order.
+
+		Lines are sent to the workers in chunks of `chunksize`, and at most two
+		chunks per worker are in flight, so any number of lines is converted
+		in bounded memory. Where processes are forked, the workers share the
+		models (and caches) already loaded by this transliterator; elsewhere
+		each worker loads them again, without the `cache` object.
+		"""
+		workers = workers or os.cpu_count() or 1
+		if workers == 1 or self.donthandle:
+			for line in lines:
+				yield self.convert(line)
+			return
+		lines = iter(lines)
+		chunks = iter(lambda: list(islice(lines, chunksize)), [])
+		for tlines in self.map_chunks(_convert_chunk, chunks, workers):
+			yield from tlines
+
+	def convert_corpus(self, texts, workers=None, chunksize=1000):
+		"""Converts a corpus in two passes, yielding the output of every line
+		(or text) as `convert` would.
+
+		The first pass counts the distinct words of the corpus, which are then
+		transliterated once each, most frequent first, by `workers` processes
+		(see convert_many). The second pass rewrites the lines from these words.
+		`texts` is the name of a UTF-8 file, or a sequence that can be read twice.
+		Rule-based and k-best transliterators convert line by line.
+		"""
+		def read():
+			if isinstance(texts, str):
+				with io.open(texts, encoding='utf-8') as fp:
+					yield from fp
+			else:
+				yield from texts
+
+		trans = getattr(getattr(self, 'transform', None), '__self__', None)
+		if self.donthandle or not isinstance(trans, BaseTransliterator) or not trans.one_best:
+			yield from self.convert_many(read(), workers, chunksize)
+			return
+		if iter(texts) is texts:
+			raise ValueError('`texts` should be a file name or a sequence, not an iterator')
+		counts = trans.count_types(read())
+		words = sorted(counts, key=lambda w: (-counts[w], w))
+		del counts
+		chunks = (words[i:i + chunksize] for i in range(0, len(words), chunksize))
+		workers = workers or os.cpu_count() or 1
+		if workers == 1:
+			t_words = map(trans.trans_words, chunks)
+		else:
+			t_words = self.map_chunks(_trans_chunk, chunks, workers)
+		types = dict(zip(words, (t_word for chunk in t_words for t_word in chunk)))
+		del words
+		for text in read():
+			yield trans.rewrite(trans.convert_to_wx(text), types)
+
+	def convert_column(self, data, offsets):
+		"""Converts a column of UTF-8 strings in Arrow layout: one buffer, and
+		the int64 offsets of its rows (n + 1 of them). Returns the buffer and
+		offsets of the outputs.
+
+		The distinct words of all rows are transliterated in one batch. ASCII
+		columns are decoded, and ASCII outputs encoded, without a string per row.
+		"""
+		data = memoryview(data)
+		bounds = np.asarray(offsets, dtype=np.int64).tolist()
+		try:
+			text = str(data, 'ascii')
+			texts = [text[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+		except UnicodeDecodeError:
+			texts = [str(data[a:b], 'utf-8') for a, b in zip(bounds[:-1], bounds[1:])]
+		trans = getattr(getattr(self, 'transform', None), '__self__', None)
+		if not self.donthandle and isinstance(trans, BaseTransliterator) and trans.one_best:
+			rows = [trans.convert_to_wx(text) for text in texts]
+			words = list(dict.fromkeys([row[start:end] for row in rows for start, end, kind in trans.spans(row)
+				if kind == WORD]))
+			types = dict(zip(words, trans.trans_words(words)))
+			tlines = [trans.rewrite(row, types) for row in rows]
+		else:
+			tlines = [self.convert(text) for text in texts]
+		out_offsets = np.zeros(len(tlines) + 1, dtype=np.int64)
+		out = ''.join(tlines)
+		if out.isascii():
+			np.cumsum([len(tline) for tline in tlines], out=out_offsets[1:])
+			return out.encode('ascii'), out_offsets
+		encoded = [tline.encode('utf-8') for tline in tlines]
+		np.cumsum([len(tline) for tline in encoded], out=out_offsets[1:])
+		return b''.join(encoded), out_offsets
+
+	def map_chunks(self, func, chunks, workers):
+		"""Results of `func` on each chunk, in order, computed by `workers`
+		processes that hold a copy of this transliterator."""
+		global _preloaded
+		if 'fork' in multiprocessing.get_all_start_methods():
+			ctx = multiprocessing.get_context('fork')
+		else:
+			ctx = multiprocessing.get_context()
+		_preloaded = self
+		try:
+			pool = ctx.Pool(workers, _init_worker, (self.params,))
+		finally:
+			_preloaded = None
+		pending = deque()
+		# leaving the pool terminates the workers, also when the generator is closed early
+		with pool:
+			while True:
+				for chunk in islice(chunks, 2 * workers - len(pending)):
+					pending.append(pool.apply_async(func, (chunk,)))
+				if not pending:
+					break
+				yield pending.popleft().get()
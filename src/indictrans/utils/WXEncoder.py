@@ -30,16 +30,45 @@
 
 from __future__ import unicode_literals
 import re
+import threading
 from six import unichr
 
+from indictrans.utils import WXTransducer
+
 class WXEncoder():
 	"""WX-converter for UTF to WX conversion of Indic scripts and vice-versa. """
 
+	# shared encoders, see `shared`
+	encoders = dict()
+	encoders_lock = threading.Lock()
+	# str.translate tables of the scripts, see `script_tables`
+	tables = dict()
+
 	def __init__(self, order='utf2wx', lang='hin'):
 		self.order = order
 		self.lang_tag = lang.lower()
 		self.fit()
 
+	@classmethod
+	def shared(cls, order='utf2wx', lang='hin'):
+		"""The encoder of (order, lang) shared by all transliterators and threads.
+		It is fitted once per process and read-only after."""
+		key = (order, lang.lower())
+		encoder = cls.encoders.get(key)
+		if encoder is None:
+			with cls.encoders_lock:
+				encoder = cls.encoders.get(key)
+				if encoder is None:
+					encoder = cls(order, lang)
+					encoder.frozen = True
+					cls.encoders[key] = encoder
+		return encoder
+
+	def __setattr__(self, name, value):
+		if getattr(self, 'frozen', False):
+			raise AttributeError('shared WXEncoder %s %s is read-only' % (self.order, self.lang_tag))
+		object.__setattr__(self, name, value)
+
 	def fit(self):
 		self.punctuation = r'!"#$%&\'()*+,-./:;<=>?@\[\\\]^_`{|}~'
 		# Handle iscii characters
@@ -109,7 +138,8 @@ class WXEncoder():
 		self.cqmd = re.compile("([%s])q([MHz])" % const)
 		self.qmd = re.compile("q([MHz])")
 		self.dig = re.compile("([0-9])")
-		self.i2u = re.compile('([\xA1-\xFB])')
+		self.i2u_tables = self.script_tables('i2u', self.i2u_script_tables)
+		self.transducer = WXTransducer.compiled('wx2iscii')
 
 	def initialize_utf2wx_hash(self):
 
@@ -155,19 +185,54 @@ class WXEncoder():
 		self.cnmd = re.compile("([\xB3-\xD8])\xE9([\xA1-\xA3])")
 		self.cmmd = re.compile("([\xB3-\xD8])([\xDA-\xE7])([\xA1-\xA3])")
 		self.cnmmd = re.compile("([\xB3-\xD8])\xE9([\xDA-\xE7])([\xA1-\xA3])")
-		self.u2i_h = re.compile("([\u0900-\u097F])")
-		self.u2i_t = re.compile("([\u0C01-\u0C6F])")
-		self.u2i_k = re.compile("([\u0C80-\u0CFF])")
-		self.u2i_m = re.compile("([\u0D00-\u0D6F])")
-		self.u2i_b = re.compile("([\u0980-\u09EF])")
-		self.u2i_o = re.compile("([\u0B00-\u0B7F])")
-		self.u2i_p = re.compile("([\u0A01-\u0A75])")
-		self.u2i_g = re.compile("([\u0A80-\u0AFF])")
-		self.u2i_ta = re.compile("([\u0B82-\u0BEF])")
-		self.u2i_hn = re.compile("([\u0958-\u095F])")
-		self.u2i_on = re.compile("([\u0B5C\u0B5D\u0B5F])")
-		self.u2i_bn = re.compile("([\u09DC\u09DD\u09DF])")
-		self.u2i_pn = re.compile("([\u0A59-\u0A5B\u0A5E])")
+		self.u2i_tables = self.script_tables('u2i', self.u2i_script_tables)
+		self.transducer = WXTransducer.compiled('iscii2wx')
+
+	@classmethod
+	def script_tables(cls, name, build):
+		"""The str.translate tables `name` of all scripts, built once per process."""
+		tables = cls.tables.get(name)
+		if tables is None:
+			# building twice in a race is harmless: the tables only depend on constants
+			tables = cls.tables[name] = build()
+		return tables
+
+	def i2u_script_tables(self):
+		"""ISCII to Unicode per script"""
+		tables = dict()
+		for lang, hash_i2u in (('hin', self.hashh_i2u), ('tel', self.hasht_i2u), ('pan', self.hashp_i2u),
+				('kan', self.hashk_i2u), ('mal', self.hashm_i2u), ('ben', self.hashb_i2u),
+				('tam', self.hashcta_i2u), ('ori', self.hasho_i2u), ('guj', self.hashg_i2u)):
+			tables[lang] = self.translate_table(0xA1, 0xFB, hash_i2u)
+		return tables
+
+	def u2i_script_tables(self):
+		"""Unicode to ISCII per script"""
+		# NUKTA variations are rewritten per character, so they are folded into the tables
+		nukta = lambda chars, norm, sign: lambda ch: norm.get(ch, "") + sign if ch in chars else ch
+		return {
+			'hin': self.translate_table(0x0900, 0x097F, self.hashh_u2i, nukta(
+				'\u0958\u0959\u095A\u095B\u095C\u095D\u095E\u095F', self.unicode_norm_hashh_u2i, "\u093C")),
+			'tel': self.translate_table(0x0C01, 0x0C6F, self.hasht_u2i),
+			'pan': self.translate_table(0x0A01, 0x0A75, self.hashp_u2i,
+				lambda ch: nukta('\u0A59\u0A5A\u0A5B\u0A5E', self.unicode_norm_hashp_u2i, "\u0A3C")(ch).replace("\u0A5C", "\xBF\xE9")),
+			'kan': self.translate_table(0x0C80, 0x0CFF, self.hashk_u2i, lambda ch: ch.replace('\u0CDE', '\u0CAB\u0CBC')),
+			'mal': self.translate_table(0x0D00, 0x0D6F, self.hashm_u2i),
+			'ben': self.translate_table(0x0980, 0x09EF, self.hashb_u2i, nukta('\u09DC\u09DD\u09DF', self.unicode_norm_hashb_u2i, "\u09BC")),
+			'tam': self.translate_table(0x0B82, 0x0BEF, self.hashta_u2i),
+			'ori': self.translate_table(0x0B00, 0x0B7F, self.hasho_u2i, nukta('\u0B5C\u0B5D\u0B5F', self.unicode_norm_hasho_u2i, "\u0B3C")),
+			'guj': self.translate_table(0x0A80, 0x0AFF, self.hashg_u2i),
+		}
+
+	@staticmethod
+	def translate_table(first, last, mapping, rewrite=None):
+		"""str.translate table of the code points first..last to their `mapping`
+		(or nothing), after the per-character `rewrite`"""
+		table = dict()
+		for i in range(first, last + 1):
+			chars = rewrite(chr(i)) if rewrite else chr(i)
+			table[i] = ''.join(mapping.get(ch, "") if first <= ord(ch) <= last else ch for ch in chars)
+		return table
 
 	def normalize(self, text):
 		"""Performs some common normalization, which includes:
@@ -459,6 +524,12 @@ class WXEncoder():
 
 	def wx2iscii(self, my_string):
 		"""Convert WX to ISCII"""
+		if self.lang_tag == 'pan':
+			my_string = my_string.replace('EY', self.hashv_w2i["E"] + 'Y')
+		return self.transducer.convert(my_string)
+
+	def wx2iscii_cascade(self, my_string):
+		"""Convert WX to ISCII rule by rule, as compiled by WXTransducer"""
 		if self.lang_tag == 'pan':
 			my_string = my_string.replace('EY', self.hashv_w2i["E"] + 'Y')
 		my_string = self.map_ZeV(my_string)
@@ -533,50 +604,41 @@ class WXEncoder():
 		return unicode_
 
 	def iscii2unicode_hin(self, iscii):
-		unicode_ = self.i2u.sub(
-			lambda m: self.hashh_i2u.get( m.group(1), ""), iscii)
+		unicode_ = iscii.translate(self.i2u_tables['hin'])
 		return unicode_
 
 	def iscii2unicode_tel(self, iscii):
-		unicode_ = self.i2u.sub(
-			lambda m: self.hasht_i2u.get( m.group(1), ""), iscii)
+		unicode_ = iscii.translate(self.i2u_tables['tel'])
 		return unicode_
 
 	def iscii2unicode_pan(self, iscii):
-		unicode_ = self.i2u.sub(
-			lambda m: self.hashp_i2u.get( m.group(1), ""), iscii)
+		unicode_ = iscii.translate(self.i2u_tables['pan'])
 		return unicode_
 
 	def iscii2unicode_kan(self, iscii):
-		unicode_ = self.i2u.sub(
-			lambda m: self.hashk_i2u.get( m.group(1), ""), iscii)
+		unicode_ = iscii.translate(self.i2u_tables['kan'])
 		unicode_ = unicode_.replace('\u0CAB\u0CBC', '\u0CDE')
 		return unicode_
 
 	def iscii2unicode_mal(self, iscii):
-		unicode_ = self.i2u.sub(
-			lambda m: self.hashm_i2u.get( m.group(1), ""), iscii)
+		unicode_ = iscii.translate(self.i2u_tables['mal'])
 		return unicode_
 
 	def iscii2unicode_ben(self, iscii):
-		unicode_ = self.i2u.sub(
-			lambda m: self.hashb_i2u.get( m.group(1), ""), iscii)
+		unicode_ = iscii.translate(self.i2u_tables['ben'])
 		return unicode_
 
 	def iscii2unicode_tam(self, iscii):
-		unicode_ = self.i2u.sub(
-			lambda m: self.hashcta_i2u.get( m.group(1), ""), iscii)
+		unicode_ = iscii.translate(self.i2u_tables['tam'])
 		return unicode_
 
 	def iscii2unicode_ori(self, iscii):
-		unicode_ = self.i2u.sub(
-			lambda m: self.hasho_i2u.get( m.group(1), ""), iscii)
+		unicode_ = iscii.translate(self.i2u_tables['ori'])
 		unicode_ = unicode_.replace('\u0B2F\u0B3C', '\u0B5F')
 		return unicode_
 
 	def iscii2unicode_guj(self, iscii):
-		unicode_ = self.i2u.sub(
-			lambda m: self.hashg_i2u.get( m.group(1), ""), iscii)
+		unicode_ = iscii.translate(self.i2u_tables['guj'])
 		return unicode_
 
 	def unicode2iscii(self, unicode_):
@@ -605,6 +667,10 @@ class WXEncoder():
 
 	def iscii2wx(self, my_string):
 		"""Convert ISCII to WX"""
+		return self.transducer.convert(my_string)
+
+	def iscii2wx_cascade(self, my_string):
+		"""Convert ISCII to WX rule by rule, as compiled by WXTransducer"""
 		# CONSONANT+HALANT
 		my_string = self.ch.sub(
 			lambda m: self.hashc_i2w[
@@ -656,44 +722,32 @@ class WXEncoder():
 		return my_string
 
 	def unicode2iscii_hin(self, unicode_):
-		# Normalize Unicode values (NUKTA variations)
-		unicode_ = self.u2i_hn.sub(
-			lambda m: self.unicode_norm_hashh_u2i.get( m.group(1), "") + "\u093C", unicode_)
-		# Convert Unicode values to ISCII values
-		iscii_hin = self.u2i_h.sub(
-			lambda m: self.hashh_u2i.get( m.group(1), ""), unicode_)
+		# Convert Unicode values to ISCII values (NUKTA variations normalized)
+		iscii_hin = unicode_.translate(self.u2i_tables['hin'])
 		return iscii_hin
 
 	def unicode2iscii_tel(self, unicode_):
 		# dependent vowels
 		unicode_ = unicode_.replace('\u0c46\u0c56', '\u0c48')
 		# Convert Telugu Unicode values to ISCII values
-		iscii_tel = self.u2i_t.sub(
-			lambda m: self.hasht_u2i.get( m.group(1), ""), unicode_)
+		iscii_tel = unicode_.translate(self.u2i_tables['tel'])
 		return iscii_tel
 
 	def unicode2iscii_pan(self, unicode_):
-		# Normalize Unicode values (NUKTA variations)
-		unicode_ = self.u2i_pn.sub(lambda m: self.unicode_norm_hashp_u2i.get( m.group(1), "") + "\u0A3C", unicode_)
-		# Convert Unicode values 0x0A5C to ISCII
-		unicode_ = unicode_.replace("\u0A5C", "\xBF\xE9")
-		# Convert Unicode Punjabi values to ISCII values
-		iscii_pan = self.u2i_p.sub(
-			lambda m: self.hashp_u2i.get( m.group(1), ""), unicode_)
+		# Convert Unicode Punjabi values to ISCII values (NUKTA variations
+		# normalized, 0x0A5C to ISCII)
+		iscii_pan = unicode_.translate(self.u2i_tables['pan'])
 		return iscii_pan
 
 	def unicode2iscii_kan(self, unicode_):
-		# Normalize Unicode values (NUKTA variations)
-		unicode_ = unicode_.replace('\u0CDE', '\u0CAB\u0CBC')
 		# Normalize two-part dependent vowels
 		unicode_ = unicode_.replace('\u0cbf\u0cd5', '\u0cc0')
 		unicode_ = unicode_.replace('\u0cc6\u0cd5', '\u0cc7')
 		unicode_ = unicode_.replace('\u0cc6\u0cd6', '\u0cc8')
 		unicode_ = unicode_.replace('\u0cc6\u0cc2', '\u0cca')
 		unicode_ = unicode_.replace('\u0cca\u0cd5', '\u0ccb')
-		# Convert Unicode values to ISCII values
-		iscii_kan = self.u2i_k.sub(
-			lambda m: self.hashk_u2i.get( m.group(1), ""), unicode_)
+		# Convert Unicode values to ISCII values (NUKTA variations normalized)
+		iscii_kan = unicode_.translate(self.u2i_tables['kan'])
 		return iscii_kan
 
 	def unicode2iscii_mal(self, unicode_):
@@ -702,20 +756,15 @@ class WXEncoder():
 		unicode_ = unicode_.replace('\u0d47\u0d3e', '\u0d4b')
 		unicode_ = unicode_.replace('\u0d46\u0d57', '\u0d57')
 		# Convert Unicode values to ISCII values
-		iscii_mal = self.u2i_m.sub(
-			lambda m: self.hashm_u2i.get( m.group(1), ""), unicode_)
+		iscii_mal = unicode_.translate(self.u2i_tables['mal'])
 		return iscii_mal
 
 	def unicode2iscii_ben(self, unicode_):
-		# Normalize Unicode values (NUKTA variations)
-		unicode_ = self.u2i_bn.sub(
-			lambda m: self.unicode_norm_hashb_u2i.get( m.group(1), "") + "\u09BC", unicode_)
 		# Normalize two part dependent vowels
 		unicode_ = unicode_.replace('\u09c7\u09be', '\u09cb')
 		unicode_ = unicode_.replace('\u09c7\u0bd7', '\u09cc')
-		# Convert Unicode values to ISCII values
-		iscii_ben = self.u2i_b.sub(
-			lambda m: self.hashb_u2i.get( m.group(1), ""), unicode_)
+		# Convert Unicode values to ISCII values (NUKTA variations normalized)
+		iscii_ben = unicode_.translate(self.u2i_tables['ben'])
 		return iscii_ben
 
 	def unicode2iscii_tam(self, unicode_):
@@ -725,26 +774,20 @@ class WXEncoder():
 		unicode_ = unicode_.replace('\u0bc7\u0bbe', '\u0bcb')
 		unicode_ = unicode_.replace('\u0bc6\u0bd7', '\u0bcc')
 		# Convert Unicode values to ISCII values
-		iscii_tam = self.u2i_ta.sub(
-			lambda m: self.hashta_u2i.get( m.group(1), ""), unicode_)
+		iscii_tam = unicode_.translate(self.u2i_tables['tam'])
 		return iscii_tam
 
 	def unicode2iscii_ori(self, unicode_):
-		# Normalize Unicode values (NUKTA variations)
-		unicode_ = self.u2i_on.sub(
-			lambda m: self.unicode_norm_hasho_u2i.get( m.group(1), "") + "\u0B3C", unicode_)
 		# Normalize two part dependent vowels
 		unicode_ = unicode_.replace('\u0b47\u0b3e', '\u0b4b')
 		unicode_ = unicode_.replace('\u0b47\u0b57', '\u0b4c')
-		# Convert Unicode values to ISCII values
-		iscii_ori = self.u2i_o.sub(
-			lambda m: self.hasho_u2i.get( m.group(1), ""), unicode_)
+		# Convert Unicode values to ISCII values (NUKTA variations normalized)
+		iscii_ori = unicode_.translate(self.u2i_tables['ori'])
 		return iscii_ori
 
 	def unicode2iscii_guj(self, unicode_):
 		# Convert Gujurati Unicode values to ISCII values
-		iscii_guj = self.u2i_g.sub(
-			lambda m: self.hashg_u2i.get( m.group(1), ""), unicode_)
+		iscii_guj = unicode_.translate(self.u2i_tables['guj'])
 		return iscii_guj
 
 	def utf2wx(self, unicode_):
@@ -0,0 +1,352 @@
+# -*- coding: utf-8 -*-
+#
+# @project IndicTrans
+# @file src/indictrans/utils/WXTransducer.py
+# @author  Shreos Roychowdhury <shreos@tirja.com>
+# @version 1.0.0
+#
+# @section DESCRIPTION
+#
+#   WXTransducer.py : single-pass WX <-> ISCII conversion
+#
+# WXEncoder.wx2iscii_cascade and iscii2wx_cascade rewrite a string with about
+# 40 regex substitutions in a fixed order. Every rule turns a short run of WX
+# (or ISCII) characters into characters no later rule matches, so the cascade
+# is a tokenizer: at each position, the first rule in cascade order that
+# matches wins. This module lists the rules in that order, expands them over
+# the INDICTRANS_HASH* tables into a table of every token and its output, and
+# compiles the rule patterns into one regex alternation scanned left to right.
+#
+# Compiling checks the two ways a cascade differs from a tokenizer: a rule is
+# dropped when an earlier rule always consumes part of its tokens, and a rule
+# a later-starting earlier rule can cut short must carry a lookahead against
+# it. The only context rule, map_a (`\Ba[vowel]`), is decided from the
+# character before the token as it was when map_a ran.
+#
+# @section LICENSE
+#
+# Copyright (c) 2025 Shreos Roychowdhury.
+# Copyright (c) 2025 Tirja Consulting LLP.
+#
+# This source code is released under GNU Affero General Public License.
+# Please refer https://www.gnu.org/licenses/agpl-3.0.en.html#license-text
+#
+# THE SOFTWARE IS PROVIDED , WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+import re
+import threading
+from itertools import product
+
+from indictrans.base.HandleWXConstants import \
+	INDICTRANS_HASHC_W2I, INDICTRANS_HASHV_W2I, INDICTRANS_HASHM_W2I, INDICTRANS_HASHMD_W2I, INDICTRANS_DIGITS_W2I, \
+	INDICTRANS_HASHC_I2W, INDICTRANS_HASHV_I2W, INDICTRANS_HASHM_I2W, INDICTRANS_HASHMD_I2W, INDICTRANS_DIGITS_I2W
+
+CONSONANTS = 'kKgGfcCjJFtTdDNwWxXnpPbBmyrlvSsRh'
+MATRAS = 'AiIuUeEoO'
+VOWELS = 'aAiIuUeEoO'
+MODIFIERS = 'MHz'
+
+ISC_CONSONANTS = ''.join(chr(i) for i in range(0xB3, 0xD9))
+ISC_VOWELS = ''.join(chr(i) for i in range(0xA5, 0xB3))
+ISC_MATRAS = ''.join(chr(i) for i in range(0xDA, 0xE8))
+ISC_MODIFIERS = '\xA1\xA2\xA3'
+ISC_DIGITS = ''.join(chr(i) for i in range(0xF1, 0xFB))
+
+# rule index of tokens not converted (as if converted last)
+RAW = 1 << 30
+
+class Rule():
+	"""A cascade rule: `parts` are literal strings or tuples of alternative
+	characters, `output` a function of the matched parts."""
+
+	def __init__(self, parts, output, lookahead='', bounded=False):
+		self.parts = [(p,) if isinstance(p, str) else p for p in parts]
+		self.output = output
+		self.lookahead = lookahead
+		# only after a word character, like `\Ba`
+		self.bounded = bounded
+
+	def keys(self):
+		for parts in product(*self.parts):
+			try:
+				yield ''.join(parts), self.output(*parts)
+			except KeyError:
+				yield ''.join(parts), None
+
+	def pattern(self, start=0):
+		regex = []
+		for alts in self.parts[start:]:
+			if len(alts) == 1:
+				regex.append(re.escape(alts[0]))
+			else:
+				regex.append('[%s]' % (''.join(re.escape(c) for c in alts)))
+		return ''.join(regex) + self.lookahead
+
+
+def wx2iscii_rules():
+	"""Rules of WXEncoder.wx2iscii_cascade, in order."""
+	hc, hv, hm, hmd = INDICTRANS_HASHC_W2I, INDICTRANS_HASHV_W2I, INDICTRANS_HASHM_W2I, INDICTRANS_HASHMD_W2I
+	C, M, MD = tuple(CONSONANTS), tuple(MATRAS), tuple(MODIFIERS)
+	rules = []
+	# map_ZeV, map_eV, map_EY, map_ZoV, map_oV, map_OY
+	for nukta, matra in (('Z', 'eV'), ('', 'eV'), ('', 'EY'), ('Z', 'oV'), ('', 'oV'), ('', 'OY')):
+		z = hc['Z'] if nukta else ''
+		if matra == 'OY':
+			rules.append(Rule((C, 'ZOY'), lambda c, s: hc[c] + hc['Z'] + hm['OY']))
+		rules.append(Rule((C, nukta + matra, MD), lambda c, s, md, z=z, m=matra: hc[c] + z + hm[m] + hmd[md]))
+		rules.append(Rule((C, nukta + matra), lambda c, s, z=z, m=matra: hc[c] + z + hm[m]))
+	# map_Z
+	rules += [
+		Rule((C, 'Z', M, MD), lambda c, z, m, md: hc[c] + hc['Z'] + hm[m] + hmd[md]),
+		Rule((C, 'Z', M), lambda c, z, m: hc[c] + hc['Z'] + hm[m]),
+		Rule((C, 'Za', MD), lambda c, z, md: hc[c] + hc['Z'] + hmd[md]),
+		Rule((C, 'Z', MD), lambda c, z, md: hc[c] + hc['Z'] + hmd[md]),
+		Rule((C, 'Za'), lambda c, z: hc[c] + hc['Z']),
+		Rule((C, 'YZa'), lambda c, z: hc[c + 'Y'] + hc['Z']),
+		Rule((C, 'Z'), lambda c, z: hc[c] + hc['Z'] + hc['_']),
+	]
+	# map_q
+	rules += [
+		Rule((C, 'q', MD), lambda c, q, md: hc[c] + hm['q'] + hmd[md]),
+		Rule(('q', MD), lambda q, md: hv['q'] + hmd[md]),
+		Rule((C, 'q'), lambda c, q: hc[c] + hm['q']),
+		Rule(('aq', MD), lambda aq, md: hv['aq'] + hmd[md]),
+	]
+	# map_lYY, map_lY, map_nY, map_rY
+	for cons in ('lYY', 'lY', 'nY', 'rY'):
+		for matra in ('eV', 'EY', 'oV', 'OY'):
+			rules.append(Rule((cons, matra, MD), lambda c, m, md: hc[c] + hm[m] + hmd[md]))
+			rules.append(Rule((cons, matra), lambda c, m: hc[c] + hm[m]))
+		rules += [
+			Rule((cons, M, MD), lambda c, m, md: hc[c] + hm[m] + hmd[md]),
+			Rule((cons, M), lambda c, m: hc[c] + hm[m]),
+			Rule((cons, 'a', MD), lambda c, a, md: hc[c] + hmd[md]),
+			Rule((cons, 'a'), lambda c, a: hc[c]),
+			Rule((cons,), lambda c: hc[c] + hc['_']),
+		]
+	# consonants, the vowel q
+	rules += [
+		Rule((C, M, MD), lambda c, m, md: hc[c] + hm[m] + hmd[md]),
+		Rule((C, M), lambda c, m: hc[c] + hm[m]),
+		Rule((C, 'a', MD), lambda c, a, md: hc[c] + hmd[md]),
+		Rule((C, 'a'), lambda c, a: hc[c]),
+		# q+modifier was taken by map_q
+		Rule(('aq',), lambda aq: hv['aq'], lookahead='(?![MHz])'),
+		Rule(('q',), lambda q: hv['aq']),
+		Rule((C,), lambda c: hc[c] + hc['_']),
+	]
+	# map_eV2, map_EY2, map_oV2, map_OY2
+	for vowel in ('eV', 'EY', 'oV', 'OY'):
+		rules += [
+			Rule(('a' + vowel, MD), lambda v, md: hv[v] + hmd[md]),
+			Rule(('a' + vowel,), lambda v: hv[v]),
+			Rule((vowel, MD), lambda v, md: hv[v] + hmd[md]),
+			Rule((vowel,), lambda v: hv[v]),
+		]
+	# map_a
+	for vowel in M:
+		rules.append(Rule(('a' + vowel,), lambda v: hv[v], bounded=True))
+	# vowels, full stop, addak, digits
+	rules += [
+		Rule((tuple(VOWELS), MD), lambda v, md: hv[v] + hmd[md]),
+		Rule((tuple(VOWELS),), lambda v: hv[v]),
+		Rule(('.',), lambda s: hc['.']),
+		Rule(('Y',), lambda s: '\xFB'),
+		Rule((tuple('0123456789'),), lambda d: INDICTRANS_DIGITS_W2I[d]),
+	]
+	return rules
+
+def iscii2wx_rules():
+	"""Rules of WXEncoder.iscii2wx_cascade, in order."""
+	hc, hv, hm, hmd = INDICTRANS_HASHC_I2W, INDICTRANS_HASHV_I2W, INDICTRANS_HASHM_I2W, INDICTRANS_HASHMD_I2W
+	C, M, MD = tuple(ISC_CONSONANTS), tuple(ISC_MATRAS), tuple(ISC_MODIFIERS)
+	return [
+		# consonant+halant, consonant+nukta(+matra)(+modifier), (+halant)
+		Rule((C, '\xE8'), lambda c, h: hc[c]),
+		Rule((C, '\xE9', M, MD), lambda c, n, m, md: hc[c] + hc[n] + hm[m] + hmd[md]),
+		Rule((C, '\xE9', M), lambda c, n, m: hc[c] + hc[n] + hm[m]),
+		Rule((C, '\xE9', MD), lambda c, n, md: hc[c] + hc[n] + hmd[md]),
+		Rule((C, '\xE9\xE8'), lambda c, nh: hc[c] + hc['\xE9']),
+		Rule((C, '\xE9'), lambda c, n: hc[c] + hc[n] + 'a'),
+		# consonant(+matra)(+modifier)
+		Rule((C, M, MD), lambda c, m, md: hc[c] + hm[m] + hmd[md]),
+		Rule((C, M), lambda c, m: hc[c] + hm[m]),
+		Rule((C, MD), lambda c, md: hc[c] + 'a' + hmd[md]),
+		Rule((C,), lambda c: hc[c] + 'a'),
+		# vowel(+modifier)
+		Rule((tuple(ISC_VOWELS), MD), lambda v, md: hv[v] + hmd[md]),
+		Rule(('\xA4', MD), lambda a, md: 'a' + hmd[md]),
+		Rule((tuple(ISC_VOWELS),), lambda v: hv[v]),
+		Rule(('\xA4',), lambda a: 'a'),
+		Rule(('\xEA',), lambda s: '.'),
+		Rule(('\xFB',), lambda s: 'Y'),
+		Rule((tuple(ISC_DIGITS),), lambda d: INDICTRANS_DIGITS_I2W[d]),
+	]
+
+def is_word(ch):
+	"""Whether `\\w` matches ch."""
+	return ch == '_' or ch.isalnum()
+
+
+class WXTransducer():
+	"""Compiled rules of one direction, see `compiled`.
+
+	Examples
+	--------
+	>>> compiled('wx2iscii').convert('kamala')
+	'³ÌÑ'
+	"""
+
+	def __init__(self, rules):
+		# output of every token, None where the tables have none (the cascade raises)
+		self.table = dict()
+		# rule index of every token
+		self.index = dict()
+		live = []
+		for r, rule in enumerate(rules):
+			keys = [(key, out) for key, out in rule.keys() if key not in self.index]
+			dead = [key for key, _ in keys if self.covered(key)]
+			if dead:
+				if len(dead) < len(keys):
+					raise ValueError('rule %d is partly shadowed by earlier rules: %s' % (r, rule.pattern()))
+				continue
+			for key, out in keys:
+				if out == '':
+					raise ValueError('empty output of %r' % (key))
+				self.index[key] = r
+				self.table[key] = out
+			live.append(rule)
+		# map_a tokens take an optional modifier, left to the vowel rules when
+		# the token does not follow a word character
+		self.bounded = dict()
+		branches = []
+		for rule in live:
+			if not rule.bounded:
+				branches.append((rule.parts[0], rule.pattern(1)))
+				continue
+			if not self.bounded:
+				branches.append((('a',), '[%s][%s]?' % (MATRAS, MODIFIERS)))
+			for key, out in rule.keys():
+				for md in ('',) + tuple(MODIFIERS):
+					self.bounded[key + md] = (self.index[key], out + md, self.table['a'] + self.table[key[1:] + md])
+		self.regex = re.compile(self.alternation(branches))
+		# every character not in a token is a token of its own
+		self.tokenizer = re.compile(self.regex.pattern + '|.', re.S)
+		self.bounded_re = re.compile('a[%s]' % (MATRAS)) if self.bounded else None
+		# (rule, whether the output ends in a word character, whether the input does) of every token
+		self.ends = {key: (self.index[key], is_word(out[-1]), is_word(key[-1]))
+			for key, out in self.table.items() if out is not None}
+		self.check()
+
+	@staticmethod
+	def alternation(branches):
+		"""Regex of (first part, rest) branches in order. A branch joins the
+		last group of the same first part when no group in between can match
+		where it does, so the regex tests a first character once per group."""
+		groups = []
+		for first, rest in branches:
+			chars = set(alt[0] for alt in first)
+			for group in reversed(groups):
+				if group[0] == first:
+					group[1].append(rest)
+					break
+				if chars & set(alt[0] for alt in group[0]):
+					groups.append((first, [rest]))
+					break
+			else:
+				groups.append((first, [rest]))
+		regex = []
+		for first, rests in groups:
+			head = Rule((first,), None).pattern()
+			if len(rests) == 1:
+				regex.append(head + rests[0])
+			else:
+				regex.append('%s(?:%s)' % (head, '|'.join(rests)))
+		return '|'.join(regex)
+
+	def covered(self, key):
+		"""Whether an earlier token lies inside key after its first character,
+		so the cascade never leaves key whole."""
+		for start in range(1, len(key)):
+			for end in range(start + 1, len(key) + 1):
+				if key[start:end] in self.index:
+					return True
+		return False
+
+	def check(self):
+		"""Tokens that an earlier token starting inside them can cut short must
+		not match where that token does."""
+		longer = dict()
+		for other in self.index:
+			for end in range(1, len(other)):
+				longer.setdefault(other[:end], []).append(other)
+		for key, r in self.index.items():
+			for start in range(1, len(key)):
+				rest = key[start:]
+				for other in longer.get(rest, ()):
+					if self.index[other] < r:
+						text = key + other[len(rest):]
+						if self.regex.match(text)[0] == key:
+							raise ValueError('%r is cut short by %r in %r' % (key, other, text))
+
+	def convert(self, text):
+		if self.bounded_re is not None and self.bounded_re.search(text) is not None:
+			return self.regex.sub(self.bounded_tokens(text), text)
+		tokens = self.tokenizer.findall(text)
+		try:
+			return ''.join(map(self.table.get, tokens, tokens))
+		except TypeError:
+			raise KeyError(next(token for token in tokens if self.table.get(token, token) is None))
+
+	def bounded_tokens(self, text):
+		"""Replacement function of the tokens of text, deciding map_a tokens by
+		the character before them when map_a ran."""
+		table, ends, bounded = self.table, self.ends, self.bounded
+		# end of the previous token and its `ends`
+		last = [0, None]
+		def token(m):
+			key = m[0]
+			start = m.start()
+			if key in bounded:
+				r, out, parts = bounded[key]
+				if start == 0:
+					word = False
+				elif start != last[0]:
+					word = is_word(text[start - 1])
+				else:
+					prev, out_word, in_word = last[1]
+					word = out_word if prev < r else in_word
+				last[0] = m.end()
+				if word:
+					# a modifier after the vowel is left as it is
+					last[1] = (r, is_word(out[-1]), True) if len(key) == 2 else (RAW, True, True)
+					return out
+				last[1] = (RAW, True, True)
+				return parts
+			out = table[key]
+			if out is None:
+				raise KeyError(key)
+			last[0], last[1] = m.end(), ends[key]
+			return out
+		return token
+
+
+_compiled = dict()
+_compiled_lock = threading.Lock()
+
+def compiled(order):
+	"""The transducer of 'wx2iscii' or 'iscii2wx', compiled once per process."""
+	trans = _compiled.get(order)
+	if trans is None:
+		with _compiled_lock:
+			trans = _compiled.get(order)
+			if trans is None:
+				rules = wx2iscii_rules() if order == 'wx2iscii' else iscii2wx_rules()
+				trans = _compiled[order] = WXTransducer(rules)
+	return trans
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+#
+# @project IndicTrans
+# @file tests/fixtures.py
+# @author  Shreos Roychowdhury <shreos@tirja.com>
+# @version 1.0.0
+#
+# @section DESCRIPTION
+#
+#   fixtures.py : a small synthetic model shared by the tests
+#
+# @section LICENSE
+#
+# Copyright (c) 2025 Shreos Roychowdhury.
+# Copyright (c) 2025 Tirja Consulting LLP.
+#
+# This source code is released under GNU Affero General Public License.
+# Please refer https://www.gnu.org/licenses/agpl-3.0.en.html#license-text
+#
+# THE SOFTWARE IS PROVIDED , WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+from __future__ import division, unicode_literals
+
+import shutil
+import tempfile
+
+import numpy as np
+from scipy import sparse as sp
+from testtools import TestCase
+
+from indictrans.utils.ModelStore import ModelStore
+from indictrans.utils.BaseTransliterator import BaseTransliterator
+
+class SyntheticModelCase(TestCase):
+	"""Runs tests on a random hin-eng model in a temporary store, with empty
+	model and word caches. Other ML pairs are not available."""
+
+	def setUp(self):
+		super(SyntheticModelCase, self).setUp()
+		model_dir = tempfile.mkdtemp()
+		self.addCleanup(shutil.rmtree, model_dir)
+		rnd = np.random.RandomState(0)
+		letters = list('_aAiIkgmnrst')
+		feats = [{l: j * len(letters) + i for i, l in enumerate(letters)} for j in range(30)]
+		coef = sp.random(4, 30 * len(letters), density=0.5, random_state=rnd, format='csc')
+		store = ModelStore(model_dir)
+		store.save('hin-eng', {0: 'a', 1: 'k', 2: 'm', 3: '_'}, coef,
+			rnd.randn(4), rnd.randn(4, 4), rnd.randn(4), feats)
+		self.patch(BaseTransliterator, 'store', store)
+		self.patch(BaseTransliterator, 'models', dict())
+		self.patch(BaseTransliterator, 'caches', dict())
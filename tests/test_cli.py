@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+#
+# @project IndicTrans
+# @file tests/test_cli.py
+# @author  Shreos Roychowdhury <shreos@tirja.com>
+# @version 1.0.0
+#
+# @section DESCRIPTION
+#
+#   test_cli.py : tests for streaming files through indictrans-cli
+#
+# @section LICENSE
+#
+# Copyright (c) 2025 Shreos Roychowdhury.
+# Copyright (c) 2025 Tirja Consulting LLP.
+#
+# This source code is released under GNU Affero General Public License.
+# Please refer https://www.gnu.org/licenses/agpl-3.0.en.html#license-text
+#
+# THE SOFTWARE IS PROVIDED , WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+from __future__ import division, unicode_literals
+
+import os
+import shutil
+import argparse
+import tempfile
+
+from indictrans.utils.Transliterator import Transliterator
+from indictrans.apps.indictrans_cli import process_args
+from tests.fixtures import SyntheticModelCase
+
+class TestStream(SyntheticModelCase):
+	def test_cli_stream(self):
+		io_dir = tempfile.mkdtemp()
+		self.addCleanup(shutil.rmtree, io_dir)
+		infile, outfile = os.path.join(io_dir, 'in.tsv'), os.path.join(io_dir, 'out.tsv')
+		text = '\u0915\u092e\u0932 \u0930\u093e\u092e'
+		with open(infile, 'w', encoding='utf-8') as fp:
+			fp.write(('1\t%s\tx\nshort\n' % (text)) * 5)
+		args = argparse.Namespace(source='hin', target='eng', decode='viterbi', rb=False, build_lookup=False,
+			lexicon=None, infile=infile, outfile=outfile, jobs=2, chunksize=2, tsv=True, jsonl=False, column=1, corpus=False)
+		process_args(args)
+		tline = Transliterator(source='hin', target='eng').convert(text)
+		with open(outfile, encoding='utf-8') as fp:
+			self.assertEqual(fp.read(), ('1\t%s\tx\nshort\n' % (tline)) * 5)
+
+	def test_cli_jsonl_passthrough(self):
+		io_dir = tempfile.mkdtemp()
+		self.addCleanup(shutil.rmtree, io_dir)
+		infile, outfile = os.path.join(io_dir, 'in.jsonl'), os.path.join(io_dir, 'out.jsonl')
+		with open(infile, 'w', encoding='utf-8') as fp:
+			fp.write('{"text": "\u0915\u092e\u0932"}\n[1, 2]\n\n"text"\nnull')
+		args = argparse.Namespace(source='hin', target='eng', decode='viterbi', rb=False, build_lookup=False,
+			lexicon=None, infile=infile, outfile=outfile, jobs=1, chunksize=2, tsv=False, jsonl=True, column='text', corpus=False)
+		process_args(args)
+		tline = Transliterator(source='hin', target='eng').convert('\u0915\u092e\u0932')
+		with open(outfile, encoding='utf-8') as fp:
+			self.assertEqual(fp.read(), '{"text": "%s"}\n[1, 2]\n\n"text"\nnull\n' % (tline))
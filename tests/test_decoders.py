@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+#
+# @project IndicTrans
+# @file tests/test_decoders.py
+# @author  Shreos Roychowdhury <shreos@tirja.com>
+# @version 1.0.0
+#
+# @section DESCRIPTION
+#
+#   test_decoders.py : tests decoders against each other on random scores
+#
+# @section LICENSE
+#
+# Copyright (c) 2025 Shreos Roychowdhury.
+# Copyright (c) 2025 Tirja Consulting LLP.
+#
+# This source code is released under GNU Affero General Public License.
+# Please refer https://www.gnu.org/licenses/agpl-3.0.en.html#license-text
+#
+# THE SOFTWARE IS PROVIDED , WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+from __future__ import division, unicode_literals
+
+import numpy as np
+from scipy import sparse as sp
+from testtools import TestCase
+
+from indictrans.putils import npdecode
+from indictrans.utils.EmissionScorer import EmissionScorer
+from indictrans.utils.SparseTransitions import SparseTransitions
+from indictrans.utils.HandleDecoders import DECODERS, BATCH_DECODERS, ONE_BEST, PRUNED
+
+def random_model(rnd, n_samples, n_states, ties=False):
+	if ties:
+		# small integer weights, so many paths have equal scores
+		return (rnd.randint(-3, 3, (n_samples, n_states)).astype(np.float64),
+			rnd.randint(-2, 2, (n_states, n_states)).astype(np.float64),
+			rnd.randint(-2, 2, n_states).astype(np.float64),
+			rnd.randint(-2, 2, n_states).astype(np.float64))
+	return (rnd.randn(n_samples, n_states), rnd.randn(n_states, n_states),
+		rnd.randn(n_states), rnd.randn(n_states))
+
+def greedy_reference(score, trans, init, final):
+	n_samples = score.shape[0]
+	path = []
+	for i in range(n_samples):
+		cand = score[i] + (init if i == 0 else trans[path[-1]])
+		if i == n_samples - 1:
+			cand = cand + final
+		path.append(int(np.argmax(cand)))
+	return path
+
+def beamsearch_reference(score, trans, init, final, beamwidth):
+	"""The original beam search: full sort of (score, state, path) tuples."""
+	n_samples, n_states = score.shape
+	beam = sorted([(score[0, j] + init[j], j, [j]) for j in range(n_states)], reverse=True)[:beamwidth]
+	for i in range(1, n_samples):
+		beam = sorted([(s + trans[j, k] + score[i, k], k, path + [k])
+			for k in range(n_states) for s, j, path in beam], reverse=True)[:beamwidth]
+	beam = sorted([(s + final[j], j, path) for s, j, path in beam], reverse=True)[:beamwidth]
+	return [path for s, j, path in beam]
+
+class TestDecoders(TestCase):
+	def setUp(self):
+		super(TestDecoders, self).setUp()
+		rnd = np.random.RandomState(42)
+		self.models = [random_model(rnd, rnd.randint(1, 12), rnd.randint(1, 40), ties=bool(i % 2))
+			for i in range(200)]
+
+	def test_viterbi_np(self):
+		for score, trans, init, final in self.models:
+			expected = DECODERS['viterbi'](score.copy(), trans, init, final)
+			path = DECODERS['viterbi_np'](score.copy(), trans, init, final)
+			self.assertEqual(list(path), list(expected))
+
+	def test_empty(self):
+		score, trans, init, final = random_model(np.random.RandomState(0), 0, 5)
+		for name, decoder in sorted(DECODERS.items()):
+			args = (score, trans, init, final) if name in ONE_BEST else (score, trans, init, final, 3)
+			self.assertEqual(list(decoder(*args)), [], name)
+
+	def test_beamsearch_np(self):
+		for k, (score, trans, init, final) in enumerate(self.models):
+			k_best = 2 + k % 14
+			expected = DECODERS['beamsearch'](score.copy(), trans, init, final, k_best)
+			paths = DECODERS['beamsearch_np'](score.copy(), trans, init, final, k_best)
+			self.assertEqual(paths, expected)
+
+	def test_beamsearch(self):
+		for k, (score, trans, init, final) in enumerate(self.models):
+			k_best = [1, 2, 5, 15, 255][k % 5]
+			expected = beamsearch_reference(score, trans, init, final, k_best)
+			paths = DECODERS['beamsearch'](score.copy(), trans, init, final, k_best)
+			self.assertEqual(paths, expected)
+
+	def test_kbest(self):
+		for k, (score, trans, init, final) in enumerate(self.models):
+			k_best = 2 + k % 14
+			paths = DECODERS['kbest'](score.copy(), trans, init, final, k_best)
+			self.assertEqual(DECODERS['kbest_np'](score.copy(), trans, init, final, k_best), paths)
+			self.assertEqual(paths[0], list(DECODERS['viterbi'](score.copy(), trans, init, final)))
+			self.assertEqual(len(paths), min(k_best, score.shape[1] ** score.shape[0]))
+
+	def test_kbest_exact(self):
+		# a beam wide enough to keep every path is exact
+		rnd = np.random.RandomState(0)
+		for i in range(50):
+			score, trans, init, final = random_model(rnd, rnd.randint(1, 4), rnd.randint(1, 6))
+			expected = beamsearch_reference(score, trans, init, final, 255)
+			self.assertEqual(DECODERS['kbest'](score.copy(), trans, init, final, 15), expected[:15])
+
+	def test_viterbi_batch(self):
+		# stack the models sharing a number of states in ragged layout
+		for n_states in (5, 17):
+			rnd = np.random.RandomState(n_states)
+			trans, init, final = rnd.randn(n_states, n_states), rnd.randn(n_states), rnd.randn(n_states)
+			words = [rnd.randn(n, n_states) for n in rnd.randint(0, 12, 50)]
+			offsets = np.cumsum([0] + [len(w) for w in words])
+			score = np.vstack(words)
+			expected = [DECODERS['viterbi'](w.copy(), trans, init, final) for w in words if len(w)]
+			for name in ('viterbi', 'viterbi_np'):
+				path = BATCH_DECODERS[name](score.copy(), offsets, trans, init, final)
+				self.assertEqual(list(path), list(np.concatenate(expected)))
+
+	def test_greedy(self):
+		for score, trans, init, final in self.models:
+			expected = greedy_reference(score, trans, init, final)
+			for name in ('greedy', 'greedy_np'):
+				self.assertEqual(list(DECODERS[name](score.copy(), trans, init, final)), expected)
+			if score.shape[0] == 1:
+				self.assertEqual(list(DECODERS['viterbi'](score.copy(), trans, init, final)), expected)
+
+	def test_greedy_batch(self):
+		rnd = np.random.RandomState(3)
+		n_states = 11
+		trans, init, final = rnd.randn(n_states, n_states), rnd.randn(n_states), rnd.randn(n_states)
+		words = [rnd.randn(n, n_states) for n in rnd.randint(0, 12, 50)]
+		offsets = np.cumsum([0] + [len(w) for w in words])
+		score = np.vstack(words)
+		expected = sum((greedy_reference(w, trans, init, final) for w in words), [])
+		for name in ('greedy', 'greedy_np'):
+			path = BATCH_DECODERS[name](score.copy(), offsets, trans, init, final)
+			self.assertEqual(list(path), expected)
+
+	def test_sparse_viterbi(self):
+		rnd = np.random.RandomState(0)
+		n_states, n_positions, n_feats = 40, 30, 20
+		scorer = EmissionScorer(sp.random(n_states, n_positions * n_feats, density=0.3, random_state=rnd) * 0.5)
+		feats = [{str(f): p * n_feats + f for f in range(n_feats)} for p in range(n_positions)]
+		# mostly forbidden transitions, but a few states reachable from all
+		trans = rnd.randn(n_states, n_states) - 50 * (rnd.rand(n_states, n_states) < 0.8)
+		trans[:, :3] = rnd.randn(n_states, 3)
+		init, final = rnd.randn(n_states), rnd.randn(n_states)
+		transitions = SparseTransitions(trans, init, *scorer.bounds(feats))
+		self.assertLess(transitions.density, SparseTransitions.max_density)
+		lists = transitions.decode_args()
+
+		# emissions of random features, some unseen
+		ids = np.arange(n_positions) * n_feats + rnd.randint(0, n_feats, (300, n_positions))
+		ids[rnd.rand(*ids.shape) < 0.2] = -1
+		offsets = np.cumsum([0] + list(rnd.randint(1, 12, 40)))
+		offsets = offsets[offsets <= ids.shape[0]]
+		score = scorer.emissions(ids[:offsets[-1]])
+		for name in PRUNED:
+			decoder = BATCH_DECODERS[name]
+			expected = decoder(score.copy(), offsets, trans, init, final)
+			path = decoder(score.copy(), offsets, trans, init, final, **lists)
+			self.assertEqual(list(path), list(expected))
+			for a, b in zip(offsets[:-1], offsets[1:]):
+				path = DECODERS[name](score[a:b].copy(), trans, init, final, **lists)
+				self.assertEqual(list(path), list(expected[a:b]))
+
+	def test_count_tranxn_np(self):
+		y = np.array([0, 1, 1, 2, 0, 1], dtype=np.intp)
+		trans = npdecode.count_tranxn(y, 3)
+		self.assertEqual(trans.tolist(), [[0, 2, 0], [0, 1, 1], [1, 0, 0]])
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+#
+# @project IndicTrans
+# @file tests/test_lexicon.py
+# @author  Shreos Roychowdhury <shreos@tirja.com>
+# @version 1.0.0
+#
+# @section DESCRIPTION
+#
+#   test_lexicon.py : tests for precomputed lexicons of frequent words
+#
+# @section LICENSE
+#
+# Copyright (c) 2025 Shreos Roychowdhury.
+# Copyright (c) 2025 Tirja Consulting LLP.
+#
+# This source code is released under GNU Affero General Public License.
+# Please refer https://www.gnu.org/licenses/agpl-3.0.en.html#license-text
+#
+# THE SOFTWARE IS PROVIDED , WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+from __future__ import division, unicode_literals
+
+import os
+import shutil
+import tempfile
+
+from indictrans.utils.Transliterator import Transliterator
+from indictrans.utils.Lexicon import Lexicon
+from indictrans.apps.indictrans_lexicon import read_vocabulary
+from tests.fixtures import SyntheticModelCase
+
+class TestLexicon(SyntheticModelCase):
+	def test_lexicon(self):
+		lex_dir = tempfile.mkdtemp()
+		self.addCleanup(shutil.rmtree, lex_dir)
+		text = '\u0915\u092e\u0932 \u0930\u093e\u092e'
+		hin = Transliterator(source='hin', target='eng').transform.__self__
+		with open(os.path.join(lex_dir, 'freq.tsv'), 'w', encoding='utf-8') as fp:
+			fp.write('\u0915\u092e\u0932\t5\n\u0930\u093e\u092e 2\n\u0915\u092e\u0932,\u0930\u093e\u092e\n')
+		self.assertEqual(read_vocabulary(hin, [fp.name]), {'kamala': 6, 'rAma': 3})
+		path = os.path.join(lex_dir, 'hin-eng.lex')
+		Lexicon.save(path, {'kamala': 'kml', 'a': ''}, 'hin-eng', 'viterbi', 0, hin.model_checksum())
+		lexicon = Lexicon(path)
+		self.assertEqual((len(lexicon), lexicon.get('kamala'), lexicon.get('a'), lexicon.get('rAma')), (2, 'kml', '', None))
+		# the lexicon is read first, other words go to the model
+		expected = 'kml ' + hin.transliterate('\u0930\u093e\u092e')
+		self.assertEqual(Transliterator(source='hin', target='eng', lexicon=path).convert(text), expected)
+		self.assertEqual(Transliterator(source='hin', target='eng', build_lookup=True, lexicon=lexicon).convert(text), expected)
+		# lexicons of another pair, decoder or model are refused
+		self.assertRaises(ValueError, Transliterator, source='mar', target='eng', lexicon=path)
+		self.assertRaises(ValueError, Transliterator, source='hin', target='eng', decode='greedy', lexicon=path)
+		# k-best lexicons are read for their k only
+		Lexicon.save(path, {'kamala': ['k', 'km', 'kml']}, 'hin-eng', 'beamsearch', 3, hin.model_checksum())
+		trn = Transliterator(source='hin', target='eng', decode='beamsearch', lexicon=path)
+		self.assertEqual(trn.transform('\u0915\u092e\u0932', k_best=3), ['k', 'km', 'kml'])
+		self.assertEqual(trn.transform('\u0915\u092e\u0932', k_best=2), Transliterator(source='hin', target='eng', decode='beamsearch').transform('\u0915\u092e\u0932', k_best=2))
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+#
+# @project IndicTrans
+# @file tests/test_models.py
+# @author  Shreos Roychowdhury <shreos@tirja.com>
+# @version 1.0.0
+#
+# @section DESCRIPTION
+#
+#   test_models.py : tests for the memory-mapped model store, EmissionScorer,
+#   NgramFeaturizer and the WordKernel, and for sharing the decoded tensors
+#
+# @section LICENSE
+#
+# Copyright (c) 2025 Shreos Roychowdhury.
+# Copyright (c) 2025 Tirja Consulting LLP.
+#
+# This source code is released under GNU Affero General Public License.
+# Please refer https://www.gnu.org/licenses/agpl-3.0.en.html#license-text
+#
+# THE SOFTWARE IS PROVIDED , WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+from __future__ import division, unicode_literals
+
+import shutil
+import tempfile
+
+import numpy as np
+from scipy import sparse as sp
+from testtools import TestCase
+
+from indictrans.utils.ModelStore import ModelStore
+from indictrans.utils.OneHotEncoder import OneHotEncoder
+from indictrans.utils.EmissionScorer import EmissionScorer
+from indictrans.utils.NgramFeaturizer import NgramFeaturizer
+from indictrans.utils.HandleCommonUtils import ngram_context
+from indictrans.utils.BaseTransliterator import BaseTransliterator
+from indictrans.utils.Transliterator import Transliterator
+from indictrans.utils.SparseTransitions import SparseTransitions
+from indictrans.utils.HandleDecoders import DECODERS
+from indictrans.putils import WordKernel
+from tests.fixtures import SyntheticModelCase
+
+class TestModelStore(TestCase):
+	def setUp(self):
+		super(TestModelStore, self).setUp()
+		self.model_dir = tempfile.mkdtemp()
+		self.addCleanup(shutil.rmtree, self.model_dir)
+		rnd = np.random.RandomState(0)
+		self.classes = {0: b'a', 1: b'b', 2: '_'}
+		self.coef = sp.random(3, 7, density=0.5, random_state=rnd, format='csc', dtype=np.float32)
+		self.init = rnd.randn(3)
+		self.trans = rnd.randn(3, 3)
+		self.final = rnd.randn(3)
+		self.feats = [{'k': 0, '_': 1}, {'a|b': 2, 'b|_': 3, '_|_': 4}, {'x': 5, 'y': 6}]
+
+	def test_roundtrip(self):
+		store = ModelStore(self.model_dir)
+		self.assertFalse(store.has_pair('hin-eng'))
+		store.save('hin-eng', self.classes, self.coef, self.init, self.trans, self.final, self.feats)
+		self.assertEqual(store.pairs(), ['hin-eng'])
+		tensors = store.load('hin-eng')
+		self.assertEqual(list(tensors['classes']), ['a', 'b', '_'])
+		self.assertIsInstance(tensors['intercept_trans'], np.memmap)
+		self.assertEqual(tensors['intercept_trans'].dtype, np.float64)
+		self.assertIsInstance(tensors['coef_t'], np.memmap)
+		np.testing.assert_allclose(tensors['coef'], self.coef.toarray())
+		np.testing.assert_array_equal(tensors['coef_t'][-1], 0)
+		scorer = EmissionScorer(tensors['coef'], tensors['coef_t'])
+		self.assertIs(scorer.coef_t_, tensors['coef_t'])
+		self.assertRaises(ValueError, EmissionScorer, self.coef, tensors['coef_t'][:-1])
+		self.patch(EmissionScorer, 'dense_limit', 10)
+		store.save('hin-eng', self.classes, self.coef, self.init, self.trans, self.final, self.feats)
+		np.testing.assert_allclose(store.load('hin-eng')['coef'].toarray(), self.coef.toarray())
+		np.testing.assert_allclose(tensors['intercept_init'], self.init)
+		np.testing.assert_allclose(tensors['intercept_trans'], self.trans)
+		np.testing.assert_allclose(tensors['intercept_final'], self.final)
+		self.assertEqual(ModelStore.unique_feats(tensors), self.feats)
+
+	def test_missing_pair(self):
+		self.assertRaises(IOError, ModelStore(self.model_dir).load, 'eng-hin')
+
+
+class TestEmissionScorer(TestCase):
+	def test_emissions(self):
+		rnd = np.random.RandomState(0)
+		feats = [['a', 'b', 'c', 'a|b'], ['b', 'a', 'z', 'b|a'], ['c', 'c', 'a', 'c|c']]
+		vectorizer = OneHotEncoder().fit(feats[:2])
+		coef = sp.random(5, 8, density=0.6, random_state=rnd, format='csc')
+		expected = vectorizer.transform(feats).dot(coef.T).toarray()
+		ids = vectorizer.transform_ids(feats)
+		self.assertEqual(ids[2].tolist()[3], -1)
+		for dense_limit in (0, 1 << 21):
+			self.patch(EmissionScorer, 'dense_limit', dense_limit)
+			np.testing.assert_array_equal(EmissionScorer(coef).emissions(ids), expected)
+
+	def test_bounds(self):
+		rnd = np.random.RandomState(0)
+		feats = [{'a': 0, 'b': 1}, {'c': 2}, {'d': 3, 'e': 4, 'f': 5}]
+		coef = rnd.randn(4, 6)
+		low, high = EmissionScorer(coef).bounds(feats)
+		for ids in ([0, 2, 3], [1, -1, 5], [-1, -1, -1], [0, 2, 4]):
+			scores = EmissionScorer(coef).emissions(np.array([ids]))[0]
+			self.assertTrue((low <= scores).all() and (scores <= high).all())
+		np.testing.assert_allclose(high, np.maximum(coef[:, :2].max(1), 0) +
+			np.maximum(coef[:, 2], 0) + np.maximum(coef[:, 3:].max(1), 0))
+
+
+class TestNgramFeaturizer(TestCase):
+	def test_transform(self):
+		words = [list('kamala'), ['k', 'Ya', 'm', 'a'], list('rAma'), ['a']]
+		vectorizer = OneHotEncoder().fit([f for w in words[:2] for f in ngram_context(w)])
+		featurizer = NgramFeaturizer(vectorizer.unique_feats)
+		for word in words + [list('xyz'), ['Q', 'k', 'a']]:
+			ids = featurizer.transform(word)
+			self.assertEqual(ids.shape, (len(word), 30))
+			np.testing.assert_array_equal(ids, vectorizer.transform_ids(ngram_context(word)))
+		ids, offsets = featurizer.transform_batch(words)
+		self.assertEqual(offsets.tolist(), [0, 6, 10, 14, 15])
+		for i, word in enumerate(words):
+			np.testing.assert_array_equal(ids[offsets[i]:offsets[i + 1]], featurizer.transform(word))
+
+class TestWordKernel(TestCase):
+	def test_transform(self):
+		if WordKernel is None:
+			self.skipTest('compiled kernels not built')
+		rnd = np.random.RandomState(0)
+		letters = list('aAiIkgmnrst') + ['Ya', 'kh']
+		words = [[letters[j] for j in rnd.randint(0, len(letters), rnd.randint(1, 9))] for i in range(40)]
+		vectorizer = OneHotEncoder().fit([f for w in words for f in ngram_context(w)])
+		featurizer = NgramFeaturizer(vectorizer.unique_feats)
+		n_states = 12
+		n_features = 1 + max(max(feats.values()) for feats in vectorizer.unique_feats)
+		scorer = EmissionScorer(rnd.randn(n_states, n_features))
+		# mostly forbidden transitions, so some are pruned
+		trans = rnd.randn(n_states, n_states) - 5 * (rnd.rand(n_states, n_states) < 0.7)
+		init, final = rnd.randn(n_states), rnd.randn(n_states)
+		labels = ['_'] + ['%s_' % l for l in 'abcdefghijk']
+		lists = SparseTransitions(trans, init, *scorer.bounds(vectorizer.unique_feats)).decode_args()
+		for decode, kwargs in (('viterbi', {}), ('viterbi', lists), ('greedy', {'greedy': True})):
+			kernel = WordKernel(featurizer, scorer.coef_t_, trans, init, final, labels, **kwargs)
+			# also unseen letters and n-grams
+			for word in words + [['Q', 'k', 'a'], list('tsr'), []]:
+				expected = ''
+				if word:
+					path = DECODERS[decode](scorer.emissions(featurizer.transform(word)), trans, init, final,
+						**(kwargs if decode == 'viterbi' else {}))
+					expected = ''.join([labels[p] for p in path]).replace('_', '')
+				self.assertEqual(kernel.transform(word), expected)
+
+
+class TestModelCache(SyntheticModelCase):
+	def test_shared_pair(self):
+		hin = Transliterator(source='hin', target='eng')
+		mar = Transliterator(source='mar', target='eng')
+		self.assertEqual(list(BaseTransliterator.models), ['hin-eng'])
+		self.assertEqual(hin.convert('\u0915\u092e\u0932 \u0930\u093e\u092e'), mar.convert('\u0915\u092e\u0932 \u0930\u093e\u092e'))
+		self.assertIs(hin.transform.__self__.coef_, mar.transform.__self__.coef_)
+		self.assertTrue(set(hin.convert('\u0915\u092e\u0932')) <= set('akm'))
+
+	def test_predict_batch(self):
+		hin = Transliterator(source='hin', target='eng').transform.__self__
+		words = [list('kamala'), list('rAma'), list('a'), list('snigXa')]
+		batch = hin.predict_batch(words)
+		self.assertNotIn('vectorizer', hin.tensors_)
+		self.assertEqual(batch, [hin.predict(ngram_context(w)) for w in words])
+		self.assertIs(Transliterator(source='mar', target='eng').transform.__self__.vectorizer_, hin.tensors_['vectorizer'])
+
+	def test_lazy_transitions(self):
+		greedy = Transliterator(source='hin', target='eng', decode='greedy').transform.__self__
+		self.assertIsNone(greedy.transitions_)
+		self.assertNotIn('transitions', greedy.tensors_)
+		hin = Transliterator(source='hin', target='eng', decode='viterbi').transform.__self__
+		self.assertIsInstance(hin.transitions_, SparseTransitions)
+		self.assertIs(Transliterator(source='mar', target='eng', decode='viterbi_np').transform.__self__.transitions_, hin.transitions_)
+
+	def test_stored_featurizer(self):
+		hin = Transliterator(source='hin', target='eng').transform.__self__
+		self.assertIsInstance(hin.featurizer_.keys_, np.memmap)
+		featurizer = NgramFeaturizer(hin.vectorizer_.unique_feats)
+		self.assertEqual(hin.featurizer_.codes, featurizer.codes)
+		np.testing.assert_array_equal(hin.featurizer_.keys_, featurizer.keys_)
+		np.testing.assert_array_equal(hin.featurizer_.ids_, featurizer.ids_)
+		words = [list('kamala'), list('rAma'), list('xyz')]
+		np.testing.assert_array_equal(hin.featurizer_.transform_batch(words)[0], featurizer.transform_batch(words)[0])
+
+	def test_word_kernel(self):
+		if WordKernel is None:
+			self.skipTest('compiled kernels not built')
+		for decode in ('viterbi', 'greedy'):
+			hin = Transliterator(source='hin', target='eng', decode=decode).transform.__self__
+			self.assertIsInstance(hin.kernel_, WordKernel)
+			self.assertIs(Transliterator(source='mar', target='eng', decode=decode).transform.__self__.kernel_, hin.kernel_)
+			words = [list('kamala'), list('rAma'), list('a'), list('snigXa')]
+			self.assertEqual(hin.kernel_.transform_batch(words), [hin.predict(ngram_context(w)) for w in words])
+		self.assertIsNone(Transliterator(source='hin', target='eng', decode='viterbi_np').transform.__self__.kernel_)
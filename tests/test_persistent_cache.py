@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+#
+# @project IndicTrans
+# @file tests/test_persistent_cache.py
+# @author  Shreos Roychowdhury <shreos@tirja.com>
+# @version 1.0.0
+#
+# @section DESCRIPTION
+#
+#   test_persistent_cache.py : tests for the SQLite transliteration cache
+#
+# @section LICENSE
+#
+# Copyright (c) 2025 Shreos Roychowdhury.
+# Copyright (c) 2025 Tirja Consulting LLP.
+#
+# This source code is released under GNU Affero General Public License.
+# Please refer https://www.gnu.org/licenses/agpl-3.0.en.html#license-text
+#
+# THE SOFTWARE IS PROVIDED , WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+from __future__ import division, unicode_literals
+
+import os
+import shutil
+import tempfile
+import sqlite3
+import time
+
+from testtools import ExpectedException
+
+from indictrans.utils.BaseTransliterator import BaseTransliterator
+from indictrans.utils.Transliterator import Transliterator
+from indictrans.utils.PersistentCache import PersistentCache
+from tests.fixtures import SyntheticModelCase
+
+class TestPersistentCache(SyntheticModelCase):
+	def test_persistent_cache(self):
+		cache_dir = tempfile.mkdtemp()
+		self.addCleanup(shutil.rmtree, cache_dir)
+		path = os.path.join(cache_dir, 'cache.db')
+		text = '\u0915\u092e\u0932 \u0930\u093e\u092e, \u0915\u092e\u0932'
+		expected = Transliterator(source='hin', target='eng').convert(text)
+		hin = Transliterator(source='hin', target='eng', cache=PersistentCache(path))
+		self.assertEqual(hin.convert(text), expected)
+		self.assertEqual(hin.cache_info(), (0, 2, None, 2))
+		# another process, with an in-memory cache in front
+		hin = Transliterator(source='hin', target='eng', build_lookup=True, cache=PersistentCache(path, readonly=True))
+		self.assertEqual(hin.convert(text), expected)
+		self.assertEqual(hin.convert(text), expected)
+		self.assertEqual(hin.cache_info()[:2], (6, 0))
+		self.assertEqual(BaseTransliterator.caches['hin-eng', 'viterbi'].cache_info()[:2], (4, 2))
+		# k-best words are kept per k, apart from one-best ones
+		db = PersistentCache(path)
+		hin = Transliterator(source='hin', target='eng', decode='beamsearch', cache=db)
+		paths = hin.transform(text, k_best=3)
+		self.assertEqual(Transliterator(source='hin', target='eng', decode='beamsearch', cache=db).transform(text, k_best=3), paths)
+		stats = db.stats()
+		self.assertEqual([row[:3] + row[4:] for row in stats], [('hin-eng', 'beamsearch', 3, 2), ('hin-eng', 'viterbi', 0, 2)])
+		# rows of another model are not read
+		self.assertEqual(db.drop('hin-eng', 'viterbi', 'other'), 0)
+		self.assertEqual(db.drop('hin-eng', 'viterbi', stats[1][3]), 2)
+		db.compact()
+		# a write locked by another process is dropped at once
+		other = sqlite3.connect(path, isolation_level=None)
+		other.execute('BEGIN IMMEDIATE')
+		pair = db.bind('hin-eng', 'viterbi', 'other')
+		start = time.time()
+		pair.put('kamala', 'kml')
+		self.assertLess(time.time() - start, 1.0)
+		self.assertEqual(pair.write_errors, 1)
+		# transactions wait up to `timeout`, set at any time
+		db.timeout = 0.05
+		with ExpectedException(sqlite3.OperationalError):
+			with db.transaction():
+				pass
+		other.execute('ROLLBACK')
+		with db.transaction():
+			pair.put('kamala', 'kml')
+		self.assertEqual(pair.get('kamala'), 'kml')
+		other.close()
@@ -32,9 +32,15 @@ from __future__ import division, unicode_literals
 
 import io
 import os
+import sys
+import codecs
+import argparse
 
+import numpy as np
 from testtools import TestCase
 from indictrans.utils.Transliterator import Transliterator
+from indictrans.utils.BaseTransliterator import WORD, ROMAN, NEWLINE, SEPARATOR
+from tests.fixtures import SyntheticModelCase
 
 class TestTransliterator(TestCase):
 	def setUp(self):
@@ -84,13 +90,14 @@ class TestTransliterator(TestCase):
 	def test_kbest(self):
 		"""Make sure `k-best` works without failure"""
 		k_best = range(2, 15)
-		r2i = Transliterator(source='eng', target='hin', decode='beamsearch')
-		i2r = Transliterator(source='hin', target='eng', decode='beamsearch')
-		for k in k_best:
-			hin = r2i.transform('indictrans', k_best=k)
-			eng = i2r.transform(hin[0], k_best=k)
-			self.assertTrue(len(hin) == k)
-			self.assertTrue(len(eng) == k)
+		for decode in ('beamsearch', 'kbest'):
+			r2i = Transliterator(source='eng', target='hin', decode=decode)
+			i2r = Transliterator(source='hin', target='eng', decode=decode)
+			for k in k_best:
+				hin = r2i.transform('indictrans', k_best=k)
+				eng = i2r.transform(hin[0], k_best=k)
+				self.assertTrue(len(hin) == k)
+				self.assertTrue(len(eng) == k)
 
 	def test_rtrans(self):
 		"""Test Indic-to-Indic ML and Rule-Based models."""
@@ -185,3 +192,57 @@ class TestTransliterator(TestCase):
 		# close files
 		ifp.close()
 		ofp.close()
+
+
+class TestConversion(SyntheticModelCase):
+	def test_convert_many(self):
+		lines = ['\u0915\u092e\u0932 \u0930\u093e\u092e', '', '\u0930\u093e\u092e\n\u0915\u092e\u0932'] * 7
+		for rb in (False, True):
+			trn = Transliterator(source='hin', target='eng' if not rb else 'guj', rb=rb)
+			expected = [trn.convert(line) for line in lines]
+			self.assertEqual(list(trn.convert_many(lines, workers=1)), expected)
+			self.assertEqual(list(trn.convert_many(iter(lines), workers=2, chunksize=2)), expected)
+		# outputs stream before the input is exhausted
+		trn = Transliterator(source='hin', target='eng')
+		outputs = trn.convert_many(iter(lines * 1000), workers=2, chunksize=3)
+		self.assertEqual(next(outputs), trn.convert(lines[0]))
+		outputs.close()
+
+	def test_spans(self):
+		hin = Transliterator(source='hin', target='eng').transform.__self__
+		text = 'kamala \x00Hello,\t\n\nrAma'
+		self.assertEqual(list(hin.spans(text)), [(0, 6, WORD), (6, 7, SEPARATOR), (7, 13, ROMAN), (13, 15, SEPARATOR),
+			(15, 16, NEWLINE), (16, 17, NEWLINE), (17, 21, WORD)])
+		self.assertEqual(''.join(hin.tokens(text)), text)
+		self.assertEqual([text[a:b] for a, b, kind in hin.spans(text) if kind in (WORD, ROMAN)], hin.non_alpha.split(text)[0::2])
+		# tabs, spaces and blank lines are kept as they are
+		text = '\u0915\u092e\u0932\t \u0930\u093e\u092e\r\n \n\u2003\n'
+		tline = hin.transliterate(text)
+		self.assertEqual(tline.replace(hin.transliterate('\u0915\u092e\u0932'), 'A').replace(hin.transliterate('\u0930\u093e\u092e'), 'B'),
+			'A\t B\r\n \n\u2003\n')
+
+	def test_convert_corpus(self):
+		lines = ['\u0915\u092e\u0932 \u0930\u093e\u092e, \u0915\u092e\u0932\n', '  \n', '\n',
+			'\u0930\u093e\u092e\tabc \u0915\u092e\u0932 42\n'] * 3
+		for source, target in (('hin', 'eng'), ('hin', 'guj')):
+			trn = Transliterator(source=source, target=target)
+			expected = [trn.convert(line) for line in lines]
+			self.assertEqual(list(trn.convert_corpus(lines, workers=1)), expected)
+			self.assertEqual(list(trn.convert_corpus(lines, workers=2, chunksize=1)), expected)
+		self.assertRaises(ValueError, list, Transliterator(source='hin', target='eng').convert_corpus(iter(lines)))
+
+	def test_convert_column(self):
+		texts = ['\u0915\u092e\u0932 \u0930\u093e\u092e', '', '\u0915\u092e\u0932\n\tabc', '42']
+		data = ''.join(texts).encode('utf-8')
+		offsets = np.cumsum([0] + [len(text.encode('utf-8')) for text in texts])
+		for source, target, rb in (('hin', 'eng', False), ('hin', 'guj', True)):
+			trn = Transliterator(source=source, target=target, rb=rb)
+			buf, out_offsets = trn.convert_column(data, offsets)
+			self.assertEqual(out_offsets.dtype, np.int64)
+			outputs = [buf[a:b].decode('utf-8') for a, b in zip(out_offsets[:-1], out_offsets[1:])]
+			self.assertEqual(outputs, [trn.convert(text) for text in texts])
+		# rows of a slice of an ASCII buffer
+		trn = Transliterator(source='hin', target='eng')
+		buf, out_offsets = trn.convert_column(b'xxkamal ram', np.array([2, 7, 8, 11]))
+		self.assertEqual(buf, b'kamal ram')
+		self.assertEqual(out_offsets[0], 0)
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+#
+# @project IndicTrans
+# @file tests/test_transliteration_cache.py
+# @author  Shreos Roychowdhury <shreos@tirja.com>
+# @version 1.0.0
+#
+# @section DESCRIPTION
+#
+#   test_transliteration_cache.py : tests for the bounded in-memory word caches
+#
+# @section LICENSE
+#
+# Copyright (c) 2025 Shreos Roychowdhury.
+# Copyright (c) 2025 Tirja Consulting LLP.
+#
+# This source code is released under GNU Affero General Public License.
+# Please refer https://www.gnu.org/licenses/agpl-3.0.en.html#license-text
+#
+# THE SOFTWARE IS PROVIDED , WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+from __future__ import division, unicode_literals
+
+from testtools import TestCase
+
+from indictrans.utils.Transliterator import Transliterator
+from indictrans.utils.TransliterationCache import LRUCache, TinyLFUCache
+from tests.fixtures import SyntheticModelCase
+
+class TestTransliterationCache(TestCase):
+	def test_lru(self):
+		cache = LRUCache(2)
+		cache.put('a', 'x')
+		cache.put('b', 'y')
+		self.assertEqual(cache.get('a'), 'x')
+		cache.put('c', 'z')
+		self.assertIsNone(cache.get('b'))
+		self.assertEqual((cache.get('a'), cache.get('c')), ('x', 'z'))
+		self.assertEqual(cache.cache_info(), (3, 1, 2, 2))
+
+	def test_tinylfu(self):
+		# 80 frequent words among a scan of words seen once: LRU keeps
+		# evicting the frequent ones, TinyLFU does not admit the others
+		hits = []
+		for cache in (LRUCache(100), TinyLFUCache(100)):
+			for j in range(4000):
+				for key in (j % 80, 1000 + j):
+					if cache.get(key) is None:
+						cache.put(key, str(key))
+			self.assertLessEqual(len(cache), 100)
+			self.assertEqual(sum(cache.cache_info()[:2]), 8000)
+			hits.append(cache.cache_info().hits)
+		self.assertGreater(hits[1], 3500)
+		self.assertLess(hits[0], 500)
+
+
+class TestWordCache(SyntheticModelCase):
+	def test_build_lookup(self):
+		text = '\u0915\u092e\u0932 \u0930\u093e\u092e, \u0915\u092e\u0932'
+		expected = Transliterator(source='hin', target='eng').convert(text)
+		hin = Transliterator(source='hin', target='eng', build_lookup=True)
+		self.assertEqual(hin.convert(text), expected)
+		self.assertEqual(hin.cache_info().misses, 2)
+		mar = Transliterator(source='mar', target='eng', build_lookup=True)
+		self.assertEqual(mar.convert(text), expected)
+		cache = hin.transform.__self__.cache
+		self.assertIsNot(mar.transform.__self__.cache, cache)
+		self.assertIs(Transliterator(source='hin', target='eng', build_lookup=True).transform.__self__.cache, cache)
+		self.assertEqual(hin.convert(text), expected)
+		self.assertEqual(hin.cache_info().hits, 3)
+		# k-best outputs are cached per k
+		hin = Transliterator(source='hin', target='eng', decode='beamsearch', cache=LRUCache(10))
+		for k_best in (2, 3, 2):
+			self.assertEqual(len(hin.transform('\u0915\u092e\u0932', k_best=k_best)), k_best)
+		self.assertEqual(hin.cache_info()[:2], (1, 2))
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+#
+# @project IndicTrans
+# @file tests/test_wxencoder.py
+# @author  Shreos Roychowdhury <shreos@tirja.com>
+# @version 1.0.0
+#
+# @section DESCRIPTION
+#
+#   test_wxencoder.py : tests for the WX transducer, script tables and shared WXEncoders
+#
+# @section LICENSE
+#
+# Copyright (c) 2025 Shreos Roychowdhury.
+# Copyright (c) 2025 Tirja Consulting LLP.
+#
+# This source code is released under GNU Affero General Public License.
+# Please refer https://www.gnu.org/licenses/agpl-3.0.en.html#license-text
+#
+# THE SOFTWARE IS PROVIDED , WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+from __future__ import division, unicode_literals
+
+import threading
+from itertools import product
+
+import numpy as np
+from testtools import TestCase
+
+from indictrans.utils.WXEncoder import WXEncoder
+from indictrans.utils import WXTransducer
+
+class TestWXEncoder(TestCase):
+	def cascade_errors(self, f, cascade, text):
+		try:
+			expected = cascade(text)
+		except KeyError:
+			self.assertRaises(KeyError, f, text)
+		else:
+			self.assertEqual(f(text), expected, repr(text))
+
+	def test_short_strings(self):
+		for lang in ('hin', 'pan'):
+			wxp = WXEncoder(order='wx2utf', lang=lang)
+			for n in (1, 2, 3):
+				for chars in product('lrZYVeEaAqM. ', repeat=n):
+					self.cascade_errors(wxp.wx2iscii, wxp.wx2iscii_cascade, ''.join(chars))
+		wxp = WXEncoder(order='utf2wx', lang='hin')
+		for n in (1, 2, 3):
+			for chars in product('\xB3\xCE\xE8\xE9\xDA\xA2\xA4\xA5\xEA\xFB\xF1a', repeat=n):
+				self.cascade_errors(wxp.iscii2wx, wxp.iscii2wx_cascade, ''.join(chars))
+
+	def test_languages(self):
+		rnd = np.random.RandomState(0)
+		blocks = {'hin': 0x900, 'ben': 0x980, 'pan': 0xA00, 'guj': 0xA80, 'ori': 0xB00,
+			'tam': 0xB80, 'tel': 0xC00, 'kan': 0xC80, 'mal': 0xD00}
+		for lang, block in blocks.items():
+			utf2wx, wx2utf = WXEncoder(order='utf2wx', lang=lang), WXEncoder(order='wx2utf', lang=lang)
+			for i in range(200):
+				text = ''.join(chr(block + c) if c < 128 else ' ' for c in rnd.randint(0, 140, rnd.randint(1, 12)))
+				iscii = utf2wx.unicode2iscii(text)
+				self.assertEqual(utf2wx.iscii2wx(iscii), utf2wx.iscii2wx_cascade(iscii))
+				wx = utf2wx.utf2wx(text)
+				self.assertEqual(wx2utf.wx2iscii(wx), wx2utf.wx2iscii_cascade(wx))
+
+	def test_rules(self):
+		# aq before a modifier never survives map_q
+		self.assertFalse('aqM' in WXTransducer.compiled('wx2iscii').table)
+		self.assertEqual(WXTransducer.compiled('wx2iscii').convert('kamala'), '\xB3\xCC\xD1')
+		self.assertEqual(WXTransducer.compiled('iscii2wx').convert('\xB3\xCC\xD1'), 'kamala')
+
+	def test_script_tables(self):
+		# NUKTA variations are folded into the translate tables
+		for lang, composed, parts in (('hin', '\u0958', '\u0915\u093C'), ('ben', '\u09DC', '\u09A1\u09BC'),
+				('ori', '\u0B5C', '\u0B21\u0B3C'), ('pan', '\u0A5B', '\u0A1C\u0A3C'), ('kan', '\u0CDE', '\u0CAB\u0CBC')):
+			wxp = WXEncoder(order='utf2wx', lang=lang)
+			self.assertEqual(wxp.unicode2iscii(composed), wxp.unicode2iscii(parts))
+		self.assertEqual(WXEncoder(order='utf2wx', lang='pan').unicode2iscii('\u0A5C'), '\xBF\xE9')
+		iscii = WXEncoder(order='utf2wx', lang='kan').unicode2iscii('\u0CDE')
+		self.assertEqual(WXEncoder(order='wx2utf', lang='kan').iscii2unicode(iscii), '\u0CDE')
+
+	def test_shared(self):
+		encoders = []
+		threads = [threading.Thread(target=lambda: encoders.append(WXEncoder.shared('utf2wx', 'TEL'))) for i in range(4)]
+		for thread in threads:
+			thread.start()
+		for thread in threads:
+			thread.join()
+		self.assertEqual(len(set(map(id, encoders))), 1)
+		self.assertIs(encoders[0], WXEncoder.shared(order='utf2wx', lang='tel'))
+		self.assertIsNot(encoders[0], WXEncoder.shared(order='wx2utf', lang='tel'))
+		self.assertRaises(AttributeError, setattr, encoders[0], 'lang_tag', 'hin')
+		self.assertEqual(encoders[0].utf2wx('\u0C15'), WXEncoder(order='utf2wx', lang='tel').utf2wx('\u0C15'))